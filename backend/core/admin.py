@@ -117,4 +117,7 @@ admin.site.register(TutorTopic)
 admin.site.register(Language)
 admin.site.register(TutorLanguage)
 admin.site.register(Availability)
+admin.site.register(AvailabilityRule)
+admin.site.register(AvailabilityException)
 admin.site.register(Notification)
+admin.site.register(Conversation)
@@ -0,0 +1,111 @@
+import math
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from core import counters
+from core.auth import authenticate_request, bearer_token
+from core.models import CustomUser, Notification
+from core.serializers import CustomUserSerializer, NotificationSerializer
+
+"""
+This module contains async variants of the hottest read endpoints, served on the event loop of the ASGI server
+with Django's async ORM, without the REST framework's per-request machinery.
+
+They answer GET requests exactly like the REST framework views they stand in for when ASYNC_READ_VIEWS is set
+(see core.urls), which keep serving every other method.
+
+Async views include:
+- The unread notification count polled by the navigation bar
+- The notification list
+- Profiles by username
+"""
+def serve_reads(async_view, sync_view):
+    """One view serving GET and HEAD with async_view, and every other method with the REST framework sync_view"""
+    sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    # The REST framework views authenticate with tokens and are exempt from CSRF checks
+    view.csrf_exempt = True
+    return view
+
+
+def has_token(request):
+    return bearer_token(request.headers.get('Authorization', '')) is not None
+
+
+def authentication_failed(request):
+    """The REST framework's response to an unauthenticated request"""
+    if has_token(request):
+        data = {'detail': 'Given token not valid for any token type', 'code': 'token_not_valid'}
+    else:
+        data = {'detail': 'Authentication credentials were not provided.'}
+    response = JsonResponse(data, status=401)
+    response['WWW-Authenticate'] = 'Bearer realm="api"'
+    return response
+
+
+@require_safe
+async def notification_unread_count(request):
+    user = await authenticate_request(request)
+    if not user.is_authenticated:
+        return authentication_failed(request)
+    return JsonResponse({'unread_count': await counters.aunread_count(counters.NOTIFICATIONS, user.id)})
+
+
+@require_safe
+async def notification_list(request):
+    """The user's notifications, newest first, in the REST framework's page number pagination format"""
+    user = await authenticate_request(request)
+    if not user.is_authenticated:
+        return authentication_failed(request)
+
+    notifications = Notification.objects.filter(recipient_id=user.id)
+    # Catch up after a WebSocket reconnect: only notifications newer than the last one the client has seen
+    since = request.GET.get('since')
+    if since and since.isdigit():
+        notifications = notifications.filter(id__gt=int(since))
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    count = await notifications.acount()
+    last_page = max(math.ceil(count / page_size), 1)
+    page = request.GET.get('page', '1')
+    number = last_page if page == 'last' else int(page) if page.isdigit() else 0
+    if not 1 <= number <= last_page:
+        return JsonResponse({'detail': 'Invalid page.'}, status=404)
+
+    start = (number - 1) * page_size
+    results = [notification async for notification in notifications[start:start + page_size]]
+    url = request.build_absolute_uri()
+    if number == 1:
+        previous_url = None
+    elif number == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', number - 1)
+
+    return JsonResponse({
+        'count': count,
+        'next': replace_query_param(url, 'page', number + 1) if number < last_page else None,
+        'previous': previous_url,
+        'results': NotificationSerializer(results, many=True).data,
+    })
+
+
+@require_safe
+async def user_profile(request, username):
+    # Like the REST framework, reject invalid tokens even though profiles are public
+    user = await authenticate_request(request)
+    if not user.is_authenticated and has_token(request):
+        return authentication_failed(request)
+
+    try:
+        profile = await CustomUser.objects.with_profile().aget(username=username)
+    except CustomUser.DoesNotExist:
+        return JsonResponse({'detail': 'No CustomUser matches the given query.'}, status=404)
+    return JsonResponse(CustomUserSerializer(profile, context={'request': request}).data)
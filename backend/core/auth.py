@@ -0,0 +1,91 @@
+from asgiref.sync import sync_to_async
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from core.presence import presence
+
+"""
+This module contains authentication helpers shared by the HTTP API and the WebSocket endpoints.
+
+It includes:
+- PresenceJWTAuthentication: the REST API's JWT authentication, recording a presence heartbeat per authenticated request
+- JWTAuthMiddleware: authenticates WebSocket connections with the same access tokens as the REST API
+- authenticate_request: the same authentication for the async HTTP views (see core.async_views)
+"""
+class PresenceJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            presence.touch(result[0].id)
+        return result
+
+
+def user_from_token(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        # Invalid or expired token, or a deleted or inactive user
+        return AnonymousUser()
+
+
+# WebSocket consumers outlive requests: close stale connections around the lookup as channels does
+get_user_from_token = database_sync_to_async(user_from_token)
+
+
+def bearer_token(authorization):
+    parts = authorization.split()
+    if len(parts) == 2 and parts[0] == 'Bearer':
+        return parts[1]
+    return None
+
+
+async def authenticate_request(request):
+    """The user of the request's `Authorization: Bearer` access token (AnonymousUser without a valid one)"""
+    raw_token = bearer_token(request.headers.get('Authorization', ''))
+    if not raw_token:
+        return AnonymousUser()
+
+    user = await sync_to_async(user_from_token)(raw_token)
+    if user.is_authenticated:
+        presence.touch(user.id)
+    return user
+
+
+# WebSocket subprotocol announcing that the next offered subprotocol is an access token
+TOKEN_SUBPROTOCOL = 'bearer'
+
+
+def subprotocol_token(subprotocols):
+    """The access token of a `bearer, <token>` Sec-WebSocket-Protocol offer"""
+    if len(subprotocols) >= 2 and subprotocols[0] == TOKEN_SUBPROTOCOL:
+        return subprotocols[1]
+    return None
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Channels middleware that sets scope['user'] from a JWT access token.
+
+    Browsers cannot set headers on WebSocket handshakes, so they offer the token as a subprotocol:
+    `new WebSocket(url, ['bearer', accessToken])`, which the consumer accepts with the `bearer` subprotocol.
+    Other clients may send a standard `Authorization: Bearer` header instead. Tokens are never read from the URL,
+    which proxies and access logs record.
+    """
+
+    async def __call__(self, scope, receive, send):
+        scope['user'] = AnonymousUser()
+
+        raw_token = subprotocol_token(scope.get('subprotocols', []))
+        if not raw_token:
+            headers = dict(scope.get('headers', []))
+            raw_token = bearer_token(headers.get(b'authorization', b'').decode())
+
+        if raw_token:
+            scope['user'] = await get_user_from_token(raw_token)
+
+        return await super().__call__(scope, receive, send)
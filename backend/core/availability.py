@@ -0,0 +1,338 @@
+import heapq
+import uuid
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DateTimeField, ExpressionWrapper, F, Prefetch, Q
+from django.utils import timezone
+from core.models import Availability, AvailabilityException, AvailabilityRule, Session
+
+"""
+This module answers "which tutors have a free slot of duration D between start and end" on the server,
+and whether a given booking falls within a tutor's availability.
+
+Availability comes from one-off Availability rows and weekly AvailabilityRule rows, with times in the server
+time zone. Rules are never materialized as rows: they are expanded to concrete slots for the requested dates
+on demand. A tutor's free time in a window is the union of both kinds of slots minus their active sessions.
+
+Each input is loaded with one indexed query (see the Availability, AvailabilityRule and Session indexes), and the
+interval arithmetic runs in Python over those rows. A search therefore loads every slot and session in the window
+of the tutors it considers: its cost grows with the number of those tutors (narrow it with `tutors`) and with
+the length of the window, and callers should not repeat it for the same window. Single-tutor rule expansions are
+cached (see tutor_rule_slots).
+"""
+# Sessions holding a slot, the statuses the double-booking constraint covers
+BLOCKING_STATUSES = Session.ACTIVE_STATUSES
+
+# Lower bound on session start times when looking for overlaps, so that the (status, date_time) index can be used
+MAX_SESSION_DURATION = timedelta(hours=24)
+
+MAX_WINDOW = timedelta(days=14)
+
+
+class AvailabilityWindowError(ValueError):
+    pass
+
+
+def merge_sorted_intervals(intervals):
+    """Merge overlapping or touching (start, end) intervals, already sorted by start, in a single pass"""
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching (start, end) intervals into a sorted list of disjoint ones"""
+    return merge_sorted_intervals(sorted(intervals))
+
+
+def subtract_intervals(intervals, busy):
+    """
+    Remove the busy intervals (sorted by start) from the sorted, disjoint intervals in a single forward pass over
+    both lists
+    """
+    free = []
+    busy = merge_sorted_intervals(busy)
+    position = 0
+    for start, end in intervals:
+        # Busy intervals ending before this interval cannot affect the later ones either
+        while position < len(busy) and busy[position][1] <= start:
+            position += 1
+
+        cursor = position
+        while cursor < len(busy) and busy[cursor][0] < end:
+            busy_start, busy_end = busy[cursor]
+            if busy_start > start:
+                free.append((start, busy_start))
+            start = max(start, busy_end)
+            cursor += 1
+
+        if start < end:
+            free.append((start, end))
+    return free
+
+
+def validate_window(start, end):
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    if timezone.is_naive(end):
+        end = timezone.make_aware(end)
+    if end <= start:
+        raise AvailabilityWindowError("The end of the window must be after its start")
+    if end - start > MAX_WINDOW:
+        raise AvailabilityWindowError(f"The window cannot be longer than {MAX_WINDOW.days} days")
+    return timezone.localtime(start), timezone.localtime(end)
+
+
+def days_between(start_date, end_date):
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+
+def active_rules(start_date, end_date):
+    """Rules valid on at least one weekday between the two dates, with their exceptions in that range"""
+    mask = AvailabilityRule.weekday_mask({day.weekday() for day in days_between(start_date, end_date)[:7]})
+    return AvailabilityRule.objects.filter(
+        Q(valid_until__isnull=True) | Q(valid_until__gte=start_date),
+        valid_from__lte=end_date
+    ).annotate(
+        matching_weekdays=F('weekdays').bitand(mask)
+    ).filter(matching_weekdays__gt=0).prefetch_related(
+        Prefetch('exceptions', queryset=AvailabilityException.objects.filter(date__range=(start_date, end_date)))
+    )
+
+
+def expand_rules(rules, start_date, end_date):
+    """Concrete (tutor id, date, start time, end time) slots of the rules between the two dates"""
+    days = days_between(start_date, end_date)
+    slots = []
+    for rule in rules:
+        excluded = {exception.date for exception in rule.exceptions.all()}
+        for day in days:
+            if day not in excluded and rule.applies_on(day):
+                slots.append((rule.tutor_id, day, rule.start_time, rule.end_time))
+    return slots
+
+
+def rules_version_key(tutor_id):
+    return f'availability:rules-version:{tutor_id}'
+
+
+def new_rules_version():
+    # Never reused, so that a version evicted from the cache cannot come back and revive stale expansions
+    return uuid.uuid4().hex
+
+
+def invalidate_rule_slots(tutor_id):
+    """Drop every cached expansion of the tutor's rules"""
+    cache.set(rules_version_key(tutor_id), new_rules_version(), timeout=None)
+
+
+def tutor_rule_slots(tutor_id, start_date, end_date):
+    """Cached (date, start time, end time) slots of one tutor's rules between the two dates, sorted by date and start"""
+    version = cache.get_or_set(rules_version_key(tutor_id), new_rules_version, timeout=None)
+    # Not the key of the unsorted expansions cached by earlier versions, which tutor_calendar cannot merge in one pass
+    key = f'availability:sorted-rule-slots:{tutor_id}:{version}:{start_date.isoformat()}:{end_date.isoformat()}'
+
+    slots = cache.get(key)
+    if slots is None:
+        rules = active_rules(start_date, end_date).filter(tutor_id=tutor_id)
+        # expand_rules yields them rule by rule, each rule's days in order
+        slots = sorted(slot[1:] for slot in expand_rules(rules, start_date, end_date))
+        cache.set(key, slots, timeout=24 * 60 * 60)
+    return slots
+
+
+def is_available(tutor_id, date_time, duration):
+    """Whether a booking from date_time for duration lies within one of the tutor's availability slots"""
+    date_time = timezone.localtime(date_time) if timezone.is_aware(date_time) else date_time
+    day, time_start, time_end = date_time.date(), date_time.time(), (date_time + duration).time()
+
+    if Availability.objects.filter(
+        tutor_id=tutor_id,
+        available_date=day,
+        available_time_start__lte=time_start,
+        available_time_end__gte=time_end
+    ).exists():
+        return True
+
+    return any(
+        slot_start <= time_start and time_end <= slot_end
+        for _, slot_start, slot_end in tutor_rule_slots(tutor_id, day, day)
+    )
+
+
+def availability_intervals(start, end, tutors=None):
+    """Map of tutor id to the merged intervals of [start, end] covered by their availability"""
+    start_date, end_date = start.date(), end.date()
+
+    one_off = Availability.objects.filter(available_date__range=(start_date, end_date))
+    rules = active_rules(start_date, end_date)
+    if tutors is not None:
+        one_off = one_off.filter(tutor__in=tutors)
+        rules = rules.filter(tutor__in=tutors)
+
+    slots = list(one_off.values_list('tutor_id', 'available_date', 'available_time_start', 'available_time_end'))
+    slots += expand_rules(rules, start_date, end_date)
+
+    intervals = defaultdict(list)
+    for tutor_id, day, time_start, time_end in slots:
+        interval_start = max(timezone.make_aware(datetime.combine(day, time_start)), start)
+        interval_end = min(timezone.make_aware(datetime.combine(day, time_end)), end)
+        if interval_start < interval_end:
+            intervals[tutor_id].append((interval_start, interval_end))
+
+    return {tutor_id: merge_intervals(tutor_intervals) for tutor_id, tutor_intervals in intervals.items()}
+
+
+def busy_intervals(start, end, tutor_ids):
+    """Map of tutor id to the intervals of their blocking sessions overlapping [start, end], sorted by start"""
+    sessions = Session.objects.filter(
+        tutor_id__in=tutor_ids,
+        status__in=BLOCKING_STATUSES,
+        date_time__lt=end,
+        date_time__gt=start - MAX_SESSION_DURATION
+    ).alias(
+        end_time=ExpressionWrapper(F('date_time') + F('duration'), output_field=DateTimeField())
+    ).filter(end_time__gt=start).order_by('date_time')
+
+    busy = defaultdict(list)
+    for tutor_id, date_time, duration in sessions.values_list('tutor_id', 'date_time', 'duration'):
+        date_time = timezone.localtime(date_time)
+        busy[tutor_id].append((date_time, date_time + duration))
+    return busy
+
+
+def free_intervals(start, end, tutors=None):
+    """Map of tutor id to their free intervals in [start, end], for tutors with any availability in the window"""
+    start, end = validate_window(start, end)
+    available = availability_intervals(start, end, tutors)
+    busy = busy_intervals(start, end, list(available))
+
+    return {
+        tutor_id: subtract_intervals(intervals, busy.get(tutor_id, []))
+        for tutor_id, intervals in available.items()
+    }
+
+
+def find_available_tutors(start, end, duration, tutors=None):
+    """
+    Map of tutor id to the free intervals of at least `duration` in [start, end], for every tutor that has one.
+    `tutors` optionally restricts the search to a queryset of users.
+    """
+    return {
+        tutor_id: slots
+        for tutor_id, intervals in free_intervals(start, end, tutors).items()
+        if (slots := [(slot_start, slot_end) for slot_start, slot_end in intervals if slot_end - slot_start >= duration])
+    }
+
+
+def tutor_calendar(tutor_id, start_date, end_date):
+    """
+    Free and busy intervals of one tutor from the start of start_date to the end of end_date.
+
+    Reads the one-off slots and the sessions with one query each, both sorted by start, merges the one-off slots
+    with the cached expansion of the tutor's rules (sorted the same way), and merges and subtracts the sorted lists
+    in linear passes.
+    """
+    start, end = validate_window(
+        timezone.make_aware(datetime.combine(start_date, time.min)),
+        timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+    )
+
+    one_off = Availability.objects.filter(
+        tutor_id=tutor_id,
+        available_date__range=(start_date, end_date)
+    ).order_by('available_date', 'available_time_start').values_list('available_date', 'available_time_start', 'available_time_end')
+    slots = heapq.merge(one_off, tutor_rule_slots(tutor_id, start_date, end_date))
+
+    available = merge_sorted_intervals(
+        (timezone.make_aware(datetime.combine(day, time_start)), timezone.make_aware(datetime.combine(day, time_end)))
+        for day, time_start, time_end in slots
+    )
+    busy = merge_sorted_intervals(
+        (max(session_start, start), min(session_end, end))
+        for session_start, session_end in busy_intervals(start, end, [tutor_id]).get(tutor_id, [])
+    )
+
+    return {'free': subtract_intervals(available, busy), 'busy': busy}
+
+
+class AvailabilityBatchError(ValueError):
+    def __init__(self, errors):
+        # Map of batch index to error message
+        self.errors = errors
+        super().__init__('; '.join(f'{index}: {message}' for index, message in sorted(errors.items())))
+
+
+def batch_overlaps(slots):
+    """Map of batch index to error for slots overlapping an earlier slot of the same batch on the same day"""
+    errors = {}
+    by_day = defaultdict(list)
+    for index, (day, time_start, time_end) in enumerate(slots):
+        by_day[day].append((time_start, time_end, index))
+
+    for day_slots in by_day.values():
+        latest_end, latest_index = None, None
+        for time_start, time_end, index in sorted(day_slots):
+            if latest_end is not None and time_start < latest_end:
+                errors[index] = f"Overlaps slot {latest_index} of the batch"
+            if latest_end is None or time_end > latest_end:
+                latest_end, latest_index = time_end, index
+    return errors
+
+
+def upsert_availability(tutor, slots):
+    """
+    Save a batch of validated AvailabilitySerializer data for the tutor atomically and return the saved objects in order.
+
+    One-off slots are written with a single INSERT ... ON CONFLICT on (tutor, available_date, available_time_start),
+    so re-sending a slot updates its end time. Recurring slots become weekly rules, created with one INSERT.
+    """
+    # Recurring slots repeat on their weekday, so they are compared by weekday rather than date
+    errors = batch_overlaps([
+        (('weekly', slot['available_date'].weekday()) if slot.get('recurring') else ('date', slot['available_date']),
+         slot['available_time_start'], slot['available_time_end'])
+        for slot in slots
+    ])
+    if errors:
+        raise AvailabilityBatchError(errors)
+
+    one_off = [
+        (index, Availability(
+            tutor=tutor,
+            available_date=slot['available_date'],
+            available_time_start=slot['available_time_start'],
+            available_time_end=slot['available_time_end']
+        ))
+        for index, slot in enumerate(slots) if not slot.get('recurring')
+    ]
+    rules = [
+        (index, AvailabilityRule(
+            tutor=tutor,
+            weekdays=AvailabilityRule.weekday_mask([slot['available_date'].weekday()]),
+            start_time=slot['available_time_start'],
+            end_time=slot['available_time_end'],
+            valid_from=slot['available_date']
+        ))
+        for index, slot in enumerate(slots) if slot.get('recurring')
+    ]
+
+    with transaction.atomic():
+        if one_off:
+            Availability.objects.bulk_create(
+                [availability for _, availability in one_off],
+                update_conflicts=True,
+                unique_fields=['tutor', 'available_date', 'available_time_start'],
+                update_fields=['available_time_end']
+            )
+        if rules:
+            AvailabilityRule.objects.bulk_create([rule for _, rule in rules])
+            # bulk_create does not send post_save, so invalidate the cached expansions here
+            transaction.on_commit(lambda: invalidate_rule_slots(tutor.id))
+
+    return [saved for _, saved in sorted(one_off + rules, key=lambda entry: entry[0])]
@@ -0,0 +1,394 @@
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, time as clock_time, timedelta
+from urllib.parse import urlencode
+from django.db import connection, reset_queries, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core import urls
+from core.availability import availability_intervals, tutor_calendar
+from core.datagen import DEFAULT_PASSWORD
+from core.models import (
+    Availability, AvailabilityRule, Conversation, CustomUser, Language, Message, Notification, Role, Session, Topic,
+    TutorLanguage, TutorTopic
+)
+
+"""
+This module drives the API routes of core.urls through the DRF test client and measures, per route, the number of
+SQL queries, the latency distribution and the peak Python memory allocated while handling a request.
+
+Every request runs in a transaction that is rolled back, so that write endpoints can be measured repeatedly against
+the same data. See the benchmark management command.
+"""
+# Statements of the transaction every request is wrapped in, which are not the endpoint's own
+TRANSACTION_STATEMENTS = {'BEGIN', 'ROLLBACK'}
+
+
+class Fixtures:
+    """Representative rows the scenarios act on: the busiest tutor, one of their students, their sessions..."""
+
+    def __init__(self):
+        now = timezone.now()
+        busiest = Session.objects.values('tutor_id').annotate(total=Count('id')).order_by('-total', 'tutor_id').first()
+        self.tutor = CustomUser.objects.get(pk=busiest['tutor_id']) if busiest else CustomUser.objects.tutors().first()
+
+        sessions = Session.objects.filter(tutor=self.tutor).order_by('date_time')
+        self.session = sessions.filter(status='confirmed', date_time__gt=now).first() or sessions.first()
+        self.pending_session = sessions.filter(status='pending', date_time__gt=now).first()
+        self.student = self.session.student if self.session else CustomUser.objects.exclude(roles__name='Tutor').first()
+        # The student answers the tutor's reschedule request, so the scenario acts as that session's own student
+        self.reschedule_session = sessions.filter(status='reschedule_pending').select_related('student').first()
+        self.reschedule_student = self.reschedule_session.student if self.reschedule_session else None
+        self.unreviewed_session = Session.objects.filter(
+            student=self.student, status='completed', review__isnull=True
+        ).first()
+
+        conversation = Conversation.objects.inbox(self.student).first() if self.student else None
+        self.partner = conversation.partner_of(self.student) if conversation else None
+        self.message = Message.objects.thread(self.student, self.partner.pk).first() if self.partner else None
+        self.notification = Notification.objects.filter(recipient=self.student).first()
+
+        self.rule = AvailabilityRule.objects.filter(tutor=self.tutor).first()
+        self.availability = Availability.objects.first()
+        self.role = Role.objects.first()
+        self.topic = Topic.objects.first()
+        self.language = Language.objects.first()
+        self.tutor_topic = TutorTopic.objects.filter(tutor=self.tutor).select_related('topic').first()
+        self.tutor_language = TutorLanguage.objects.first()
+
+        # A free hour of the tutor, to book or reschedule to
+        self.free_slot = None
+        if self.tutor:
+            today = timezone.localdate()
+            for start, end in tutor_calendar(self.tutor.id, today + timedelta(days=1), today + timedelta(days=13))['free']:
+                if end - start >= timedelta(hours=1):
+                    self.free_slot = start
+                    break
+
+        # An hour covered by none of the tutor's one-off slots or rules, which rescheduling must refuse
+        self.unavailable_slot = None
+        if self.tutor:
+            start = timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=1), clock_time.min))
+            end = start + timedelta(days=13)
+            covered = availability_intervals(start, end, [self.tutor.id]).get(self.tutor.id, [])
+            candidate = start
+            while candidate + timedelta(hours=1) <= end:
+                if not any(slot_start < candidate + timedelta(hours=1) and candidate < slot_end for slot_start, slot_end in covered):
+                    self.unavailable_slot = candidate
+                    break
+                candidate += timedelta(hours=1)
+
+
+class Scenario:
+    """
+    A request to a named route. kwargs, params and data are functions of the Fixtures, and the scenario is skipped
+    when one of the `requires` fixtures does not exist. The response must have the expected status (any 2xx status
+    when none is given) and, for error responses, the expected error code. The label tells apart scenarios of the
+    same route and method.
+    """
+
+    def __init__(self, name, method='get', actor='student', kwargs=None, params=None, data=None, requires=(),
+                 expected_status=None, expected_code=None, label=None):
+        self.name = name
+        self.method = method
+        self.actor = actor
+        self.kwargs = kwargs or (lambda fixtures: {})
+        self.params = params or (lambda fixtures: {})
+        self.data = data
+        self.requires = requires
+        self.expected_status = expected_status
+        self.expected_code = expected_code
+        self.label = label
+
+    @property
+    def key(self):
+        key = f'{self.method.upper()} {self.name}'
+        return f'{key} ({self.label})' if self.label else key
+
+    def is_expected(self, result):
+        if self.expected_status is None:
+            return is_success(result)
+        return result['status'] == self.expected_status and result.get('code') == self.expected_code
+
+    @property
+    def expected(self):
+        expected = str(self.expected_status or '2xx')
+        return f'{expected} {self.expected_code}' if self.expected_code else expected
+
+    def url(self, fixtures):
+        url = reverse(self.name, kwargs=self.kwargs(fixtures))
+        params = self.params(fixtures)
+        return f'{url}?{urlencode(params)}' if params else url
+
+
+def pk_of(fixture, kwarg='pk'):
+    return lambda fixtures: {kwarg: getattr(fixtures, fixture).pk}
+
+
+SCENARIOS = [
+    Scenario('api-root', actor=None),
+    Scenario('user-list'),
+    Scenario('user-detail', kwargs=pk_of('tutor'), requires=['tutor']),
+    Scenario('user-topics', actor=None, kwargs=pk_of('tutor'), requires=['tutor']),
+    Scenario('role-list'),
+    Scenario('role-detail', kwargs=pk_of('role'), requires=['role']),
+    Scenario('topic-list'),
+    Scenario('topic-detail', kwargs=pk_of('topic'), requires=['topic']),
+    Scenario('tutortopic-list'),
+    Scenario('tutortopic-detail', kwargs=pk_of('tutor_topic'), requires=['tutor_topic']),
+    Scenario(
+        'tutortopic-remove-by-name', 'delete', actor='tutor',
+        data=lambda fixtures: {'topic_name': fixtures.tutor_topic.topic.name}, requires=['tutor_topic']
+    ),
+    Scenario('language-list'),
+    Scenario('language-detail', kwargs=pk_of('language'), requires=['language']),
+    Scenario('tutorlanguage-list'),
+    Scenario('tutorlanguage-detail', kwargs=pk_of('tutor_language'), requires=['tutor_language']),
+    Scenario('session-list'),
+    Scenario(
+        'session-list', 'post',
+        data=lambda fixtures: {
+            'tutor': fixtures.tutor.pk,
+            'date_time': fixtures.free_slot.isoformat(),
+            'duration': '01:00:00',
+            'topic': 'Benchmark'
+        },
+        requires=['tutor', 'free_slot']
+    ),
+    Scenario('session-detail', kwargs=pk_of('session'), requires=['session']),
+    Scenario(
+        'session-reschedule', 'post', actor='tutor', kwargs=pk_of('session'),
+        data=lambda fixtures: {'date_time': fixtures.free_slot.isoformat()}, requires=['session', 'free_slot'],
+        expected_status=200
+    ),
+    Scenario(
+        'session-reschedule', 'post', actor='tutor', kwargs=pk_of('session'),
+        data=lambda fixtures: {'date_time': fixtures.unavailable_slot.isoformat()},
+        requires=['session', 'unavailable_slot'], expected_status=400, expected_code='unavailable',
+        label='unavailable'
+    ),
+    Scenario(
+        'session-reschedule-response', 'post', actor='reschedule_student', kwargs=pk_of('reschedule_session'),
+        data=lambda fixtures: {'response': 'accept'}, requires=['reschedule_session']
+    ),
+    Scenario(
+        'session-update-status', 'post', actor='tutor', kwargs=pk_of('pending_session'),
+        data=lambda fixtures: {'status': 'confirmed'}, requires=['pending_session']
+    ),
+    Scenario('availability-list'),
+    Scenario('availability-detail', kwargs=pk_of('availability'), requires=['availability']),
+    Scenario('availability-rule-list', actor='tutor'),
+    Scenario('availability-rule-detail', actor='tutor', kwargs=pk_of('rule'), requires=['rule']),
+    Scenario(
+        'availability-rule-exceptions', 'post', actor='tutor', kwargs=pk_of('rule'),
+        data=lambda fixtures: {'date': (timezone.localdate() + timedelta(days=7)).isoformat()}, requires=['rule']
+    ),
+    Scenario('message-list', params=lambda fixtures: {'receiver': fixtures.partner.pk}, requires=['partner']),
+    Scenario(
+        'message-list', 'post',
+        data=lambda fixtures: {'receiver': fixtures.partner.pk, 'message': 'Benchmark message'}, requires=['partner']
+    ),
+    Scenario(
+        'message-detail', kwargs=pk_of('message'), params=lambda fixtures: {'receiver': fixtures.partner.pk},
+        requires=['message']
+    ),
+    Scenario('message-thread', params=lambda fixtures: {'receiver': fixtures.partner.pk}, requires=['partner']),
+    Scenario('message-get-conversations', params=lambda fixtures: {'limit': 20}),
+    Scenario(
+        'message-mark-messages-read', 'post', data=lambda fixtures: {'sender_id': fixtures.partner.pk}, requires=['partner']
+    ),
+    Scenario('message-unread-messages-count'),
+    Scenario('notification-list'),
+    Scenario('notification-detail', kwargs=pk_of('notification'), requires=['notification']),
+    Scenario('notification-unread-count'),
+    Scenario('notification-mark-as-read', 'post', kwargs=pk_of('notification'), requires=['notification']),
+    Scenario('notification-mark-all-as-read', 'post'),
+    Scenario('notification-delete-notification', 'delete', kwargs=pk_of('notification'), requires=['notification']),
+    Scenario(
+        'user-register', 'post', actor=None,
+        data=lambda fixtures: {
+            'username': 'benchmark_user',
+            'email': 'benchmark_user@example.com',
+            'password': DEFAULT_PASSWORD,
+            'roles': ['Student']
+        }
+    ),
+    Scenario('tutor-list', actor=None),
+    Scenario('tutor-list', actor=None, params=lambda fixtures: {'mode': 'webcam', 'min_rating': 3}),
+    Scenario('tutor-search', actor=None, params=lambda fixtures: {'q': fixtures.tutor_topic.topic.name}, requires=['tutor_topic']),
+    Scenario(
+        'tutor-available', actor=None,
+        params=lambda fixtures: {
+            'start': fixtures.free_slot.isoformat(),
+            'end': (fixtures.free_slot + timedelta(hours=1)).isoformat()
+        },
+        requires=['free_slot']
+    ),
+    Scenario('tutor-calendar', actor=None, kwargs=pk_of('tutor', 'tutor_id'), requires=['tutor']),
+    Scenario('user-profile'),
+    Scenario(
+        'user-profile-by-username', actor=None,
+        kwargs=lambda fixtures: {'username': fixtures.tutor.username}, requires=['tutor']
+    ),
+    Scenario('update-role', 'put', data=lambda fixtures: {'roles': ['Student']}),
+    Scenario('tutor-reviews', actor=None, kwargs=pk_of('tutor', 'tutor_id'), requires=['tutor']),
+    Scenario(
+        'submit-review', 'post',
+        data=lambda fixtures: {'session_id': fixtures.unreviewed_session.pk, 'rating': 5, 'comment': 'Benchmark'},
+        requires=['unreviewed_session']
+    ),
+    Scenario('check-review-exists', kwargs=pk_of('session', 'session_id'), requires=['session']),
+    Scenario('reviewed-tutors'),
+    Scenario('set-availability', params=lambda fixtures: {'tutor': fixtures.tutor.pk}, requires=['tutor']),
+    Scenario(
+        'set-availability', 'post', actor='tutor',
+        data=lambda fixtures: [{
+            'available_date': (timezone.localdate() + timedelta(days=30)).isoformat(),
+            'available_time_start': '19:00',
+            'available_time_end': '21:00'
+        }]
+    ),
+    Scenario(
+        'change-password', 'post',
+        data=lambda fixtures: {'current_password': DEFAULT_PASSWORD, 'new_password': 'Benchmark-password-42'}
+    ),
+    Scenario('metrics', actor=None),
+]
+
+
+def route_names(patterns=None):
+    """Names of every route in core.urls"""
+    names = set()
+    for pattern in urls.urlpatterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def percentile(samples, percent):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method='inclusive')[percent - 1]
+
+
+def timed_request(client, method, url, data):
+    """Handle one request inside a rolled back transaction, returning the response and the elapsed seconds"""
+    with transaction.atomic():
+        started = time.perf_counter()
+        response = getattr(client, method)(url, data, format='json')
+        elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return response, elapsed
+
+
+def run_scenario(scenario, fixtures, iterations):
+    client = APIClient()
+    actor = getattr(fixtures, scenario.actor) if scenario.actor else None
+    if actor:
+        client.force_authenticate(actor)
+
+    url = scenario.url(fixtures)
+    data = scenario.data(fixtures) if scenario.data else None
+
+    # The first request warms caches and is the one whose queries are counted. The query log is bounded, so it
+    # is emptied first for the count to be right after many queries
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        response, _ = timed_request(client, scenario.method, url, data)
+    # Read now: the captured queries are a view of the query log, which the next requests reset
+    query_count = sum(1 for query in queries.captured_queries if query['sql'] not in TRANSACTION_STATEMENTS)
+
+    timings = [timed_request(client, scenario.method, url, data)[1] * 1000 for _ in range(iterations)]
+
+    # Measured apart from the timings, since tracing allocations slows every request down
+    tracemalloc.start()
+    try:
+        timed_request(client, scenario.method, url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'url': url,
+        'status': response.status_code,
+        'queries': query_count,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+    # Error code of the structured error responses, e.g. of core.booking
+    if isinstance(getattr(response, 'data', None), dict) and 'code' in response.data:
+        result['code'] = response.data['code']
+    return result
+
+
+def is_success(result):
+    return 200 <= result['status'] < 300
+
+
+def run_benchmarks(iterations=20, only=None, log=None):
+    """
+    Run every scenario (or those whose route name or key contains one of `only`), returning the results per
+    scenario key, the skipped scenario keys, the keys of the scenarios that got another status than expected
+    (measuring another code path than intended) and the routes of core.urls no scenario covers.
+    """
+    log = log or (lambda message: None)
+    fixtures = Fixtures()
+    results, skipped, failed = {}, [], []
+
+    # As in production and in the test runner: with DEBUG, every query is kept and every request slowed down
+    with override_settings(DEBUG=False):
+        for scenario in SCENARIOS:
+            if only and not any(part in scenario.key for part in only):
+                continue
+            if any(getattr(fixtures, fixture) is None for fixture in scenario.requires):
+                skipped.append(scenario.key)
+                continue
+
+            key = scenario.key
+            # Several scenarios of the same route (e.g. with different filters) are told apart by their URL
+            if key in results:
+                key = f'{key} {scenario.url(fixtures)}'
+            results[key] = run_scenario(scenario, fixtures, iterations)
+            log(f"{key}: {results[key]['queries']} queries, p50 {results[key]['p50_ms']} ms, p95 {results[key]['p95_ms']} ms")
+            if not scenario.is_expected(results[key]):
+                failed.append(key)
+                log(f"{key}: status {results[key]['status']} {results[key].get('code', '')}, expected {scenario.expected}")
+
+    uncovered = sorted(route_names() - {scenario.name for scenario in SCENARIOS})
+    return results, skipped, failed, uncovered
+
+
+def compare(results, baseline, latency_tolerance=0.25, memory_tolerance=0.25, latency_floor_ms=1.0, memory_floor_kb=64):
+    """
+    Regressions of the results against a baseline report: any additional query, and latency or peak memory growing
+    by more than the tolerance (changes below latency_floor_ms and memory_floor_kb are ignored as noise).
+    """
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get('results', {}).get(key)
+        if previous is None:
+            continue
+        # Another status means another code path: the numbers are not comparable
+        if result['status'] != previous['status']:
+            regressions.append(f"{key}: status {previous['status']} -> {result['status']}")
+            continue
+
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{key}: {previous['queries']} -> {result['queries']} queries")
+
+        p95, previous_p95 = result['p95_ms'], previous['p95_ms']
+        if p95 > previous_p95 * (1 + latency_tolerance) and p95 - previous_p95 > latency_floor_ms:
+            regressions.append(f'{key}: p95 {previous_p95} -> {p95} ms')
+
+        peak, previous_peak = result['peak_memory_kb'], previous['peak_memory_kb']
+        if peak > previous_peak * (1 + memory_tolerance) and peak - previous_peak > memory_floor_kb:
+            regressions.append(f'{key}: peak memory {previous_peak} -> {peak} KB')
+
+    return regressions
@@ -0,0 +1,155 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+from core import metrics
+from core.models import (
+    Availability, AvailabilityException, AvailabilityRule, CustomUser, Notification, Session, SessionOverlapError
+)
+
+"""
+This module is the single booking path for new sessions.
+
+validate_booking() evaluates every rule a booking must satisfy (tutor role, no earlier rejection of the same slot,
+availability from one-off slots or weekly rules, no overlap with the tutor's active sessions) in one SQL statement,
+and reports all failures as structured reasons. create_booking() runs it, inserts the session and notifies the tutor
+in one transaction. validate_reschedule() runs the availability and overlap rules for a session's new time.
+"""
+REASON_MESSAGES = {
+    'past': "Cannot book sessions in the past",
+    'not_tutor': "Invalid tutor ID or user is not a tutor",
+    'rejected_before': "This booking request was previously denied by the tutor. Please select a different time slot.",
+    'unavailable': "Tutor is not available at this time. Please select a different time slot.",
+    'overlap': "This time slot is already booked",
+}
+
+# A rejected request blocks new requests from the same student within this distance of its start time
+REJECTION_WINDOW = timedelta(minutes=30)
+
+
+class BookingError(Exception):
+    def __init__(self, reasons):
+        self.reasons = reasons
+        self.reason = reasons[0]
+        super().__init__(REASON_MESSAGES[self.reason])
+
+    @property
+    def status_code(self):
+        # An overlap is a conflict with another booking, the other reasons are invalid requests
+        return 409 if self.reason == 'overlap' else 400
+
+    def as_response_data(self):
+        return {'error': str(self), 'code': self.reason, 'reasons': self.reasons}
+
+
+def booking_checks(tutor_id, student_id, date_time, duration, exclude_session_id=None):
+    """
+    Evaluate the booking rules in one query. Returns None if the tutor does not exist, otherwise a dict of
+    is_tutor, rejected_before, available and overlaps flags.
+    """
+    local_start = timezone.localtime(date_time) if timezone.is_aware(date_time) else date_time
+    local_end = local_start + duration
+    day, time_start, time_end = local_start.date(), local_start.time(), local_end.time()
+
+    one_off = Availability.objects.filter(
+        tutor=OuterRef('pk'),
+        available_date=day,
+        available_time_start__lte=time_start,
+        available_time_end__gte=time_end
+    )
+    rule = AvailabilityRule.objects.filter(
+        Q(valid_until__isnull=True) | Q(valid_until__gte=day),
+        tutor=OuterRef('pk'),
+        valid_from__lte=day,
+        start_time__lte=time_start,
+        end_time__gte=time_end
+    ).annotate(
+        on_weekday=F('weekdays').bitand(1 << day.weekday())
+    ).filter(on_weekday__gt=0).exclude(
+        Exists(AvailabilityException.objects.filter(rule=OuterRef('pk'), date=day))
+    )
+    overlapping = Session.objects.overlapping(OuterRef('pk'), date_time, duration)
+    if exclude_session_id:
+        overlapping = overlapping.exclude(pk=exclude_session_id)
+
+    checks = CustomUser.objects.filter(pk=tutor_id).annotate(
+        is_tutor=Exists(CustomUser.roles.through.objects.filter(customuser_id=OuterRef('pk'), role__name='Tutor')),
+        rejected_before=Exists(Session.objects.filter(
+            tutor=OuterRef('pk'),
+            student_id=student_id,
+            status='rejected',
+            date_time__range=(date_time - REJECTION_WINDOW, date_time + REJECTION_WINDOW)
+        )),
+        has_one_off=Exists(one_off),
+        has_rule=Exists(rule),
+        overlaps=Exists(overlapping)
+    ).values('is_tutor', 'rejected_before', 'has_one_off', 'has_rule', 'overlaps').first()
+
+    if checks is None:
+        return None
+
+    return {
+        'is_tutor': checks['is_tutor'],
+        'rejected_before': checks['rejected_before'],
+        # Availability slots never span midnight
+        'available': (checks['has_one_off'] or checks['has_rule']) and local_end.date() == day,
+        'overlaps': checks['overlaps'],
+    }
+
+
+def validate_booking(tutor_id, student_id, date_time, duration, exclude_session_id=None):
+    """Raise a BookingError listing every rule the booking breaks"""
+    reasons = []
+    if date_time < timezone.now():
+        reasons.append('past')
+
+    checks = booking_checks(tutor_id, student_id, date_time, duration, exclude_session_id)
+    if checks is None or not checks['is_tutor']:
+        reasons.append('not_tutor')
+    else:
+        if checks['rejected_before']:
+            reasons.append('rejected_before')
+        if not checks['available']:
+            reasons.append('unavailable')
+        if checks['overlaps']:
+            reasons.append('overlap')
+
+    if reasons:
+        raise BookingError(reasons)
+
+
+def validate_reschedule(session, date_time):
+    """Raise a BookingError unless the session's tutor is available and free for it at date_time"""
+    checks = booking_checks(session.tutor_id, session.student_id, date_time, session.duration, session.pk)
+    reasons = []
+    if not checks['available']:
+        reasons.append('unavailable')
+    if checks['overlaps']:
+        reasons.append('overlap')
+
+    if reasons:
+        raise BookingError(reasons)
+
+
+def create_booking(student, tutor, date_time, duration, **fields):
+    """Validate and create a pending session requested by the student, and notify the tutor"""
+    try:
+        with transaction.atomic():
+            validate_booking(tutor.id, student.id, date_time, duration)
+
+            session = Session(student=student, tutor=tutor, date_time=date_time, duration=duration, **fields)
+            # Already validated above, Session.clean() only needs to re-run its checks outside this path
+            session._booking_validated = True
+            try:
+                session.save()
+            except SessionOverlapError:
+                # A concurrent booking took the slot between the check and the insert
+                raise BookingError(['overlap'])
+
+            Notification.create_booking_request(session)
+    except BookingError as e:
+        metrics.BOOKINGS.inc(outcome=e.reason)
+        raise
+
+    metrics.BOOKINGS.inc(outcome='success')
+    return session
@@ -0,0 +1,44 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from core import metrics
+from core.auth import TOKEN_SUBPROTOCOL
+from core.presence import presence
+from core.realtime import user_group
+
+"""
+This module contains the WebSocket consumers that push real-time events to the frontend.
+"""
+class UserEventsConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Per-user event stream. Authenticated clients receive every event published to their user group
+    (see core.realtime) as a JSON object with a `type` key.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            # 4401 mirrors HTTP 401 in the application-defined close code range
+            await self.close(code=4401)
+            return
+
+        self.group_name = user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        # Browsers drop the connection unless the server selects one of the subprotocols they offered
+        await self.accept(TOKEN_SUBPROTOCOL if TOKEN_SUBPROTOCOL in self.scope.get('subprotocols', []) else None)
+        metrics.WEBSOCKET_CONNECTIONS.inc()
+        presence.touch(user.id)
+
+    async def disconnect(self, code):
+        if hasattr(self, 'group_name'):
+            metrics.WEBSOCKET_CONNECTIONS.dec()
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Any client frame counts as a presence heartbeat
+        presence.touch(self.scope['user'].id)
+
+        # Clients may ping to keep intermediaries from closing idle connections
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def user_event(self, event):
+        await self.send_json(event['event'])
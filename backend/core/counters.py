@@ -0,0 +1,75 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+"""
+This module keeps per-user unread counters for messages and notifications in the cache, so that badge polling
+reads a single cache key instead of counting rows.
+
+Counters are adjusted when messages and notifications are created or read, once the transaction commits.
+A missing counter is never adjusted: it is rebuilt from the database the next time it is read, which is also how
+counters recover from a cache flush or eviction. Adjustments are only visible to processes sharing the cache,
+so multi-process deployments must configure a shared backend (see CACHES in the settings).
+"""
+MESSAGES = 'messages'
+NOTIFICATIONS = 'notifications'
+
+# Bounds the drift of a counter that was changed outside the tracked paths (e.g. in the admin)
+COUNTER_TIMEOUT = 60 * 60
+
+
+def counter_key(kind, user_id):
+    return f'unread:{kind}:{user_id}'
+
+
+def count_from_database(kind, user_id):
+    from core.models import Conversation, Notification
+
+    if kind == MESSAGES:
+        # The conversations carry per-user unread counters, far fewer rows than the messages themselves
+        return Conversation.objects.unread_total(user_id)
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+
+def unread_count(kind, user_id):
+    """The user's number of unread messages or notifications, rebuilt from the database on a cache miss"""
+    key = counter_key(kind, user_id)
+    count = cache.get(key)
+    if count is None:
+        count = count_from_database(kind, user_id)
+        # add() rather than set(), so that a counter adjusted since the miss is not overwritten
+        cache.add(key, count, timeout=COUNTER_TIMEOUT)
+    return max(count, 0)
+
+
+async def aunread_count(kind, user_id):
+    """Async variant of unread_count(), for async views"""
+    key = counter_key(kind, user_id)
+    count = await cache.aget(key)
+    if count is None:
+        count = await sync_to_async(count_from_database)(kind, user_id)
+        await cache.aadd(key, count, timeout=COUNTER_TIMEOUT)
+    return max(count, 0)
+
+
+def adjust(kind, user_id, delta):
+    """Add delta to the user's counter once the current transaction commits"""
+    if not delta:
+        return
+
+    def apply():
+        key = counter_key(kind, user_id)
+        try:
+            count = cache.incr(key, delta)
+        except ValueError:
+            # Not cached: the next read rebuilds it from the database
+            return
+        if count < 0:
+            cache.delete(key)
+
+    transaction.on_commit(apply)
+
+
+def reset(kind, user_id):
+    """Drop the user's counter, for changes whose effect on it is unknown"""
+    transaction.on_commit(lambda: cache.delete(counter_key(kind, user_id)))
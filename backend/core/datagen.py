@@ -0,0 +1,623 @@
+import csv
+import io
+import math
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+from core import counters
+from core.availability import rules_version_key
+from core.models import (
+    Availability, AvailabilityRule, Conversation, CustomUser, Language, Message, Notification, Review, Role, Session,
+    Topic, TutorLanguage, TutorTopic
+)
+
+"""
+This module generates a synthetic dataset of any size for development, benchmarks and load tests.
+
+The data is derived from a random seed only (and the current date, so that sessions lie around today): every chunk
+of rows draws from its own generator seeded with (seed, table, chunk number), and users, sessions and messages get
+explicit ids, so the same seed and chunk size produce the same dataset whatever the number of worker processes.
+Rows are inserted with bulk_create (or COPY on PostgreSQL), so signals and per-row model logic do not run: the
+denormalized data they maintain (conversations, rating aggregates, search documents) is rebuilt in bulk at the end.
+"""
+TOPIC_NAMES = [
+    "Mathematics", "Spanish", "Singing", "English", "Piano",
+    "Guitar", "Flute", "Violin", "Chemistry", "Programming",
+    "French", "German", "Physics", "Biology", "History",
+    "Art History", "Japanese", "Italian", "Chinese", "Saxophone",
+    "Drums", "Trumpet", "Creative Writing", "Economics",
+    "Psychology", "Sociology", "Cooking", "Computer Science"
+]
+
+LANGUAGE_NAMES = [
+    "English", "French", "German", "Spanish", "Italian",
+    "Portuguese", "Russian", "Chinese", "Japanese", "Arabic",
+    "Hindi", "Dutch", "Swedish", "Norwegian", "Finnish"
+]
+
+FIRST_NAMES = [
+    "Anna", "Luca", "Sofia", "Noah", "Mia", "Elias", "Lea", "David", "Emma", "Jonas", "Laura", "Nina", "Marco",
+    "Chiara", "Louis", "Camille", "Felix", "Hannah", "Samuel", "Julia", "Omar", "Yuki", "Mateo", "Amira"
+]
+LAST_NAMES = [
+    "Meier", "Rossi", "Keller", "Dubois", "Huber", "Weber", "Schmid", "Brunner", "Frei", "Fischer", "Moreau",
+    "Bianchi", "Gerber", "Baumann", "Favre", "Bernasconi", "Steiner", "Graf", "Martin", "Wyss"
+]
+LOCATIONS = ["Zurich", "Geneva", "Basel", "Bern", "Lausanne", "Lugano", "Lucerne", "St. Gallen", "Winterthur", "Online"]
+
+# Text templates of the generated profiles, session notes, messages and reviews
+BIO_TEMPLATES = [
+    "Passionate about teaching {subject}. I have {years} years of experience and love helping students succeed.",
+    "Graduated from {university} with a degree in {subject}. {years} years of tutoring experience.",
+    "I believe learning should be enjoyable. Specializing in {subject} with a focus on making complex topics accessible.",
+    "Former {profession} now dedicated to tutoring {subject}. I bring real-world experience to my lessons.",
+    "PhD candidate at {university} researching {subject}. I enjoy breaking down complex ideas into simple concepts.",
+    "Certified teacher with {years} years of classroom experience in {subject}. I tailor my approach to each student's learning style.",
+    "I've helped over {number} students excel in {subject}. My teaching philosophy focuses on building confidence through understanding."
+]
+
+LESSON_DESCRIPTION_TEMPLATES = [
+    "My {subject} lessons focus on {approach}. We'll work through concepts step-by-step, with plenty of practice problems.",
+    "I structure my {subject} sessions to include theory, examples, and practical applications. Homework is provided between sessions.",
+    "My teaching method for {subject} combines {method1} and {method2}. Sessions are interactive and tailored to your goals.",
+    "I specialize in helping students overcome challenges with {subject}. We'll identify your weak points and strengthen them.",
+    "My {subject} lessons are designed to build a strong foundation and then advance to more complex topics. Perfect for beginners and intermediate learners."
+]
+
+UNIVERSITIES = [
+    "ETH Zurich", "University of Zurich", "EPFL", "University of Geneva",
+    "University of Basel", "University of Bern", "University of Lausanne",
+    "University of St. Gallen", "University of Fribourg", "University of Neuchâtel"
+]
+
+PROFESSIONS = [
+    "teacher", "researcher", "professor", "industry professional", "consultant",
+    "engineer", "scientist", "analyst", "programmer", "mathematician"
+]
+
+TEACHING_APPROACHES = [
+    "problem-solving", "conceptual understanding", "practical applications",
+    "visual learning", "interactive discussions", "structured practice"
+]
+
+TEACHING_METHODS = [
+    "visual aids", "real-world examples", "systematic exercises",
+    "mnemonic techniques", "guided discovery",
+    "project-based learning", "gamification", "flipped classroom"
+]
+
+SESSION_NOTES_TEMPLATES = [
+    "Would like to focus on {topic_aspect}. I'm preparing for an exam next month.",
+    "Need help with {topic_aspect}. I'm struggling with the concepts.",
+    "Looking forward to our session! I'd like to cover {topic_aspect} in detail.",
+    "Could we review my recent homework on {topic_aspect}? I got stuck on a few problems.",
+    "I have an essay due on {topic_aspect}. Would appreciate help with structure and arguments.",
+    "I'm a beginner in {topic}. Please start with the basics.",
+    "Advanced student looking to refine my skills in {topic_aspect}.",
+    "Need help preparing for my {topic} presentation next week.",
+    "Would like to practice conversational {topic} during our session.",
+    "Having trouble with {topic_aspect} exercises in my textbook."
+]
+
+TOPIC_ASPECTS = {
+    "Mathematics": ["calculus", "algebra", "trigonometry", "statistics", "geometry"],
+    "Spanish": ["verb conjugation", "conversation practice", "grammar", "vocabulary", "writing"],
+    "English": ["essay writing", "grammar", "literature analysis", "comprehension", "speaking"],
+    "Chemistry": ["organic chemistry", "equations", "lab reports", "molecular structures", "periodic table"],
+    "Programming": ["algorithms", "data structures", "debugging", "specific language syntax", "project planning"],
+    "Physics": ["mechanics", "thermodynamics", "electromagnetism", "quantum physics", "problem-solving"],
+    "Biology": ["cell biology", "genetics", "ecosystems", "human anatomy", "biochemistry"],
+    "History": ["world wars", "ancient civilizations", "political movements", "specific time periods", "historical analysis"],
+    "Economics": ["microeconomics", "macroeconomics", "market analysis", "economic policies", "financial concepts"]
+}
+
+DEFAULT_ASPECTS = ["fundamentals", "advanced concepts", "theory", "practical application", "exercises"]
+
+MESSAGE_TEMPLATES = [
+    # Initial contact
+    "Hi, I'm interested in booking a session for {topic}. Are you available this week?",
+    "Hello! I saw your profile and I think you could help me with {topic}. Do you have time to chat about it?",
+    "I need help with {topic}, specifically {aspect}. What's your availability like?",
+
+    # Replies
+    "Yes, I'm available on {day} at {time}. Would that work for you?",
+    "I'd be happy to help with {topic}! Could you tell me more about what you're struggling with?",
+    "Thanks for reaching out. I specialize in {topic} and would be glad to assist. What's your goal for our sessions?",
+
+    # Follow-ups
+    "That time works perfectly. Looking forward to our session!",
+    "Great! I'm specifically having trouble with {aspect}. Hope you can help me understand it better.",
+    "I've booked our session. Should I prepare anything in advance?",
+    "Could you recommend any resources I should look at before our session?",
+
+    # Practical
+    "Just checking if we're still on for tomorrow at {time}?",
+    "Sorry, something came up. Can we reschedule our session to next {day}?",
+    "I've uploaded some materials to review before our session. They should be in your dashboard.",
+    "I might be 5 minutes late to our session today. Hope that's okay!",
+
+    # Post-session
+    "Thank you for today's session! It was really helpful.",
+    "I'm still confused about {aspect}. Could we go over that again in our next session?",
+    "The exercises you gave me were excellent. I feel like I'm making progress.",
+    "Would you be available for a follow-up session next week?"
+]
+
+REVIEW_TEMPLATES = {
+    5: [
+        "Excellent tutor! {tutor_name} explained complex {topic} concepts clearly and with patience. I've improved significantly after just a few sessions!",
+        "I'm extremely impressed with {tutor_name}'s teaching style. The {topic} lessons were engaging and tailored to my needs. Highly recommend!",
+        "Best {topic} tutor I've had! {tutor_name} is knowledgeable, and makes learning very enjoyable. Will definitely book more sessions.",
+        "{tutor_name} is an exceptional tutor. The structured approach to {topic} helped me understand concepts I've been struggling with for months.",
+        "Amazing experience! {tutor_name} is passionate about {topic} and it shows in the quality of teaching. My grades have improved dramatically."
+    ],
+    4: [
+        "Very good tutor. {tutor_name} is a class act and was helpful and knowledgeable about {topic}. The session was productive and I learned a lot.",
+        "I enjoyed my {topic} session with {tutor_name}. Clear explanations and good teaching methods. Would book again!",
+        "{tutor_name} is a solid {topic} tutor. Well-prepared and attentive to my learning needs. Just a few connection issues but overall great.",
+        "Good experience learning {topic} with {tutor_name}. The session was well-structured and I gained new insights. Recommended.",
+        "I'm pleased with {tutor_name}'s tutoring style. My understanding of {topic} has improved, though we did rush through some sections."
+    ],
+    3: [
+        "Decent {topic} session with {tutor_name}. Some concepts were explained well while others could have used more clarity.",
+        "{tutor_name} is knowledgeable about {topic}, but the teaching pace was a bit fast for me. Still helpful overall.",
+        "Average experience. {tutor_name} knows {topic} well but could improve on his teaching methodology. Might try another session.",
+        "The {topic} session was helpful. {tutor_name} answered my questions, though sometimes the explanations were too technical.",
+        "{tutor_name} is punctual and prepared, but the session structure for {topic} could be better organized."
+    ],
+    2: [
+        "The {topic} session with {tutor_name} was below expectations. Explanations were often confusing.",
+        "{tutor_name} seemed knowledgeable but struggled to communicate {topic} concepts effectively. Disappointed.",
+        "Not the best experience. {tutor_name} was often distracted during our {topic} session and didn't answer questions clearly.",
+        "The tutoring style didn't work for me. {tutor_name}'s approach to {topic} was too disorganized.",
+        "Expected more from the session. {tutor_name} wasn't well-prepared to teach {topic} at my level."
+    ],
+    1: [
+        "Unfortunately, the {topic} session with {tutor_name} was not helpful at all. Very disappointed.",
+        "Poor experience. {tutor_name} was late, unprepared, and couldn't answer basic {topic} questions.",
+        "Would not recommend {tutor_name} for {topic}. The teaching approach was confusing and unhelpful.",
+        "The session was a waste of time and money. {tutor_name} didn't seem to understand {topic} fundamentals.",
+        "Very frustrated with this tutoring experience, {tutor_name} was unprofessional and the {topic} explanations turned out to be flat out incorrect."
+    ]
+}
+
+DEFAULT_PASSWORD = 'password123'
+
+# Every fourth user is a tutor
+TUTOR_EVERY = 4
+
+# Students a tutor teaches and writes with, so that messages are exchanged between people who had sessions
+CLIENTS_PER_TUTOR = 8
+
+# Start hours of a tutor's sessions, so that sessions of the same tutor never overlap
+SESSION_HOURS = (9, 12, 15)
+SESSION_DURATION = timedelta(hours=1)
+
+# One-off evening availability on top of the weekly rule, on this many days of the next AVAILABILITY_DAYS
+ONE_OFF_AVAILABILITIES = 2
+AVAILABILITY_DAYS = 30
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the given auto_now_add fields, passed as (model, field name) pairs"""
+    fields = [model._meta.get_field(name) for model, name in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def chunk_rng(seed, table, index):
+    return random.Random(f'{seed}:{table}:{index}')
+
+
+def person_name(seed, number):
+    """The first and last name of a generated user, derived from its number without any lookup"""
+    mixed = (number + seed) * 2654435761 % 2 ** 32
+    return FIRST_NAMES[mixed % len(FIRST_NAMES)], LAST_NAMES[mixed // len(FIRST_NAMES) % len(LAST_NAMES)]
+
+
+def tutor_topics(plan, number):
+    """The topics taught by the tutor with the given user number"""
+    rng = random.Random(f'{plan["seed"]}:topics:{number}')
+    return rng.sample(plan['topics'], rng.randint(1, 3))
+
+
+def tutor_number(index):
+    return index * TUTOR_EVERY
+
+
+def student_number(index):
+    # Students fill the gaps between tutors: 1, 2, 3, 5, 6, 7, 9...
+    return index + index // (TUTOR_EVERY - 1) + 1
+
+
+def client_index(plan, tutor_index, rng):
+    """A student of the tutor, drawn from a small group of students around the tutor's position"""
+    offset = tutor_index * plan['students'] // plan['tutors']
+    return (offset + rng.randrange(CLIENTS_PER_TUTOR)) % plan['students']
+
+
+def copy_insert(model, objects):
+    """Insert model instances with PostgreSQL COPY, faster than INSERT for large chunks"""
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objects:
+        row = []
+        for field in fields:
+            value = field.get_db_prep_save(field.pre_save(obj, True), connection)
+            row.append('\\N' if value is None else value)
+        writer.writerow(row)
+    buffer.seek(0)
+
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+
+
+def insert(plan, model, objects):
+    if not objects:
+        return
+    if plan['use_copy']:
+        copy_insert(model, objects)
+    else:
+        model.objects.bulk_create(objects)
+
+
+def next_id(model):
+    return (model.objects.aggregate(last_id=Max('id'))['last_id'] or 0) + 1
+
+
+def generate_bio(rng, topics):
+    return rng.choice(BIO_TEMPLATES).format(
+        subject=rng.choice(topics),
+        years=rng.randint(2, 15),
+        university=rng.choice(UNIVERSITIES),
+        profession=rng.choice(PROFESSIONS),
+        number=rng.randint(20, 150)
+    )
+
+
+def generate_lesson_description(rng, topics):
+    return rng.choice(LESSON_DESCRIPTION_TEMPLATES).format(
+        subject=rng.choice(topics),
+        approach=rng.choice(TEACHING_APPROACHES),
+        method1=rng.choice(TEACHING_METHODS),
+        method2=rng.choice(TEACHING_METHODS)
+    )
+
+
+def generate_session_notes(rng, topic):
+    # 40% of the sessions have notes
+    if rng.random() > 0.4:
+        return ''
+    return rng.choice(SESSION_NOTES_TEMPLATES).format(
+        topic=topic, topic_aspect=rng.choice(TOPIC_ASPECTS.get(topic, DEFAULT_ASPECTS))
+    )
+
+
+def create_users(plan, index, numbers):
+    """Create a chunk of users with their role, and the tutors among them with their profile and availability"""
+    rng = chunk_rng(plan['seed'], 'users', index)
+    prefix = plan['prefix']
+    users, roles, tutor_topic_rows, tutor_language_rows, rules, availabilities = [], [], [], [], [], []
+
+    for number in numbers:
+        user_id = plan['user_base'] + number
+        first_name, last_name = person_name(plan['seed'], number)
+        is_tutor = number % TUTOR_EVERY == 0
+        user = CustomUser(
+            id=user_id,
+            username=f'{prefix}{number}',
+            email=f'{prefix}{number}@example.com',
+            password=plan['password'],
+            first_name=first_name,
+            last_name=last_name,
+            location=rng.choice(LOCATIONS),
+            preferred_mode=rng.choice(['webcam', 'in-person', 'both']),
+            date_joined=plan['now'] - timedelta(days=rng.randint(30, 720))
+        )
+        users.append(user)
+        roles.append(CustomUser.roles.through(customuser_id=user_id, role_id=plan['roles']['Tutor' if is_tutor else 'Student']))
+        if not is_tutor:
+            continue
+
+        topics = tutor_topics(plan, number)
+        user.bio = generate_bio(rng, topics)
+        user.lesson_description = generate_lesson_description(rng, topics)
+        user.hourly_rate = Decimal(rng.randrange(2000, 9000, 500)) / 100
+        tutor_topic_rows.extend(TutorTopic(tutor_id=user_id, topic_id=plan['topic_ids'][topic]) for topic in topics)
+        tutor_language_rows.extend(
+            TutorLanguage(tutor_id=user_id, language_id=language_id)
+            for language_id in rng.sample(plan['language_ids'], rng.randint(1, 3))
+        )
+        # Every day from 9:00 to 18:00, plus a few one-off evenings
+        rules.append(AvailabilityRule(
+            tutor_id=user_id,
+            weekdays=AvailabilityRule.weekday_mask(range(7)),
+            start_time=time(9),
+            end_time=time(18),
+            valid_from=plan['start_date']
+        ))
+        availabilities.extend(
+            Availability(
+                tutor_id=user_id,
+                available_date=plan['today'] + timedelta(days=day),
+                available_time_start=time(18),
+                available_time_end=time(20)
+            )
+            for day in rng.sample(range(1, AVAILABILITY_DAYS + 1), ONE_OFF_AVAILABILITIES)
+        )
+
+    with transaction.atomic():
+        insert(plan, CustomUser, users)
+        # Through, topic and language rows are few per user and cheap to insert either way
+        CustomUser.roles.through.objects.bulk_create(roles)
+        TutorTopic.objects.bulk_create(tutor_topic_rows)
+        TutorLanguage.objects.bulk_create(tutor_language_rows)
+        AvailabilityRule.objects.bulk_create(rules)
+        Availability.objects.bulk_create(availabilities)
+
+
+def create_sessions(plan, index, numbers):
+    """
+    Create a chunk of sessions, spread over the tutors with each tutor's sessions taking consecutive slots from
+    start_date on, with their booking notifications and reviews
+    """
+    rng = chunk_rng(plan['seed'], 'sessions', index)
+    now = plan['now']
+    sessions, notifications, reviews = [], [], []
+
+    for number in numbers:
+        tutor_index = number % plan['tutors']
+        slot = number // plan['tutors']
+        day = plan['start_date'] + timedelta(days=slot // len(SESSION_HOURS))
+        date_time = timezone.make_aware(datetime.combine(day, time(SESSION_HOURS[slot % len(SESSION_HOURS)])))
+        tutor = tutor_number(tutor_index)
+        topic = rng.choice(tutor_topics(plan, tutor))
+
+        if date_time < now:
+            status = rng.choices(['completed', 'cancelled', 'rejected'], weights=[8, 1, 1])[0]
+        else:
+            status = rng.choices(['pending', 'confirmed', 'reschedule_pending', 'cancelled'], weights=[3, 6, 1, 1])[0]
+        notes = generate_session_notes(rng, topic)
+        if status == 'reschedule_pending':
+            new_date = date_time + timedelta(days=rng.randint(1, 14))
+            notes = f"{notes}\n[RESCHEDULE_REQUEST]{new_date.isoformat()}".strip()
+
+        session = Session(
+            id=plan['session_base'] + number,
+            tutor_id=plan['user_base'] + tutor,
+            student_id=plan['user_base'] + student_number(client_index(plan, tutor_index, rng)),
+            date_time=date_time,
+            duration=SESSION_DURATION,
+            topic=topic,
+            mode=rng.choice(['webcam', 'in-person']),
+            status=status,
+            notes=notes,
+            created_at=date_time - timedelta(days=rng.randint(1, 14))
+        )
+        sessions.append(session)
+
+        notifications.append(Notification(
+            recipient_id=session.tutor_id,
+            notification_type='booking_request',
+            title='New Booking Request',
+            message=f'New booking request for {topic}.',
+            related_session_id=session.id,
+            session_status='pending',
+            is_read=status != 'pending',
+            created_at=session.created_at
+        ))
+        if status in ('confirmed', 'completed'):
+            notifications.append(Notification(
+                recipient_id=session.student_id,
+                notification_type='booking_confirmed',
+                title='Booking Confirmed',
+                message=f'Your {topic} session has been confirmed.',
+                related_session_id=session.id,
+                session_status='confirmed',
+                is_read=date_time < now,
+                created_at=session.created_at + timedelta(hours=rng.randint(1, 24))
+            ))
+        if status == 'completed' and rng.random() < 0.6:
+            rating = rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 8, 10])[0]
+            reviews.append(Review(
+                session_id=session.id,
+                rating=rating,
+                comment=rng.choice(REVIEW_TEMPLATES[rating]).format(tutor_name=person_name(plan['seed'], tutor)[0], topic=topic),
+                created_at=date_time + SESSION_DURATION
+            ))
+
+    with transaction.atomic(), explicit_timestamps((Session, 'created_at'), (Notification, 'created_at'), (Review, 'created_at')):
+        insert(plan, Session, sessions)
+        insert(plan, Notification, notifications)
+        insert(plan, Review, reviews)
+
+
+def create_messages(plan, index, numbers):
+    """Create a chunk of messages between tutors and their students, oldest first, all but the latest ones read"""
+    rng = chunk_rng(plan['seed'], 'messages', index)
+    count = plan['messages']
+    interval = timedelta(minutes=1)
+    start = plan['now'] - interval * count
+    messages = []
+
+    for number in numbers:
+        tutor_index = rng.randrange(plan['tutors'])
+        tutor = tutor_number(tutor_index)
+        topic = rng.choice(tutor_topics(plan, tutor))
+        sender_id = plan['user_base'] + student_number(client_index(plan, tutor_index, rng))
+        receiver_id = plan['user_base'] + tutor
+        if rng.random() < 0.5:
+            sender_id, receiver_id = receiver_id, sender_id
+        messages.append(Message(
+            # Ids follow timestamps, so the highest id of a conversation is its latest message
+            id=plan['message_base'] + number,
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+            message=rng.choice(MESSAGE_TEMPLATES).format(
+                topic=topic,
+                aspect=rng.choice(TOPIC_ASPECTS.get(topic, DEFAULT_ASPECTS)),
+                day=rng.choice(DAYS),
+                time=f'{rng.randint(8, 20)}:{rng.choice(["00", "30"])}'
+            ),
+            timestamp=start + interval * number,
+            is_read=number < count * 0.95 or rng.random() < 0.5
+        ))
+
+    with transaction.atomic(), explicit_timestamps((Message, 'timestamp')):
+        insert(plan, Message, messages)
+
+
+def run_chunks(function, plan, count, chunk_size, workers):
+    """Run function(plan, chunk number, row numbers) over count rows, in worker processes if workers > 1"""
+    tasks = [(plan, index, numbers) for index, numbers in enumerate(chunks(range(count), chunk_size))]
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            function(*task)
+        return
+
+    # Forked workers must not share the parent's database connection, each one opens its own
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        for _ in pool.map(function, *zip(*tasks)):
+            pass
+
+
+def reset_sequences(*models):
+    """Move the id sequences past the explicitly inserted ids (SQLite keeps track of them by itself)"""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def forget_cached_state(user_base, users, batch_size=5000):
+    """
+    Drop what the cache may still hold for the generated user ids (reused when earlier users were deleted):
+    unread counters and availability rule versions. The rest of the cache, shared with running servers, is kept.
+    """
+    for offset in range(0, users, batch_size):
+        user_ids = range(user_base + offset, user_base + min(offset + batch_size, users))
+        cache.delete_many([
+            key
+            for user_id in user_ids
+            for key in (
+                counters.counter_key(counters.MESSAGES, user_id),
+                counters.counter_key(counters.NOTIFICATIONS, user_id),
+                rules_version_key(user_id),
+            )
+        ])
+
+
+def rebuild_conversations(batch_size=5000):
+    """Recreate every materialized conversation from the messages table with one grouped query"""
+    Conversation.objects.all().delete()
+    rows = Message.objects.annotate(
+        pair_a=Least('sender_id', 'receiver_id'),
+        pair_b=Greatest('sender_id', 'receiver_id')
+    ).values('pair_a', 'pair_b').annotate(
+        last_message_id=Max('id'),
+        last_timestamp=Max('timestamp'),
+        unread_a=Count('id', filter=Q(is_read=False, receiver_id=F('pair_a'))),
+        unread_b=Count('id', filter=Q(is_read=False, receiver_id=F('pair_b')))
+    ).order_by()
+
+    # Messages are generated with ids in timestamp order, so the highest id of a pair is its latest message
+    Conversation.objects.bulk_create(
+        [
+            Conversation(
+                user_a_id=row['pair_a'],
+                user_b_id=row['pair_b'],
+                last_message_id=row['last_message_id'],
+                last_timestamp=row['last_timestamp'],
+                unread_a=row['unread_a'],
+                unread_b=row['unread_b']
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=batch_size
+    )
+
+
+def generate_dataset(users, sessions, messages, seed=0, prefix='user', chunk_size=5000, workers=1, use_copy=False, log=None):
+    """
+    Generate `users` users (a quarter of them tutors) with profiles and availability, `sessions` sessions with
+    their notifications and reviews, and `messages` messages between tutors and their students.
+
+    Chunks of `chunk_size` rows are inserted by `workers` processes (SQLite, which has a single writer, always
+    uses one), with COPY instead of INSERT if `use_copy` is set (PostgreSQL only).
+    """
+    log = log or (lambda message: None)
+    if connection.vendor == 'sqlite':
+        workers = 1
+
+    tutors = len(range(0, users, TUTOR_EVERY))
+    # Sessions start early enough that about half of them are in the past
+    days_per_tutor = math.ceil(sessions / max(tutors, 1) / len(SESSION_HOURS))
+    today = timezone.localdate()
+
+    topic_ids = {name: Topic.objects.get_or_create(name=name)[0].id for name in TOPIC_NAMES}
+    plan = {
+        'seed': seed,
+        'prefix': prefix,
+        'use_copy': use_copy,
+        'now': timezone.now(),
+        'today': today,
+        'start_date': today - timedelta(days=days_per_tutor // 2),
+        'tutors': tutors,
+        'students': users - tutors,
+        'messages': messages,
+        # Hashing is deliberately slow, every generated user shares one hash of the same password
+        'password': make_password(DEFAULT_PASSWORD),
+        'roles': dict(Role.objects.filter(name__in=['Tutor', 'Student']).values_list('name', 'id')),
+        'topics': list(topic_ids),
+        'topic_ids': topic_ids,
+        'language_ids': [Language.objects.get_or_create(name=name)[0].id for name in LANGUAGE_NAMES],
+        'user_base': next_id(CustomUser),
+        'session_base': next_id(Session),
+        'message_base': next_id(Message),
+    }
+
+    log(f'Creating {users} users')
+    run_chunks(create_users, plan, users, chunk_size, workers)
+    if tutors and plan['students']:
+        log(f'Creating {sessions} sessions')
+        run_chunks(create_sessions, plan, sessions, chunk_size, workers)
+        log(f'Creating {messages} messages')
+        run_chunks(create_messages, plan, messages, chunk_size, workers)
+    reset_sequences(CustomUser, Session, Message)
+
+    log('Rebuilding conversations, ratings and search documents')
+    rebuild_conversations(chunk_size)
+    call_command('recompute_ratings', stdout=io.StringIO())
+    call_command('rebuild_search_index', stdout=io.StringIO())
+    forget_cached_state(plan['user_base'], users)
@@ -0,0 +1,135 @@
+import django_filters
+from django.db.models import CharField, Count, Exists, F, OuterRef, Value
+from django.db.models.functions import Cast
+from rest_framework.exceptions import ValidationError
+from core.availability import AvailabilityWindowError, find_available_tutors
+from core.models import CustomUser, TutorLanguage, TutorTopic
+
+"""
+This module contains the django-filter FilterSets used by the tutor discovery endpoints.
+
+TutorFilterSet narrows tutors by topic, language, hourly rate, teaching mode, minimum rating and availability.
+facet_counts() returns, for the same request, how many tutors each topic, language and mode would match,
+computed in a single grouped query. The availability filter is the only one evaluated in Python (see
+core.availability): it runs once per request, and its tutor ids are shared by the list and the facets.
+"""
+MODE_CHOICES = CustomUser._meta.get_field('preferred_mode').choices
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
+class TutorFilterSet(django_filters.FilterSet):
+    """
+    Query parameters:
+    - topic, language: comma separated ids, tutors matching any of them
+    - min_rate, max_rate: hourly rate range
+    - mode: 'webcam' or 'in-person' also match tutors teaching both ways
+    - min_rating: minimum average rating
+    - available_after, available_before: ISO datetimes of a window the tutor is free for entirely (see core.availability)
+    """
+    topic = NumberInFilter(method='filter_topic')
+    language = NumberInFilter(method='filter_language')
+    min_rate = django_filters.NumberFilter(field_name='hourly_rate', lookup_expr='gte')
+    max_rate = django_filters.NumberFilter(field_name='hourly_rate', lookup_expr='lte')
+    mode = django_filters.ChoiceFilter(choices=MODE_CHOICES, method='filter_mode')
+    min_rating = django_filters.NumberFilter(field_name='average_rating', lookup_expr='gte')
+    available = django_filters.IsoDateTimeFromToRangeFilter(method='filter_available')
+
+    class Meta:
+        model = CustomUser
+        fields = []
+
+    def filter_topic(self, queryset, name, value):
+        # Exists instead of a join, so that tutors with several matching topics are not duplicated
+        return queryset.filter(Exists(TutorTopic.objects.filter(tutor=OuterRef('pk'), topic_id__in=value)))
+
+    def filter_language(self, queryset, name, value):
+        return queryset.filter(Exists(TutorLanguage.objects.filter(tutor=OuterRef('pk'), language_id__in=value)))
+
+    def filter_mode(self, queryset, name, value):
+        if value == 'both':
+            return queryset.filter(preferred_mode='both')
+        return queryset.filter(preferred_mode__in=[value, 'both'])
+
+    def filter_available(self, queryset, name, value):
+        start, end = value.start, value.stop
+        if not start or not end:
+            raise ValidationError({'available': 'Both available_after and available_before are required'})
+
+        return queryset.filter(pk__in=self.available_tutor_ids(start, end))
+
+    def available_tutor_ids(self, start, end):
+        """
+        Ids of the tutors free for the whole window: covered by availability and not booked.
+
+        The interval search loads the window's slots and sessions of every tutor, so it runs once per request and
+        window, and the result is shared by the filtersets of the same request (the list and its facets).
+        """
+        memo = getattr(self.request, '_available_tutor_ids', None) if self.request is not None else None
+        if memo is None:
+            memo = {}
+            if self.request is not None:
+                self.request._available_tutor_ids = memo
+
+        if (start, end) not in memo:
+            try:
+                available = find_available_tutors(start, end, end - start, tutors=CustomUser.objects.tutors().values('pk'))
+            except AvailabilityWindowError as e:
+                raise ValidationError({'available': str(e)})
+            memo[start, end] = list(available)
+        return memo[start, end]
+
+
+FACETS = (
+    # (facet name, filter it ignores, related rows, value field, label field)
+    ('topics', 'topic', TutorTopic.objects, 'topic_id', 'topic__name'),
+    ('languages', 'language', TutorLanguage.objects, 'language_id', 'language__name'),
+)
+
+
+def facet_counts(data, queryset, request=None):
+    """
+    Count the tutors matching each topic, language and mode.
+
+    Each facet ignores its own filter (so that selecting a topic still shows the counts of the other topics),
+    and all facets are combined into one UNION query. Pass the request to reuse the availability search of the
+    list it belongs to.
+    """
+    def matching_ids(ignored_filter):
+        facet_data = data.copy()
+        facet_data.pop(ignored_filter, None)
+        filterset = TutorFilterSet(facet_data, queryset=queryset, request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return filterset.qs.values('pk')
+
+    branches = [
+        related.filter(tutor_id__in=matching_ids(ignored_filter)).annotate(
+            facet=Value(facet),
+            value=Cast(value_field, CharField()),
+            label=F(label_field)
+        ).values('facet', 'value', 'label').annotate(count=Count('tutor_id', distinct=True)).order_by()
+        for facet, ignored_filter, related, value_field, label_field in FACETS
+    ]
+    branches.append(
+        CustomUser.objects.filter(pk__in=matching_ids('mode')).annotate(
+            facet=Value('modes'),
+            value=F('preferred_mode'),
+            label=F('preferred_mode')
+        ).values('facet', 'value', 'label').annotate(count=Count('pk')).order_by()
+    )
+
+    facets = {'topics': [], 'languages': [], 'modes': []}
+    mode_names = dict(MODE_CHOICES)
+    for row in branches[0].union(*branches[1:], all=True):
+        if row['facet'] == 'modes':
+            entry = {'value': row['value'], 'name': mode_names.get(row['value'], row['value'])}
+        else:
+            entry = {'value': int(row['value']), 'name': row['label']}
+        facets[row['facet']].append({**entry, 'count': row['count']})
+
+    for entries in facets.values():
+        entries.sort(key=lambda entry: (-entry['count'], entry['name']))
+    return facets
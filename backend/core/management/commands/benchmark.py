@@ -0,0 +1,116 @@
+import json
+import platform
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from core.benchmarks import compare, run_benchmarks
+from core.datagen import generate_dataset
+from core.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Django command that benchmarks every API route: query count, p50/p95 latency and peak memory per route.
+
+    By default the benchmark runs in a throwaway test database seeded with a synthetic dataset of the requested
+    scale (--keepdb keeps it, and its data, for the next run). --current-db benchmarks the configured database
+    as it is instead. The report is written as JSON. The command fails when a scenario gets an error response, and
+    --compare fails on regressions against a previous report.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users to generate (e.g. 10000)')
+        parser.add_argument('--sessions', type=int, default=10000, help='Sessions to generate (e.g. 100000)')
+        parser.add_argument('--messages', type=int, default=50000, help='Messages to generate (e.g. 1000000)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the generated dataset')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per route')
+        parser.add_argument('--only', nargs='+', help='Only run scenarios whose method and route name contain one of these')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the seeded test database between runs')
+        parser.add_argument('--current-db', action='store_true', help='Benchmark the configured database without seeding')
+        parser.add_argument('--output', default='benchmark.json', help='Path of the JSON report')
+        parser.add_argument('--compare', metavar='BASELINE', help='JSON report to compare the results against')
+        parser.add_argument('--latency-tolerance', type=float, default=0.25, help='Allowed relative p95 latency growth')
+        parser.add_argument('--memory-tolerance', type=float, default=0.25, help='Allowed relative peak memory growth')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read the baseline report: {e}")
+
+        # Allows the test client's host and keeps outgoing emails in memory
+        setup_test_environment()
+        try:
+            if options['current_db']:
+                report = self.run(options)
+            else:
+                report = self.run_in_test_database(options)
+        finally:
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(report['results'])} scenario(s), report written to {options['output']}"))
+
+        if report['skipped']:
+            self.stdout.write(f"Skipped for lack of data: {', '.join(report['skipped'])}")
+        if report['uncovered']:
+            self.stdout.write(self.style.WARNING(f"Routes without a scenario: {', '.join(report['uncovered'])}"))
+        if report['failed']:
+            for key in report['failed']:
+                result = report['results'][key]
+                self.stdout.write(self.style.ERROR(f"{key}: status {result['status']} {result.get('code', '')}".rstrip()))
+            raise CommandError(f"{len(report['failed'])} scenario(s) did not get the expected response")
+
+        if baseline is not None:
+            regressions = compare(
+                report['results'], baseline,
+                latency_tolerance=options['latency_tolerance'],
+                memory_tolerance=options['memory_tolerance']
+            )
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
+
+    def run_in_test_database(self, options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'], serialize=False)
+        try:
+            if CustomUser.objects.exists():
+                self.stdout.write('Reusing the data of the kept test database')
+            else:
+                generate_dataset(
+                    options['users'], options['sessions'], options['messages'],
+                    seed=options['seed'], log=self.stdout.write
+                )
+            return self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+    def run(self, options):
+        results, skipped, failed, uncovered = run_benchmarks(
+            iterations=options['iterations'], only=options['only'], log=self.stdout.write
+        )
+        return {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'iterations': options['iterations'],
+                'dataset': None if options['current_db'] else {
+                    key: options[key] for key in ('users', 'sessions', 'messages', 'seed')
+                },
+            },
+            'results': results,
+            'skipped': skipped,
+            'failed': failed,
+            'uncovered': uncovered,
+        }
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from core.scheduler import run_session_sweep
+
+
+class Command(BaseCommand):
+    """Django command to mark ended confirmed sessions as completed, once or on a fixed interval"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and sweep every INTERVAL seconds (default: sweep once and exit)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of sessions completed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+
+        while True:
+            report = run_session_sweep(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Completed {report['completed']} session(s) in {report['batches']} batch(es), {report['elapsed']}s"
+            ))
+
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,48 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.datagen import generate_dataset
+from core.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Django command that fills the database with a synthetic dataset: users, tutor profiles and availability,
+    sessions with their notifications and reviews, and messages.
+
+    The dataset only depends on --seed and --chunk-size, so any number of --workers produces the same data.
+    Every generated user's password is 'password123'.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Users to generate, a quarter of them tutors')
+        parser.add_argument('--sessions', type=int, default=5000, help='Sessions to generate')
+        parser.add_argument('--messages', type=int, default=20000, help='Messages to generate')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the dataset')
+        parser.add_argument('--prefix', default='user', help='Prefix of the generated usernames and emails')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows inserted per statement and transaction')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes inserting chunks')
+        parser.add_argument('--copy', action='store_true', help='Insert with COPY instead of INSERT (PostgreSQL only)')
+
+    def handle(self, *args, **options):
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError('--copy requires PostgreSQL')
+        if options['users'] < 0 or options['sessions'] < 0 or options['messages'] < 0 or options['chunk_size'] < 1:
+            raise CommandError('Row counts must not be negative and the chunk size must be positive')
+
+        prefix = options['prefix']
+        if CustomUser.objects.filter(username=f'{prefix}0').exists():
+            raise CommandError(f"Users prefixed '{prefix}' already exist, pass another --prefix")
+
+        generate_dataset(
+            options['users'], options['sessions'], options['messages'],
+            seed=options['seed'],
+            prefix=prefix,
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            use_copy=options['copy'],
+            log=self.stdout.write
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['users']} users, {options['sessions']} sessions and {options['messages']} messages"
+        ))
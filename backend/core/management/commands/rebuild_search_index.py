@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from core.models import CustomUser
+from core.search import refresh_search_documents
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the tutor search documents (and search vectors on PostgreSQL) for every user"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users refreshed per batch'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        user_ids = list(CustomUser.objects.order_by('id').values_list('id', flat=True))
+
+        for start in range(0, len(user_ids), batch_size):
+            refresh_search_documents(user_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search documents for {len(user_ids)} user(s)'))
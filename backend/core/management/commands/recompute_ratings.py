@@ -0,0 +1,52 @@
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum, Q, Exists, OuterRef
+from core.models import CustomUser, Review
+
+
+class Command(BaseCommand):
+    """Django command to rebuild every tutor's rating aggregates from the reviews table"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of tutors written per UPDATE batch'
+        )
+
+    def handle(self, *args, **options):
+        # One GROUP BY over all reviews gives the count and sum for every reviewed tutor
+        totals = Review.objects.values('session__tutor').annotate(
+            total_reviews=Count('id'),
+            total_rating=Sum('rating')
+        ).order_by()
+
+        tutors = [
+            CustomUser(
+                pk=row['session__tutor'],
+                rating_sum=row['total_rating'],
+                total_ratings=row['total_reviews'],
+                average_rating=round(Decimal(row['total_rating']) / row['total_reviews'], 2)
+            )
+            for row in totals
+        ]
+
+        with transaction.atomic():
+            # Reset users that still carry aggregates but no longer have any reviews
+            reset = CustomUser.objects.filter(
+                Q(total_ratings__gt=0) | Q(rating_sum__gt=0) | Q(average_rating__isnull=False)
+            ).exclude(
+                Exists(Review.objects.filter(session__tutor=OuterRef('pk')))
+            ).update(rating_sum=0, total_ratings=0, average_rating=None)
+
+            CustomUser.objects.bulk_update(
+                tutors,
+                ['rating_sum', 'total_ratings', 'average_rating'],
+                batch_size=options['batch_size']
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed ratings for {len(tutors)} tutor(s), reset {reset} user(s) without reviews'
+        ))
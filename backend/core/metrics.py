@@ -0,0 +1,309 @@
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+
+"""
+This module contains the in-process metrics registry exposed at /metrics in the Prometheus text format.
+
+Metrics are plain counters, gauges and histograms held in memory, so they need no external service. A single
+server process reports its own values (reset on restart).
+
+Behind gunicorn, every scrape reaches one worker at random, so its values alone would jump back and forth between
+workers. With METRICS_MULTIPROCESS_DIR set (gunicorn.conf.py sets it), the workers share a directory instead:
+each one writes its values to a file of its own every METRICS_FLUSH_INTERVAL seconds (see core.scheduler), and a
+scrape sums the files of all workers. Counters and histograms of exited workers are folded into an archive file,
+so that totals never go down, while their gauges are dropped.
+
+Metrics include:
+- HTTP requests, latency and database queries per route name (see core.middleware.MetricsMiddleware)
+- Booking outcomes of core.booking.create_booking
+- Notifications created, and events pushed to WebSocket clients
+- Open WebSocket connections
+"""
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    escaped = (
+        str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        for value in values
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+class Metric:
+    """A named metric with one value per combination of label values"""
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} takes the labels {", ".join(self.labels)}')
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def snapshot(self):
+        """Copy of the value of every label combination"""
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, values, other):
+        """Add the values of another process to values"""
+        for key, value in other.items():
+            values[key] = values.get(key, 0) + value
+
+    def samples(self, values):
+        """(suffix, label names, label values, value) of every sample"""
+        for key, value in sorted(values.items()):
+            yield '', self.labels, key, value
+
+    def render(self, values=None):
+        values = self.snapshot() if values is None else values
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        for suffix, names, label_values, value in self.samples(values):
+            lines.append(f'{self.name}{suffix}{format_labels(names, label_values)} {format_value(value)}')
+        return '\n'.join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        # A gauge without labels always has a value, even before anything changed it
+        if not self.labels:
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket (not yet cumulative) counts, then the sum of the observed values
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(state) for key, state in self._values.items()}
+
+    def merge(self, values, other):
+        for key, state in other.items():
+            current = values.get(key)
+            values[key] = list(state) if current is None else [a + b for a, b in zip(current, state)]
+
+    def samples(self, values):
+        bucket_labels = self.labels + ('le',)
+        for key, state in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield '_bucket', bucket_labels, key + (format_value(float(bound)),), cumulative
+            yield '_sum', self.labels, key, state[-1]
+            yield '_count', self.labels, key, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name, documentation, labels=()):
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def snapshot(self):
+        """Values of every metric, by metric name"""
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def merge(self, snapshots, gauges=True):
+        """Sum snapshots of several processes, optionally leaving gauges out"""
+        merged = {}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.type == 'gauge' and not gauges):
+                    continue
+                metric.merge(merged.setdefault(name, {}), values)
+        return merged
+
+    def render(self, snapshot=None):
+        """Every metric in the Prometheus text exposition format, from its own values or from a snapshot"""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        return '\n'.join(metric.render(snapshot.get(name, {})) for name, metric in self.metrics.items()) + '\n'
+
+    def clear(self):
+        for metric in self.metrics.values():
+            metric.clear()
+
+
+registry = Registry()
+
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+
+
+def process_file(directory, pid):
+    return os.path.join(directory, f'{pid}.json')
+
+
+def dump_snapshot(path, snapshot):
+    # Write to a temporary file and rename it, so that readers never see a partial file
+    data = {name: [[list(key), value] for key, value in values.items()] for name, values in snapshot.items()}
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def load_snapshot(path):
+    try:
+        with open(path) as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return {}
+    return {name: {tuple(key): value for key, value in values} for name, values in data.items()}
+
+
+@contextmanager
+def locked(directory, exclusive):
+    """Lock the directory: scrapes read it under a shared lock, archiving an exited worker takes it exclusively"""
+    import fcntl
+
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def prepare_directory(directory):
+    """Create the directory, removing the files of a previous server run (called once by the gunicorn master)"""
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(('.json', '.tmp')):
+            os.remove(os.path.join(directory, name))
+
+
+def write_process_values(directory):
+    """Write the values of this process to its file in the directory"""
+    os.makedirs(directory, exist_ok=True)
+    dump_snapshot(process_file(directory, os.getpid()), registry.snapshot())
+
+
+def mark_process_dead(directory, pid):
+    """Fold the counters and histograms of an exited worker into the archive, and drop its gauges"""
+    path = process_file(directory, pid)
+    with locked(directory, exclusive=True):
+        if not os.path.exists(path):
+            return
+        archive = os.path.join(directory, ARCHIVE_FILE)
+        dump_snapshot(archive, registry.merge([load_snapshot(archive), load_snapshot(path)], gauges=False))
+        os.remove(path)
+
+
+def render_all_processes(directory):
+    """The metrics of every worker sharing the directory, summed, in the Prometheus text format"""
+    write_process_values(directory)
+    with locked(directory, exclusive=False):
+        snapshots = [
+            load_snapshot(os.path.join(directory, name))
+            for name in sorted(os.listdir(directory)) if name.endswith('.json')
+        ]
+    return registry.render(registry.merge(snapshots))
+
+HTTP_REQUESTS = registry.counter(
+    'noesis_http_requests_total', 'HTTP requests by route name, method and status code.',
+    ['route', 'method', 'status']
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    'noesis_http_request_duration_seconds', 'HTTP request latency by route name and method.',
+    ['route', 'method']
+)
+DB_QUERIES = registry.histogram(
+    'noesis_db_queries_per_request', 'Database queries run by a request, by route name and method.',
+    ['route', 'method'], buckets=QUERY_BUCKETS
+)
+BOOKINGS = registry.counter(
+    'noesis_bookings_total', 'Booking attempts by outcome: success, or the first reason the booking was refused.',
+    ['outcome']
+)
+NOTIFICATIONS = registry.counter(
+    'noesis_notifications_created_total', 'Notifications created by notification type.',
+    ['type']
+)
+REALTIME_EVENTS = registry.counter(
+    'noesis_realtime_events_total', 'Events published to WebSocket clients by event type.',
+    ['type']
+)
+WEBSOCKET_CONNECTIONS = registry.gauge(
+    'noesis_websocket_connections', 'Open authenticated WebSocket connections.'
+)
@@ -0,0 +1,186 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from core import metrics
+
+"""
+This module contains the request instrumentation middleware.
+
+Queries are recorded by record_queries(), an execute wrapper installed on every database connection when it is
+created (see core.signals). It feeds the QueryRecorders of the current request, which are held in a context
+variable so that they follow the request into the threads running its ORM calls, with sync and async views alike.
+
+MetricsMiddleware records the request count, latency and query count of every request per route name in the
+in-process metrics registry (see core.metrics). It is enabled unless METRICS_ENABLED is false.
+
+QueryInstrumentationMiddleware is the opt-in per-request SQL instrumentation. For a sampled request, the query
+count, database time and repeated statements (the same SQL run several times, the signature of an N+1 query) are
+logged as one JSON line per request, and reported to the client in a Server-Timing header.
+
+QUERY_INSTRUMENTATION_SAMPLE_RATE is the fraction of requests that are sampled (0 disables the middleware).
+"""
+logger = logging.getLogger(__name__)
+
+# Repeated statements listed in a log line, most repeated first
+MAX_REPORTED_DUPLICATES = 5
+MAX_REPORTED_SQL_LENGTH = 300
+
+_active_recorders = ContextVar('active_query_recorders', default=())
+
+
+class QueryRecorder:
+    """Records the SQL and duration of every query run while it is active (see recording())"""
+
+    def __init__(self):
+        self.queries = []
+
+    def record(self, sql, duration):
+        self.queries.append((sql, duration))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum((duration for sql, duration in self.queries), 0.0)
+
+    def duplicates(self):
+        """(sql, count) of the statements run more than once, most repeated first"""
+        counts = Counter(sql for sql, duration in self.queries)
+        return [(sql, count) for sql, count in counts.most_common() if count > 1]
+
+
+@contextmanager
+def recording(recorder):
+    """Feed every query of the current context (request) to the recorder"""
+    token = _active_recorders.set(_active_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _active_recorders.reset(token)
+
+
+def record_queries(execute, sql, params, many, context):
+    """Execute wrapper timing the query for the active recorders, if any"""
+    recorders = _active_recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for recorder in recorders:
+            recorder.record(sql, duration)
+
+
+def view_name(request):
+    # The URL name, or the view's dotted path for unnamed routes (None if the URL did not resolve)
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+class InstrumentationMiddleware:
+    """
+    Base of the middleware recording the queries of a request, usable in sync and async middleware chains.
+    Subclasses decide which requests to record and report them in report().
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def should_record(self, request):
+        return True
+
+    def report(self, request, response, recorder, duration):
+        raise NotImplementedError
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_record(request):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with recording(QueryRecorder()) as recorder:
+            response = self.get_response(request)
+        self.report(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self.should_record(request):
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        with recording(QueryRecorder()) as recorder:
+            response = await self.get_response(request)
+        self.report(request, response, recorder, time.perf_counter() - start)
+        return response
+
+
+class QueryInstrumentationMiddleware(InstrumentationMiddleware):
+    """Logs the queries of a sample of the requests and reports their database time in a Server-Timing header"""
+
+    def __init__(self, get_response):
+        self.sample_rate = settings.QUERY_INSTRUMENTATION_SAMPLE_RATE
+        self.duplicate_threshold = settings.QUERY_DUPLICATE_THRESHOLD
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def should_record(self, request):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def report(self, request, response, recorder, duration):
+        duplicates = recorder.duplicates()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name(request),
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 3),
+            'total_ms': round(duration * 1000, 3),
+            'duplicate_queries': sum(count - 1 for sql, count in duplicates),
+            'duplicates': [
+                {'sql': sql[:MAX_REPORTED_SQL_LENGTH], 'count': count}
+                for sql, count in duplicates[:MAX_REPORTED_DUPLICATES]
+            ],
+        }
+        # A statement repeated this often is most likely issued once per row of a list
+        level = logging.WARNING if duplicates and duplicates[0][1] >= self.duplicate_threshold else logging.INFO
+        logger.log(level, json.dumps(record))
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={record["db_ms"]};desc="{recorder.count} queries"',
+            f'app;dur={round((duration - recorder.duration) * 1000, 3)}',
+        ])
+
+
+class MetricsMiddleware(InstrumentationMiddleware):
+    """Records every request in the route metrics: count by status, latency and number of queries"""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def report(self, request, response, recorder, duration):
+        # Unresolved URLs share one label, so that scanning random paths cannot grow the registry
+        route = view_name(request) or 'unmatched'
+        metrics.HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        metrics.HTTP_REQUEST_DURATION.observe(duration, route=route, method=request.method)
+        metrics.DB_QUERIES.observe(recorder.count, route=route, method=request.method)
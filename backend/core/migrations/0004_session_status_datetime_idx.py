@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_remove_message_delivered'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['status', 'date_time'], name='session_status_datetime_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:06
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_session_notifications(apps, schema_editor):
+    """Keep only the oldest completion/reminder notification per session and recipient"""
+    Notification = apps.get_model('core', 'Notification')
+    once_per_session = Notification.objects.filter(
+        notification_type__in=['session_completed', 'session_reminder'],
+        related_session__isnull=False
+    )
+    keep_ids = once_per_session.values('related_session', 'recipient', 'notification_type').annotate(keep_id=Min('id')).values('keep_id')
+    once_per_session.exclude(id__in=keep_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_session_status_datetime_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_session_notifications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(condition=models.Q(('notification_type__in', ['session_completed', 'session_reminder'])), fields=('related_session', 'recipient', 'notification_type'), name='unique_once_per_session_notification'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:07
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_rating_sum(apps, schema_editor):
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Review = apps.get_model('core', 'Review')
+
+    totals = Review.objects.values('session__tutor').annotate(total_rating=Sum('rating')).order_by()
+    CustomUser.objects.bulk_update(
+        [CustomUser(pk=row['session__tutor'], rating_sum=row['total_rating']) for row in totals],
+        ['rating_sum'],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_notification_unique_once_per_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_rating_sum, migrations.RunPython.noop),
+    ]
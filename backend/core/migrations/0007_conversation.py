@@ -0,0 +1,65 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.db.models.functions import Greatest, Least
+
+
+def backfill_conversations(apps, schema_editor):
+    """Build one conversation row per pair of users that have exchanged messages"""
+    Message = apps.get_model('core', 'Message')
+    Conversation = apps.get_model('core', 'Conversation')
+
+    pairs = Message.objects.annotate(
+        pair_a=Least('sender_id', 'receiver_id'),
+        pair_b=Greatest('sender_id', 'receiver_id')
+    ).values('pair_a', 'pair_b').annotate(last_id=Max('id')).order_by()
+
+    unread = {
+        (row['sender_id'], row['receiver_id']): row['total']
+        for row in Message.objects.filter(is_read=False).values('sender_id', 'receiver_id').annotate(total=Count('id')).order_by()
+    }
+    last_timestamps = dict(Message.objects.filter(
+        id__in=[pair['last_id'] for pair in pairs]
+    ).values_list('id', 'timestamp'))
+
+    Conversation.objects.bulk_create([
+        Conversation(
+            user_a_id=pair['pair_a'],
+            user_b_id=pair['pair_b'],
+            last_message_id=pair['last_id'],
+            last_timestamp=last_timestamps[pair['last_id']],
+            unread_a=unread.get((pair['pair_b'], pair['pair_a']), 0),
+            unread_b=unread.get((pair['pair_a'], pair['pair_b']), 0) if pair['pair_a'] != pair['pair_b'] else 0
+        )
+        for pair in pairs
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_customuser_rating_sum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('unread_a', models.PositiveIntegerField(default=0)),
+                ('unread_b', models.PositiveIntegerField(default=0)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.message')),
+                ('user_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_a', '-last_timestamp'], name='conversation_user_a_recent_idx'), models.Index(fields=['user_b', '-last_timestamp'], name='conversation_user_b_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user_a', 'user_b'), name='unique_conversation_pair'), models.CheckConstraint(condition=models.Q(('user_a__lte', models.F('user_b'))), name='conversation_pair_ordered')],
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_conversation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'receiver', 'timestamp', 'id'], name='message_thread_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:13
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+
+def backfill_search_documents(apps, schema_editor):
+    CustomUser = apps.get_model('core', 'CustomUser')
+    TutorTopic = apps.get_model('core', 'TutorTopic')
+    TutorLanguage = apps.get_model('core', 'TutorLanguage')
+
+    topics = {}
+    for tutor_id, name in TutorTopic.objects.values_list('tutor_id', 'topic__name'):
+        topics.setdefault(tutor_id, []).append(name)
+    languages = {}
+    for tutor_id, name in TutorLanguage.objects.values_list('tutor_id', 'language__name'):
+        languages.setdefault(tutor_id, []).append(name)
+
+    users = list(CustomUser.objects.only('id', 'username', 'first_name', 'last_name', 'location'))
+    for user in users:
+        parts = [user.username, user.first_name, user.last_name, *topics.get(user.id, []), *languages.get(user.id, []), user.location]
+        user.search_document = ' '.join(part for part in parts if part)
+    CustomUser.objects.bulk_update(users, ['search_document'], batch_size=500)
+
+    if schema_editor.connection.vendor == 'postgresql':
+        CustomUser.objects.update(search_vector=(
+            SearchVector('search_document', weight='A', config='simple') +
+            SearchVector('bio', 'lesson_description', weight='C', config='simple')
+        ))
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN indexes only exist on PostgreSQL; other databases use the in-memory fallback index
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS customuser_search_vector_idx ON core_customuser USING gin (search_vector)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS customuser_search_document_trgm_idx '
+        'ON core_customuser USING gin (search_document gin_trgm_ops)'
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS customuser_search_vector_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS customuser_search_document_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_message_thread_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='customuser',
+            name='search_document',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
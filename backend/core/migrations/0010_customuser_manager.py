@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:15
+
+import core.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_tutor_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', core.models.CustomUserManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0010_customuser_manager'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['preferred_mode', 'hourly_rate'], name='customuser_mode_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['hourly_rate'], name='customuser_hourly_rate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['average_rating'], name='customuser_avg_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorlanguage',
+            index=models.Index(fields=['language', 'tutor'], name='tutorlanguage_lang_tutor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutortopic',
+            index=models.Index(fields=['topic', 'tutor'], name='tutortopic_topic_tutor_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:18
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_tutor_discovery_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(fields=['available_date', 'available_time_start'], name='availability_date_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='availability',
+            index=models.Index(django.db.models.functions.datetime.ExtractWeekDay('available_date'), models.F('available_time_start'), condition=models.Q(('recurring', True)), name='availability_recurring_wd_idx'),
+        ),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:21
+
+import django.db.models.deletion
+from django.conf import settings
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def convert_recurring_availability(apps, schema_editor):
+    """Turn every recurring Availability row into a weekly rule for its weekday, starting on its date"""
+    Availability = apps.get_model('core', 'Availability')
+    AvailabilityRule = apps.get_model('core', 'AvailabilityRule')
+
+    recurring = Availability.objects.filter(recurring=True)
+    AvailabilityRule.objects.bulk_create([
+        AvailabilityRule(
+            tutor_id=row.tutor_id,
+            weekdays=1 << row.available_date.weekday(),
+            start_time=row.available_time_start,
+            end_time=row.available_time_end,
+            valid_from=row.available_date
+        )
+        for row in recurring.iterator(chunk_size=1000)
+    ], batch_size=1000)
+    recurring.delete()
+
+
+def restore_recurring_availability(apps, schema_editor):
+    """Turn rules back into one recurring Availability row per weekday (exceptions and end dates are lost)"""
+    Availability = apps.get_model('core', 'Availability')
+    AvailabilityRule = apps.get_model('core', 'AvailabilityRule')
+
+    rows = []
+    for rule in AvailabilityRule.objects.iterator(chunk_size=1000):
+        for weekday in range(7):
+            if rule.weekdays & (1 << weekday):
+                rows.append(Availability(
+                    tutor_id=rule.tutor_id,
+                    available_date=rule.valid_from + timedelta(days=(weekday - rule.valid_from.weekday()) % 7),
+                    available_time_start=rule.start_time,
+                    available_time_end=rule.end_time,
+                    recurring=True
+                ))
+    Availability.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_availability_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvailabilityException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AvailabilityRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekdays', models.PositiveSmallIntegerField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('valid_from', models.DateField()),
+                ('valid_until', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='availabilityrule',
+            name='tutor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_rules', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='availabilityexception',
+            name='rule',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='core.availabilityrule'),
+        ),
+        migrations.AddIndex(
+            model_name='availabilityrule',
+            index=models.Index(fields=['tutor', 'valid_from'], name='availabilityrule_tutor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='availabilityrule',
+            index=models.Index(fields=['valid_from', 'valid_until'], name='availabilityrule_validity_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='availabilityexception',
+            unique_together={('rule', 'date')},
+        ),
+        migrations.RunPython(convert_recurring_availability, restore_recurring_availability),
+        migrations.RemoveIndex(
+            model_name='availability',
+            name='availability_recurring_wd_idx',
+        ),
+        migrations.RemoveField(
+            model_name='availability',
+            name='recurring',
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 5.1.3 on 2026-10-17 06:30
+
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+ACTIVE_STATUSES = ('pending', 'confirmed', 'reschedule_pending')
+
+
+def cancel_existing_overlaps(apps, schema_editor):
+    """
+    The constraint cannot be added while overlapping active sessions exist. Keep confirmed (then reschedule
+    pending, then pending) sessions first, earliest booked first, and cancel the ones overlapping a kept session.
+
+    Both participants of a cancelled session get a booking_cancelled notification, and the cancelled ids are
+    printed for the operator.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Session = apps.get_model('core', 'Session')
+    Notification = apps.get_model('core', 'Notification')
+
+    priority = {'confirmed': 0, 'reschedule_pending': 1, 'pending': 2}
+    sessions = sorted(
+        Session.objects.filter(status__in=ACTIVE_STATUSES).values_list('id', 'tutor_id', 'date_time', 'duration', 'status', 'created_at'),
+        key=lambda row: (row[1], priority[row[4]], row[5], row[0])
+    )
+
+    kept = {}
+    cancelled = []
+    for session_id, tutor_id, date_time, duration, _, _ in sessions:
+        end = date_time + duration
+        if any(start < end and date_time < kept_end for start, kept_end in kept.get(tutor_id, [])):
+            cancelled.append(session_id)
+        else:
+            kept.setdefault(tutor_id, []).append((date_time, end))
+
+    if not cancelled:
+        return
+
+    notifications = []
+    recipients = set()
+    for session in Session.objects.filter(pk__in=cancelled).select_related('tutor', 'student'):
+        session_time = session.date_time.strftime("%A, %d %B %Y at %H:%M")
+        for recipient, partner in ((session.student, session.tutor), (session.tutor, session.student)):
+            notifications.append(Notification(
+                recipient=recipient,
+                notification_type='booking_cancelled',
+                title='Booking Cancelled',
+                message=f'Your session with {partner.username} on {session_time} overlapped another booking '
+                        f'of the tutor and has been cancelled.',
+                related_session=session,
+                session_status='cancelled'
+            ))
+            recipients.add(recipient.id)
+
+    Session.objects.filter(pk__in=cancelled).update(status='cancelled')
+    Notification.objects.bulk_create(notifications)
+
+    # The cached unread counters (see core.counters) would not include the new notifications
+    from django.core.cache import cache
+    cache.delete_many([f'unread:notifications:{user_id}' for user_id in recipients])
+
+    print(f"\n  Cancelled {len(cancelled)} overlapping session(s): {', '.join(map(str, sorted(cancelled)))}")
+
+
+def add_overlap_constraint(apps, schema_editor):
+    # Exclusion constraints only exist on PostgreSQL; other databases rely on the check in Session.clean()
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "ALTER TABLE core_session ADD CONSTRAINT session_no_active_overlap EXCLUDE USING gist ("
+        "tutor_id WITH =, tstzrange(date_time, date_time + duration, '[)') WITH &&"
+        ") WHERE (status IN ('pending', 'confirmed', 'reschedule_pending'))"
+    )
+
+
+def drop_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE core_session DROP CONSTRAINT IF EXISTS session_no_active_overlap')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_availability_rules'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(cancel_existing_overlaps, migrations.RunPython.noop),
+        migrations.RunPython(add_overlap_constraint, drop_overlap_constraint),
+    ]
@@ -1,18 +1,23 @@
-from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db import models, transaction, connection, IntegrityError
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from django.db.models import F
+from django.db.models import F, Q, Case, When, Count, Sum, ExpressionWrapper, Prefetch
+from django.db.models.functions import Cast, NullIf, Greatest
+from decimal import Decimal
+from core import counters, metrics, realtime
 import os
+import time
 
 """
 This module defines the Data Models that represent the database tables and relationships.
 
 The models include:
 - User and user related: CustomUser (extending Django AbstractUser), Role
-- Tutoring specific: Topic, TutorTopic, Language, TutorLanguage, Availability
+- Tutoring specific: Topic, TutorTopic, Language, TutorLanguage, Availability, AvailabilityRule, AvailabilityException
 - Session management: Session, Review
-- Communication: Message, Notification
+- Communication: Message, Conversation, Notification
 """
 class Role(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -25,6 +30,26 @@ class Role(models.Model):
     def __str__(self):
         return self.name
 
+class CustomUserQuerySet(models.QuerySet):
+    @staticmethod
+    def profile_prefetches(prefix=''):
+        """Prefetch lookups for every relation CustomUserSerializer reads, optionally below a relation path prefix"""
+        return [
+            f'{prefix}roles',
+            Prefetch(f'{prefix}tutortopic_set', queryset=TutorTopic.objects.select_related('topic')),
+            Prefetch(f'{prefix}tutorlanguage_set', queryset=TutorLanguage.objects.select_related('language')),
+        ]
+
+    def tutors(self):
+        return self.filter(roles__name='Tutor')
+
+    def with_profile(self):
+        """Load roles, topics and languages in one query each, however many users are serialized"""
+        return self.prefetch_related(*self.profile_prefetches())
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
+
 class CustomUser(AbstractUser):
     email = models.EmailField(max_length=255, unique=True)
     roles = models.ManyToManyField(Role, blank=True)
@@ -46,26 +71,45 @@ class CustomUser(AbstractUser):
 
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
     total_ratings = models.PositiveIntegerField(default=0)
+    # Sum of all review ratings, kept alongside total_ratings so the average can be maintained incrementally
+    rating_sum = models.PositiveIntegerField(default=0)
 
-    def update_rating(self):
-        """Update the user's average rating based on reviews they've received"""
-        # Find all sessions where this user is a tutor
-        tutor_sessions = self.sessions_as_tutor.all()
+    # Denormalized search fields maintained by core.search (search_vector is only populated on PostgreSQL)
+    search_document = models.TextField(blank=True, default='')
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    objects = CustomUserManager()
 
-        # Get all reviews for these sessions
-        reviews = Review.objects.filter(session__in=tutor_sessions)
-        total_reviews = reviews.count()
+    @classmethod
+    def apply_rating_change(cls, tutor_id, rating_delta, count_delta):
+        """Atomically adjust a tutor's rating aggregates by a single review being added, changed or removed"""
+        new_sum = F('rating_sum') + rating_delta
+        new_total = F('total_ratings') + count_delta
+
+        return cls.objects.filter(pk=tutor_id).update(
+            rating_sum=new_sum,
+            total_ratings=new_total,
+            # NULL once the last review is removed
+            average_rating=Cast(new_sum, models.DecimalField(max_digits=10, decimal_places=4)) / NullIf(new_total, 0)
+        )
+
+    def update_rating(self):
+        """Recompute the user's rating aggregates from scratch based on reviews they've received"""
+        totals = Review.objects.filter(session__tutor=self).aggregate(
+            total_reviews=Count('id'),
+            total_rating=Sum('rating')
+        )
+        total_reviews = totals['total_reviews']
 
         if total_reviews > 0:
-            # Calculate average rating
-            total_rating = sum(review.rating for review in reviews)
-            self.average_rating = total_rating / total_reviews
+            self.rating_sum = totals['total_rating']
+            self.average_rating = round(Decimal(self.rating_sum) / total_reviews, 2)
             self.total_ratings = total_reviews
-            self.save(update_fields=['average_rating', 'total_ratings'])
         else:
+            self.rating_sum = 0
             self.average_rating = None
             self.total_ratings = 0
-            self.save(update_fields=['average_rating', 'total_ratings'])
+        self.save(update_fields=['average_rating', 'total_ratings', 'rating_sum'])
 
         return self.average_rating, self.total_ratings
 
@@ -94,6 +138,12 @@ class CustomUser(AbstractUser):
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
+        indexes = [
+            # Tutor discovery filters (see core.filters)
+            models.Index(fields=['preferred_mode', 'hourly_rate'], name='customuser_mode_rate_idx'),
+            models.Index(fields=['hourly_rate'], name='customuser_hourly_rate_idx'),
+            models.Index(fields=['average_rating'], name='customuser_avg_rating_idx'),
+        ]
 
 class Topic(models.Model):
     name = models.CharField(max_length=100)
@@ -108,6 +158,10 @@ class TutorTopic(models.Model):
 
     class Meta:
         unique_together = ('tutor', 'topic')
+        indexes = [
+            # The unique index leads with tutor, this one serves "tutors teaching topic X" and the topic facet
+            models.Index(fields=['topic', 'tutor'], name='tutortopic_topic_tutor_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tutor.username} teaches {self.topic.name}"
@@ -124,6 +178,9 @@ class TutorLanguage(models.Model):
 
     class Meta:
         unique_together = ('tutor', 'language')
+        indexes = [
+            models.Index(fields=['language', 'tutor'], name='tutorlanguage_lang_tutor_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tutor.username} speaks {self.language.name}"
@@ -155,6 +212,81 @@ def parse_datetime_safely(datetime_string):
     except Exception as e:
         raise ValueError(f"Invalid date format: {str(e)}")
 
+def is_constraint_violation(error, constraint_name):
+    """Whether an IntegrityError was raised by the named database constraint"""
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        return diag.constraint_name == constraint_name
+    return constraint_name in str(error)
+
+class SessionOverlapError(ValidationError):
+    """Raised when a session would overlap another active session of the same tutor"""
+
+    def __init__(self, message="This time slot is already booked"):
+        super().__init__(message, code='overlap')
+
+# Name of the PostgreSQL exclusion constraint preventing overlapping active sessions (see migration 0014)
+SESSION_OVERLAP_CONSTRAINT = 'session_no_active_overlap'
+
+class SessionQuerySet(models.QuerySet):
+    def overlapping(self, tutor, date_time, duration):
+        """Active sessions of the tutor whose time range intersects [date_time, date_time + duration)"""
+        return self.filter(
+            tutor=tutor,
+            status__in=Session.ACTIVE_STATUSES,
+            date_time__lt=date_time + duration
+        ).alias(
+            end_time=ExpressionWrapper(F('date_time') + F('duration'), output_field=models.DateTimeField())
+        ).filter(end_time__gt=date_time)
+
+    def ended(self, now=None):
+        """Confirmed sessions whose end time (date_time + duration) has passed"""
+        now = now or timezone.now()
+
+        # Sessions cannot end before they start, so the date_time bound lets the (status, date_time) index do the work
+        return self.filter(status='confirmed', date_time__lt=now).alias(
+            end_time=ExpressionWrapper(F('date_time') + F('duration'), output_field=models.DateTimeField())
+        ).filter(end_time__lt=now)
+
+    def complete_ended(self, batch_size=1000):
+        """Mark ended sessions as completed in chunks of batch_size and notify their students in bulk"""
+        started = time.monotonic()
+        now = timezone.now()
+        completed = 0
+        batches = 0
+
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    self.ended(now)
+                    .select_for_update(skip_locked=True, of=('self',))
+                    .order_by('date_time')
+                    .values_list('pk', 'student_id', 'tutor__username')[:batch_size]
+                )
+
+                if not batch:
+                    break
+
+                # Direct update to bypass validation and the per-row post_save signal
+                self.model.objects.filter(
+                    pk__in=[pk for pk, _, _ in batch],
+                    status='confirmed'
+                ).update(status='completed', updated_at=now)
+
+                Notification.bulk_create_session_completed(batch)
+
+            completed += len(batch)
+            batches += 1
+
+            if len(batch) < batch_size:
+                break
+
+        return {
+            'completed': completed,
+            'batches': batches,
+            'elapsed': round(time.monotonic() - started, 3),
+        }
+
 class Session(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -170,6 +302,9 @@ class Session(models.Model):
         ('in-person', 'In-Person')
     ]
 
+    # Statuses holding the tutor's time slot: no two sessions of a tutor in these statuses may overlap
+    ACTIVE_STATUSES = ('pending', 'confirmed', 'reschedule_pending')
+
     tutor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='sessions_as_tutor', limit_choices_to={'roles__name__iexact': 'tutor'})
     student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='sessions_as_student', limit_choices_to={'roles__name__iexact': 'student'})
     date_time = models.DateTimeField()
@@ -181,6 +316,8 @@ class Session(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SessionQuerySet.as_manager()
+
     # Properties for status checks
     @property
     def is_pending(self):
@@ -252,75 +389,61 @@ class Session(models.Model):
         if self.pk and hasattr(self, '_only_updating_status') and self._only_updating_status:
             return
 
+        # Skip validation already performed by core.booking in the same transaction
+        if getattr(self, '_booking_validated', False):
+            return
+
         if self.date_time < timezone.now():
             if not self.pk or hasattr(self, '_date_time_changed'):
                 raise ValidationError("Cannot book sessions in the past")
 
         # Skip this check when just updating the status
         if not self.pk or self._state.adding or hasattr(self, '_date_time_changed'):
-            booking_date = self.date_time.date()
-            booking_time_start = self.date_time.time()
-            booking_time_end = (self.date_time + self.duration).time()
-            booking_weekday = booking_date.weekday()  # 0 = Monday, 6 = Sunday in Python
-
-            exact_date_available = Availability.objects.filter(
-                tutor=self.tutor,
-                available_date=booking_date,
-                available_time_start__lte=booking_time_start,
-                available_time_end__gte=booking_time_end
-            ).exists()
-
-            recurring_available = Availability.objects.filter(
-                tutor=self.tutor,
-                recurring=True,
-                available_time_start__lte=booking_time_start,
-                available_time_end__gte=booking_time_end
-            ).extra(
-                where=["EXTRACT(DOW FROM available_date) = %s"],
-                params=[(booking_weekday + 1) % 7]  # Convert from Python weekday to PostgreSQL DOW
-            ).exists()
-
-            if not (exact_date_available or recurring_available):
-                raise ValidationError("Tutor is not available at this time")
+            from core.availability import is_available
 
-            # Check for overlapping sessions
-            overlapping_sessions = Session.objects.filter(
-                tutor=self.tutor,
-                date_time__lt=self.date_time + self.duration,
-                date_time__gt=self.date_time - self.duration,
-                status__in=['pending', 'confirmed']
-            ).exclude(pk=self.pk)
+            if not is_available(self.tutor_id, self.date_time, self.duration):
+                raise ValidationError("Tutor is not available at this time")
 
-            if overlapping_sessions.exists():
-                raise ValidationError("This time slot is already booked")
+            # PostgreSQL enforces this with an exclusion constraint when the row is written (see save())
+            if connection.vendor != 'postgresql' and self.status in self.ACTIVE_STATUSES:
+                if Session.objects.overlapping(self.tutor_id, self.date_time, self.duration).exclude(pk=self.pk).exists():
+                    raise SessionOverlapError()
 
     @classmethod
     def auto_complete_sessions(cls):
         """Automatically mark past confirmed sessions as completed"""
-        now = timezone.now()
-
-        # Find sessions that have ended
-        confirmed_sessions = cls.objects.filter(status='confirmed')
-
-        completed_count = 0
-        for session in confirmed_sessions:
-            end_time = session.date_time + session.duration
-
-            # If session has ended, mark it completed
-            if end_time < now:
-                # Direct update to bypass validation
-                session.update_status_only('completed')
-                completed_count += 1
-
-        return completed_count
+        return cls.objects.complete_ended()['completed']
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        try:
+            # Savepoint, so that a rejected write does not break an enclosing transaction
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if is_constraint_violation(e, SESSION_OVERLAP_CONSTRAINT):
+                raise SessionOverlapError() from e
+            raise
 
     def __str__(self):
         return f"Session on {self.date_time} ({self.status})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'date_time'], name='session_status_datetime_idx'),
+            # Session lists of either participant, filtered by status
+            models.Index(fields=['tutor', 'status', 'date_time'], name='session_tutor_status_dt_idx'),
+            models.Index(fields=['student', 'status', 'date_time'], name='session_student_status_dt_idx'),
+            # Overlap and busy time lookups only ever consider the active sessions of one tutor
+            models.Index(
+                fields=['tutor', 'date_time'],
+                condition=Q(status__in=['pending', 'confirmed', 'reschedule_pending']),
+                name='session_tutor_active_idx'
+            ),
+        ]
+        # On PostgreSQL, the SESSION_OVERLAP_CONSTRAINT exclusion constraint (created by migration 0014 since
+        # other databases do not support it) rejects overlapping active sessions of the same tutor
+
 class Review(models.Model):
     session = models.OneToOneField(
         Session,
@@ -331,6 +454,14 @@ class Review(models.Model):
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored rating so that edits can be applied to the tutor's aggregates as a delta
+        if 'rating' in field_names:
+            instance._stored_rating = instance.rating
+        return instance
+
     def clean(self):
         """Ensure that the review can only be created for completed sessions"""
         if self.session.status != 'completed':
@@ -340,17 +471,13 @@ class Review(models.Model):
         self.clean()
         super().save(*args, **kwargs)
 
-        # Update the tutor's rating
-        tutor = self.session.tutor
-        avg_rating, total_ratings = tutor.update_rating()
-
 
 class Availability(models.Model):
+    """One-off availability on a single date (weekly availability is an AvailabilityRule)"""
     tutor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='availabilities', limit_choices_to={'roles__name': 'tutor'})
     available_date = models.DateField()
     available_time_start = models.TimeField()
     available_time_end = models.TimeField()
-    recurring = models.BooleanField(default=False)
 
     def save(self, *args, **kwargs):
         if not self.tutor.roles.filter(name='Tutor').exists():
@@ -359,10 +486,92 @@ class Availability(models.Model):
 
     class Meta:
         unique_together = ('tutor', 'available_date', 'available_time_start')
+        indexes = [
+            # Availability search (see core.availability)
+            models.Index(fields=['available_date', 'available_time_start'], name='availability_date_start_idx'),
+        ]
 
     def __str__(self):
         return f"{self.tutor.username} available on {self.available_date} from {self.available_time_start} to {self.available_time_end}"
 
+class AvailabilityRule(models.Model):
+    """
+    Weekly recurring availability: the tutor is available from start_time to end_time on every weekday in the
+    weekdays bit mask (bit 0 = Monday ... bit 6 = Sunday) between valid_from and valid_until (open-ended if null),
+    except on the dates of its exceptions. Concrete slots are expanded on demand by core.availability.
+    """
+    WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+    tutor = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='availability_rules')
+    weekdays = models.PositiveSmallIntegerField()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    valid_from = models.DateField()
+    valid_until = models.DateField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def weekday_mask(weekdays):
+        """Bit mask of Python weekdays (0 = Monday)"""
+        mask = 0
+        for weekday in weekdays:
+            mask |= 1 << weekday
+        return mask
+
+    @property
+    def weekday_list(self):
+        return [weekday for weekday in range(7) if self.weekdays & (1 << weekday)]
+
+    def applies_on(self, day):
+        return (
+            bool(self.weekdays & (1 << day.weekday())) and
+            self.valid_from <= day and
+            (self.valid_until is None or day <= self.valid_until)
+        )
+
+    def clean(self):
+        if not self.weekdays or self.weekdays >= 1 << 7:
+            raise ValidationError("A rule must apply to at least one valid weekday")
+        if self.start_time >= self.end_time:
+            raise ValidationError("The end time must be after the start time")
+        if self.valid_until and self.valid_until < self.valid_from:
+            raise ValidationError("valid_until cannot be before valid_from")
+
+    def save(self, *args, **kwargs):
+        if not self.tutor.roles.filter(name='Tutor').exists():
+            raise ValidationError("Only tutors can set availability.")
+        self.clean()
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tutor', 'valid_from'], name='availabilityrule_tutor_idx'),
+            models.Index(fields=['valid_from', 'valid_until'], name='availabilityrule_validity_idx'),
+        ]
+
+    def __str__(self):
+        days = ', '.join(self.WEEKDAY_NAMES[weekday] for weekday in self.weekday_list)
+        return f"{self.tutor.username} available every {days} from {self.start_time} to {self.end_time}"
+
+class AvailabilityException(models.Model):
+    """A date on which an availability rule does not apply"""
+    rule = models.ForeignKey(AvailabilityRule, on_delete=models.CASCADE, related_name='exceptions')
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ('rule', 'date')
+
+    def __str__(self):
+        return f"{self.rule} except on {self.date}"
+
+class MessageQuerySet(models.QuerySet):
+    def thread(self, user, partner_id):
+        """All messages exchanged between the user and the given partner"""
+        return self.filter(
+            (Q(sender=user) & Q(receiver_id=partner_id)) |
+            (Q(sender_id=partner_id) & Q(receiver=user))
+        )
+
 class Message(models.Model):
     sender = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='sent_messages')
     receiver = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='received_messages')
@@ -370,9 +579,154 @@ class Message(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     is_read = models.BooleanField(default=False)
 
+    objects = MessageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Serves both directions of a thread, ordered for keyset pagination
+            models.Index(fields=['sender', 'receiver', 'timestamp', 'id'], name='message_thread_idx'),
+            # Marking a thread as read and rebuilding unread counters, limited to the few unread rows
+            models.Index(fields=['receiver', 'sender'], condition=Q(is_read=False), name='message_unread_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Keep the materialized conversation in step with the new message
+        with transaction.atomic():
+            created = self._state.adding
+            super().save(*args, **kwargs)
+            if created:
+                Conversation.record_message(self)
+
     def __str__(self):
         return f"Message from {self.sender.username} to {self.receiver.username} at {self.timestamp}"
 
+class ConversationQuerySet(models.QuerySet):
+    def for_user(self, user):
+        return self.filter(Q(user_a=user) | Q(user_b=user))
+
+    def inbox(self, user, before=None, before_id=None):
+        """
+        The user's conversations, newest first.
+
+        `before`/`before_id` is a keyset cursor (last_timestamp and id of the last conversation already seen).
+        """
+        conversations = self.for_user(user).filter(last_message__isnull=False)
+
+        if before is not None:
+            conversations = conversations.filter(
+                Q(last_timestamp__lt=before) | Q(last_timestamp=before, id__lt=before_id or 0)
+            )
+
+        return conversations.order_by('-last_timestamp', '-id')
+
+    def unread_total(self, user):
+        """Total number of unread messages received by the user across all conversations"""
+        return self.for_user(user).aggregate(
+            total=Sum(Case(When(user_a=user, then=F('unread_a')), default=F('unread_b')))
+        )['total'] or 0
+
+class Conversation(models.Model):
+    """
+    Materialized summary of the messages exchanged between two users, maintained when messages are sent or read.
+    The pair is stored with the lower user id in user_a.
+    """
+    user_a = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+    user_b = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+    last_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    # Unread messages received by user_a and user_b respectively
+    unread_a = models.PositiveIntegerField(default=0)
+    unread_b = models.PositiveIntegerField(default=0)
+
+    objects = ConversationQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_a', 'user_b'], name='unique_conversation_pair'),
+            models.CheckConstraint(condition=Q(user_a__lte=F('user_b')), name='conversation_pair_ordered'),
+        ]
+        indexes = [
+            models.Index(fields=['user_a', '-last_timestamp'], name='conversation_user_a_recent_idx'),
+            models.Index(fields=['user_b', '-last_timestamp'], name='conversation_user_b_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"Conversation between {self.user_a_id} and {self.user_b_id}"
+
+    def partner_of(self, user):
+        return self.user_b if self.user_a_id == user.id else self.user_a
+
+    def unread_for(self, user):
+        return self.unread_a if self.user_a_id == user.id else self.unread_b
+
+    @staticmethod
+    def unread_field_for(user_id, user_a_id):
+        return 'unread_a' if user_id == user_a_id else 'unread_b'
+
+    @classmethod
+    def record_message(cls, message):
+        """Point the conversation at a newly created message and bump the receiver's unread counter"""
+        user_a_id, user_b_id = sorted((message.sender_id, message.receiver_id))
+        unread_field = cls.unread_field_for(message.receiver_id, user_a_id)
+        changes = {
+            'last_message': message,
+            'last_timestamp': message.timestamp,
+            unread_field: F(unread_field) + 1,
+        }
+
+        counters.adjust(counters.MESSAGES, message.receiver_id, 1)
+
+        updated = cls.objects.filter(user_a_id=user_a_id, user_b_id=user_b_id).update(**changes)
+        if updated:
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    user_a_id=user_a_id,
+                    user_b_id=user_b_id,
+                    last_message=message,
+                    last_timestamp=message.timestamp,
+                    **{unread_field: 1}
+                )
+        except IntegrityError:
+            # Another message created the conversation concurrently
+            cls.objects.filter(user_a_id=user_a_id, user_b_id=user_b_id).update(**changes)
+
+    @classmethod
+    def mark_read(cls, reader, partner_id, count):
+        """Take `count` newly read messages off the reader's unread counter for the conversation"""
+        if not count:
+            return
+
+        user_a_id, user_b_id = sorted((reader.id, int(partner_id)))
+        unread_field = cls.unread_field_for(reader.id, user_a_id)
+        cls.objects.filter(user_a_id=user_a_id, user_b_id=user_b_id).update(
+            **{unread_field: Greatest(F(unread_field) - count, 0)}
+        )
+        counters.adjust(counters.MESSAGES, reader.id, -count)
+
+    @classmethod
+    def record_deletion(cls, message):
+        """
+        Point the conversation of a deleted message back at its latest remaining message and recount its unread
+        messages, or delete the conversation along with its last message
+        """
+        user_a_id, user_b_id = sorted((message.sender_id, message.receiver_id))
+        thread = Message.objects.thread(user_a_id, user_b_id)
+        latest = thread.order_by('-timestamp', '-id').values('id', 'timestamp').first()
+        conversation = cls.objects.filter(user_a_id=user_a_id, user_b_id=user_b_id)
+
+        if latest is None:
+            conversation.delete()
+            return
+
+        unread = thread.aggregate(
+            unread_a=Count('id', filter=Q(receiver_id=user_a_id, is_read=False)),
+            unread_b=Count('id', filter=Q(receiver_id=user_b_id, is_read=False) & ~Q(receiver_id=user_a_id))
+        )
+        conversation.update(last_message_id=latest['id'], last_timestamp=latest['timestamp'], **unread)
+
 class Notification(models.Model):
     NOTIFICATION_TYPES = [
         ('booking_request', 'Booking Request'),
@@ -396,6 +750,19 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's notifications, newest first
+            models.Index(fields=['recipient', '-created_at'], name='notification_recipient_idx'),
+            models.Index(fields=['recipient'], condition=Q(is_read=False), name='notification_unread_idx'),
+        ]
+        # Completion and reminder notifications must be sent at most once per session and recipient
+        constraints = [
+            models.UniqueConstraint(
+                fields=['related_session', 'recipient', 'notification_type'],
+                condition=Q(notification_type__in=['session_completed', 'session_reminder']),
+                name='unique_once_per_session_notification'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.notification_type} for {self.recipient.username}"
@@ -528,49 +895,110 @@ class Notification(models.Model):
         """Create reminder notifications for an upcoming session"""
         session_time = session.formatted_date_time
 
-        # Check if notifications already exists
-        student_notified = cls.objects.filter(
-            recipient=session.student,
-            notification_type='session_reminder',
-            related_session=session
-        ).exists()
-
-        tutor_notified = cls.objects.filter(
-            recipient=session.tutor,
-            notification_type='session_reminder',
-            related_session=session
-        ).exists()
-
-        if not student_notified:
-            cls.create_session_notification(
-                session=session,
+        cls.bulk_create_once_per_session([
+            cls(
                 recipient=session.student,
                 notification_type='session_reminder',
                 title='Upcoming Session Reminder',
-                message=f'You have a session with {session.tutor.username} tomorrow at {session_time}.'
-            )
-
-        if not tutor_notified:
-            cls.create_session_notification(
-                session=session,
+                message=f'You have a session with {session.tutor.username} tomorrow at {session_time}.',
+                related_session=session,
+                session_status=session.status
+            ),
+            cls(
                 recipient=session.tutor,
                 notification_type='session_reminder',
                 title='Upcoming Session Reminder',
-                message=f'You have a session with {session.student.username} tomorrow at {session_time}.'
-            )
+                message=f'You have a session with {session.student.username} tomorrow at {session_time}.',
+                related_session=session,
+                session_status=session.status
+            ),
+        ])
 
         return True
 
+    @staticmethod
+    def session_completed_message(tutor_username):
+        return f'Your session with {tutor_username} is now complete. Please take a moment to leave a review.'
+
     @classmethod
     def create_session_completed_notification(cls, session):
-        """Create notification when a session is completed"""
-        return cls.create_session_notification(
-            session=session,
-            recipient=session.student,
-            notification_type='session_completed',
-            title='Session Completed - Leave a Review',
-            message=f'Your session with {session.tutor.username} is now complete. Please take a moment to leave a review.'
+        """Create notification when a session is completed, unless the student was already notified"""
+        return cls.bulk_create_session_completed([(session.pk, session.student_id, session.tutor.username)])
+
+    @classmethod
+    def bulk_create_session_completed(cls, sessions):
+        """Create completion notifications for many sessions at once from (session_id, student_id, tutor_username) rows"""
+        return cls.bulk_create_once_per_session([
+            cls(
+                recipient_id=student_id,
+                notification_type='session_completed',
+                title='Session Completed - Leave a Review',
+                message=cls.session_completed_message(tutor_username),
+                related_session_id=session_id,
+                session_status='completed'
+            )
+            for session_id, student_id, tutor_username in sessions
+        ])
+
+    @classmethod
+    def insert_ignoring_conflicts(cls, notifications):
+        """
+        INSERT ... ON CONFLICT DO NOTHING RETURNING the notifications, in batches, and return those actually inserted
+        with their primary key set. Rows skipped by a conflict are not returned, so concurrent or retried inserts of
+        the same notifications never report them twice.
+        """
+        fields = [field for field in cls._meta.concrete_fields if not field.primary_key]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        key_columns = ', '.join(
+            connection.ops.quote_name(cls._meta.get_field(name).column)
+            for name in ('related_session', 'recipient', 'notification_type')
         )
+        row = f"({', '.join(['%s'] * len(fields))})"
+        batch_size = connection.ops.bulk_batch_size(fields, notifications)
+
+        created = []
+        with connection.cursor() as cursor:
+            for offset in range(0, len(notifications), batch_size):
+                batch = notifications[offset:offset + batch_size]
+                # pre_save() stamps created_at like a regular save
+                params = [
+                    field.get_db_prep_save(field.pre_save(notification, True), connection)
+                    for notification in batch for field in fields
+                ]
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES {', '.join([row] * len(batch))} "
+                    f"ON CONFLICT DO NOTHING RETURNING {connection.ops.quote_name(cls._meta.pk.column)}, {key_columns}",
+                    params
+                )
+                by_key = {
+                    (notification.related_session_id, notification.recipient_id, notification.notification_type): notification
+                    for notification in batch
+                }
+                for pk, *key in cursor.fetchall():
+                    notification = by_key[tuple(key)]
+                    notification.pk = pk
+                    notification._state.adding = False
+                    notification._state.db = connection.alias
+                    created.append(notification)
+        return created
+
+    @classmethod
+    def bulk_create_once_per_session(cls, notifications):
+        """
+        Insert completion/reminder notifications in one statement, skipping those already sent (once-per-session
+        constraint), and publish the rows actually created to their recipients once the transaction commits.
+        """
+        if not notifications:
+            return []
+
+        created = cls.insert_ignoring_conflicts(notifications)
+        for notification in created:
+            counters.adjust(counters.NOTIFICATIONS, notification.recipient_id, 1)
+            metrics.NOTIFICATIONS.inc(type=notification.notification_type)
+        transaction.on_commit(lambda: realtime.publish_notifications(created))
+
+        return created
 
     @classmethod
     def create_new_review_notification(cls, review):
@@ -0,0 +1,132 @@
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+"""
+This module tracks which users are online without writing to the users table on every request.
+
+Heartbeats (authenticated API requests and WebSocket activity) only update a presence store in memory.
+A user is online while their last heartbeat is younger than PRESENCE_TTL seconds. The heartbeats are
+flushed to CustomUser.last_active / is_online in one batched write by a periodic job (see core.scheduler).
+
+Stores:
+- LocalPresenceStore: per-process dictionary, the default
+- CachePresenceStore: Django cache backend shared by all processes (PRESENCE_STORE = 'cache')
+"""
+class LocalPresenceStore:
+    def __init__(self):
+        self._last_seen = {}
+        self._lock = threading.Lock()
+
+    def set(self, user_id, seen_at, ttl):
+        with self._lock:
+            self._last_seen[user_id] = seen_at
+
+    def get_many(self, user_ids, ttl):
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+        with self._lock:
+            return {
+                user_id: self._last_seen[user_id]
+                for user_id in user_ids
+                if user_id in self._last_seen and self._last_seen[user_id] > cutoff
+            }
+
+    def prune(self, ttl):
+        cutoff = timezone.now() - timedelta(seconds=ttl)
+        with self._lock:
+            for user_id in [user_id for user_id, seen_at in self._last_seen.items() if seen_at <= cutoff]:
+                del self._last_seen[user_id]
+
+
+class CachePresenceStore:
+    """Keeps heartbeats in a Django cache so that every worker process sees the same online users"""
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def _key(self, user_id):
+        return f'presence:{user_id}'
+
+    def set(self, user_id, seen_at, ttl):
+        caches[self.alias].set(self._key(user_id), seen_at, timeout=ttl)
+
+    def get_many(self, user_ids, ttl):
+        found = caches[self.alias].get_many([self._key(user_id) for user_id in user_ids])
+        return {user_id: found[self._key(user_id)] for user_id in user_ids if self._key(user_id) in found}
+
+    def prune(self, ttl):
+        # Entries expire through the cache timeout
+        pass
+
+
+class PresenceTracker:
+    def __init__(self, store, ttl, write_interval):
+        self.store = store
+        self.ttl = ttl
+        # Minimum seconds between two store writes for the same user, so busy clients do not hammer the store
+        self.write_interval = write_interval
+        self._written = {}
+        self._dirty = {}
+        self._lock = threading.Lock()
+
+    def touch(self, user_id):
+        """Record a heartbeat for the user"""
+        now = timezone.now()
+
+        with self._lock:
+            self._dirty[user_id] = now
+            last_write = self._written.get(user_id)
+            if last_write and (now - last_write).total_seconds() < self.write_interval:
+                return
+            self._written[user_id] = now
+
+        self.store.set(user_id, now, self.ttl)
+
+    def last_seen(self, user_id):
+        return self.store.get_many([user_id], self.ttl).get(user_id)
+
+    def is_online(self, user_id):
+        return self.last_seen(user_id) is not None
+
+    def online_users(self, user_ids):
+        """Map of user id to last heartbeat for the given users that are currently online"""
+        return self.store.get_many(list(user_ids), self.ttl)
+
+    def flush(self):
+        """Write buffered heartbeats to the database in one batch and mark users without recent heartbeats offline"""
+        from core.models import CustomUser
+
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            self._written = {user_id: written for user_id, written in self._written.items() if written > cutoff}
+        self.store.prune(self.ttl)
+
+        if dirty:
+            CustomUser.objects.bulk_update(
+                [CustomUser(pk=user_id, last_active=seen_at, is_online=True) for user_id, seen_at in dirty.items()],
+                ['last_active', 'is_online'],
+                batch_size=500
+            )
+
+        went_offline = CustomUser.objects.filter(is_online=True).exclude(last_active__gt=cutoff).update(is_online=False)
+
+        return len(dirty), went_offline
+
+
+def _create_tracker():
+    if getattr(settings, 'PRESENCE_STORE', 'local') == 'cache':
+        store = CachePresenceStore(getattr(settings, 'PRESENCE_CACHE_ALIAS', 'default'))
+    else:
+        store = LocalPresenceStore()
+
+    return PresenceTracker(
+        store,
+        ttl=getattr(settings, 'PRESENCE_TTL', 300),
+        write_interval=getattr(settings, 'PRESENCE_WRITE_INTERVAL', 30)
+    )
+
+
+presence = _create_tracker()
@@ -0,0 +1,65 @@
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from core import metrics
+
+"""
+This module publishes events to connected WebSocket clients through the channel layer.
+
+Every authenticated connection joins a per-user group, so anything that concerns a user
+(new messages, read receipts, unread counters, notifications) is sent to that group and reaches all of the user's open tabs.
+Publishing is best effort: a failing channel layer must never break the request that triggered the event.
+"""
+logger = logging.getLogger(__name__)
+
+
+def user_group(user_id):
+    return f'user_{user_id}'
+
+
+def send_to_user(user_id, event_type, payload):
+    """Push an event to every WebSocket connection of the given user"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    try:
+        async_to_sync(channel_layer.group_send)(user_group(user_id), {
+            'type': 'user.event',
+            'event': {'type': event_type, **payload},
+        })
+        metrics.REALTIME_EVENTS.inc(type=event_type)
+    except Exception:
+        logger.exception("Failed to publish %s event to user %s", event_type, user_id)
+
+
+def publish_message_created(message):
+    """Deliver a new message to both participants, with the receiver's updated unread counter"""
+    from core.models import Conversation
+    from core.serializers import MessageSerializer
+
+    data = MessageSerializer(message).data
+    send_to_user(message.receiver_id, 'message.created', {
+        'message': data,
+        'unread_count': Conversation.objects.unread_total(message.receiver),
+    })
+    if message.sender_id != message.receiver_id:
+        send_to_user(message.sender_id, 'message.created', {'message': data})
+
+
+def publish_messages_read(reader, sender_id, count):
+    """Send a read receipt to the sender and the new unread counter to the reader"""
+    from core.models import Conversation
+
+    send_to_user(sender_id, 'messages.read', {'reader_id': reader.id, 'count': count})
+    send_to_user(reader.id, 'unread_count', {'unread_count': Conversation.objects.unread_total(reader)})
+
+
+def publish_notifications(notifications):
+    """Deliver newly created notifications to their recipients"""
+    from core.serializers import NotificationSerializer
+
+    for notification in notifications:
+        send_to_user(notification.recipient_id, 'notification.created', {
+            'notification': NotificationSerializer(notification).data,
+        })
@@ -0,0 +1,9 @@
+from django.urls import path
+from .consumers import UserEventsConsumer
+
+"""
+This module maps WebSocket URL patterns to consumers, the WebSocket counterpart of urls.py.
+"""
+websocket_urlpatterns = [
+    path('ws/events/', UserEventsConsumer.as_asgi(), name='ws-events'),
+]
@@ -0,0 +1,94 @@
+import logging
+import threading
+from django.conf import settings
+from django.db import close_old_connections
+
+"""
+This module contains the in-process scheduler that runs periodic maintenance jobs on background threads,
+so that housekeeping work never runs inside the request/response cycle.
+
+Jobs include:
+- Completing confirmed sessions that have ended
+- Flushing presence heartbeats to CustomUser.last_active
+- Writing the metrics of this process to the directory shared by the server's workers
+"""
+logger = logging.getLogger(__name__)
+
+_jobs = []
+
+
+class PeriodicJob(threading.Thread):
+    """Daemon thread that calls a function every `interval` seconds until stopped"""
+
+    def __init__(self, name, func, interval):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            close_old_connections()
+            try:
+                self.func()
+            except Exception:
+                logger.exception("Periodic job %s failed", self.name)
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def run_session_sweep(batch_size=1000):
+    from core.models import Session
+
+    report = Session.objects.complete_ended(batch_size=batch_size)
+    if report['completed']:
+        logger.info(
+            "Marked %d ended session(s) as completed in %d batch(es), %.3fs",
+            report['completed'], report['batches'], report['elapsed']
+        )
+    return report
+
+
+def run_presence_flush():
+    from core.presence import presence
+
+    return presence.flush()
+
+
+def run_metrics_flush():
+    from core import metrics
+
+    metrics.write_process_values(settings.METRICS_MULTIPROCESS_DIR)
+
+
+def start_scheduler():
+    """Start the configured periodic jobs once per process"""
+    if _jobs:
+        return _jobs
+
+    interval = getattr(settings, 'SESSION_SWEEPER_INTERVAL', None)
+    if interval:
+        _jobs.append(PeriodicJob('session-sweeper', run_session_sweep, interval))
+
+    # Heartbeats are buffered per process, so every serving process flushes its own
+    flush_interval = getattr(settings, 'PRESENCE_FLUSH_INTERVAL', None)
+    if flush_interval:
+        _jobs.append(PeriodicJob('presence-flush', run_presence_flush, flush_interval))
+
+    # Workers sharing a metrics directory each write their own values to it
+    metrics_directory = getattr(settings, 'METRICS_MULTIPROCESS_DIR', None)
+    if metrics_directory and getattr(settings, 'METRICS_ENABLED', False):
+        _jobs.append(PeriodicJob('metrics-flush', run_metrics_flush, settings.METRICS_FLUSH_INTERVAL))
+
+    for job in _jobs:
+        job.start()
+
+    return _jobs
+
+
+def stop_scheduler():
+    while _jobs:
+        _jobs.pop().stop()
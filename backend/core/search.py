@@ -0,0 +1,152 @@
+import re
+import threading
+from bisect import bisect_left
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Prefetch, Q, Value, When
+
+"""
+This module contains the tutor search index used by TutorSearchView.
+
+Every user carries a denormalized search document (username, names, topics, languages and location),
+refreshed by signals whenever one of its sources changes:
+- PostgreSQL: prefix full-text search over a weighted, GIN-indexed search_vector (document plus bio and
+  lesson description), combined with pg_trgm similarity on the document to tolerate typos, ranked in SQL
+- Other databases (SQLite test runs): an in-memory inverted index over the same fields
+"""
+# Document fields rank above free-text profile fields
+DOCUMENT_WEIGHT = 1.0
+PROFILE_TEXT_WEIGHT = 0.4
+
+SEARCH_VECTOR = (
+    SearchVector('search_document', weight='A', config='simple') +
+    SearchVector('bio', 'lesson_description', weight='C', config='simple')
+)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def build_search_document(user, topic_names, language_names):
+    parts = [user.username, user.first_name, user.last_name, *topic_names, *language_names, user.location]
+    return ' '.join(part for part in parts if part)
+
+
+def refresh_search_documents(user_ids):
+    """Rebuild the search document (and on PostgreSQL the search vector) of the given users"""
+    from core.models import CustomUser, TutorLanguage, TutorTopic
+
+    user_ids = list(user_ids)
+    users = CustomUser.objects.filter(pk__in=user_ids).only(
+        'id', 'username', 'first_name', 'last_name', 'location'
+    ).prefetch_related(
+        Prefetch('tutortopic_set', queryset=TutorTopic.objects.select_related('topic')),
+        Prefetch('tutorlanguage_set', queryset=TutorLanguage.objects.select_related('language'))
+    )
+
+    for user in users:
+        user.search_document = build_search_document(
+            user,
+            [tutor_topic.topic.name for tutor_topic in user.tutortopic_set.all()],
+            [tutor_language.language.name for tutor_language in user.tutorlanguage_set.all()]
+        )
+    CustomUser.objects.bulk_update(users, ['search_document'], batch_size=500)
+
+    if connection.vendor == 'postgresql':
+        CustomUser.objects.filter(pk__in=user_ids).update(search_vector=SEARCH_VECTOR)
+
+    fallback_index.invalidate()
+
+
+class PostgresTutorSearch:
+    # Minimum pg_trgm similarity for a typo-tolerant match (the pg_trgm default)
+    similarity_threshold = 0.3
+
+    def search(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset.none()
+
+        # Prefix match every term, so that "math" finds "Mathematics"
+        ts_query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='simple')
+
+        return queryset.annotate(
+            rank=SearchRank(F('search_vector'), ts_query) + TrigramSimilarity('search_document', query)
+        ).filter(
+            Q(search_vector=ts_query) | Q(search_document__trigram_similar=query)
+        ).order_by('-rank', 'id')
+
+
+class InMemoryTutorSearch:
+    """Inverted index of user documents, rebuilt lazily after any document changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._vocabulary = []
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = None
+
+    def _build(self):
+        from core.models import CustomUser
+
+        postings = {}
+        rows = CustomUser.objects.values_list('id', 'search_document', 'bio', 'lesson_description')
+        for user_id, document, bio, lesson_description in rows:
+            weighted_tokens = [(token, DOCUMENT_WEIGHT) for token in tokenize(document)]
+            weighted_tokens += [(token, PROFILE_TEXT_WEIGHT) for token in tokenize(f'{bio or ""} {lesson_description or ""}')]
+            for token, weight in weighted_tokens:
+                scores = postings.setdefault(token, {})
+                scores[user_id] = max(scores.get(user_id, 0), weight)
+
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+
+    def _prefix_scores(self, term):
+        scores = {}
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            for user_id, weight in self._postings[self._vocabulary[position]].items():
+                scores[user_id] = max(scores.get(user_id, 0), weight)
+            position += 1
+        return scores
+
+    def scores(self, query):
+        """Score per user id for users matching every term of the query"""
+        terms = tokenize(query)
+        if not terms:
+            return {}
+
+        with self._lock:
+            if self._postings is None:
+                self._build()
+            per_term = [self._prefix_scores(term) for term in terms]
+
+        matching = set.intersection(*(set(scores) for scores in per_term))
+        return {user_id: sum(scores[user_id] for scores in per_term) for user_id in matching}
+
+    def search(self, queryset, query):
+        scores = self.scores(query)
+        if not scores:
+            return queryset.none()
+
+        rank = Case(
+            *[When(pk=user_id, then=Value(score)) for user_id, score in scores.items()],
+            output_field=FloatField()
+        )
+        return queryset.filter(pk__in=scores).annotate(rank=rank).order_by('-rank', 'id')
+
+
+fallback_index = InMemoryTutorSearch()
+postgres_search = PostgresTutorSearch()
+
+
+def search_tutors(queryset, query):
+    """Filter and rank the queryset by relevance to the query with the best index for the database"""
+    engine = postgres_search if connection.vendor == 'postgresql' else fallback_index
+    return engine.search(queryset, query)
@@ -1,5 +1,8 @@
 from .models import *
+from .presence import presence
+from .booking import validate_booking
 from rest_framework import serializers
+from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth.password_validation import validate_password
@@ -30,7 +33,21 @@ class BaseUserSerializer(serializers.ModelSerializer):
             return url.replace('/api/media/', '/media/') # clean up API prefix in URL
         return obj.profile_picture.url
 
+class CustomUserListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # Look up the presence of the whole page at once instead of once per user
+        users = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.child.online_users = presence.online_users(user.id for user in users)
+        try:
+            return super().to_representation(users)
+        finally:
+            self.child.online_users = None
+
 class CustomUserSerializer(BaseUserSerializer):
+    """
+    Serializes users from related data only: querysets should be built with CustomUser.objects.with_profile()
+    (or CustomUserQuerySet.profile_prefetches() below a relation) so that a page costs a fixed number of queries.
+    """
     profile_picture = serializers.SerializerMethodField()
     roles = serializers.SlugRelatedField(
         many=True,
@@ -38,15 +55,49 @@ class CustomUserSerializer(BaseUserSerializer):
         queryset=Role.objects.all(),
     )
     topics = serializers.SerializerMethodField()
+    languages = serializers.SerializerMethodField()
+    is_online = serializers.SerializerMethodField()
+    last_active = serializers.SerializerMethodField()
+
+    # Set by CustomUserListSerializer while a page is serialized
+    online_users = None
 
     def get_profile_picture(self, obj):
         request = self.context.get('request')
         return self.get_profile_picture_url(obj, request)
 
+    def _last_seen(self, obj):
+        if self.online_users is not None:
+            return self.online_users.get(obj.id)
+        return presence.last_seen(obj.id)
+
+    def get_is_online(self, obj):
+        return self._last_seen(obj) is not None
+
+    def get_last_active(self, obj):
+        # The latest heartbeat may not have been flushed to the database yet
+        last_seen = self._last_seen(obj) or obj.last_active
+        return serializers.DateTimeField().to_representation(last_seen) if last_seen else None
+
+    def _related(self, obj, related_name, field_name):
+        related = getattr(obj, related_name).all()
+        if related_name not in getattr(obj, '_prefetched_objects_cache', {}):
+            related = related.select_related(field_name)
+        return [getattr(item, field_name).name for item in related]
+
+    def _is_tutor(self, obj):
+        # Iterate over the related manager so that prefetched roles are reused
+        return any(role.name == 'Tutor' for role in obj.roles.all())
+
     def get_topics(self, obj):
-        if obj.roles.filter(name='Tutor').exists():
-            return [topic.topic.name for topic in TutorTopic.objects.filter(tutor=obj)]
-        return []
+        if not self._is_tutor(obj):
+            return []
+        return self._related(obj, 'tutortopic_set', 'topic')
+
+    def get_languages(self, obj):
+        if not self._is_tutor(obj):
+            return []
+        return self._related(obj, 'tutorlanguage_set', 'language')
 
     class Meta:
         model = CustomUser
@@ -54,10 +105,12 @@ class CustomUserSerializer(BaseUserSerializer):
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name',
             'roles', 'profile_picture', 'bio', 'preferred_mode', 'location',
-            'lesson_description', 'hourly_rate', 'is_online', 'last_active', 'date_joined', 'topics'
+            'lesson_description', 'hourly_rate', 'average_rating', 'total_ratings',
+            'is_online', 'last_active', 'date_joined', 'topics', 'languages'
         ]
+        list_serializer_class = CustomUserListSerializer
         # Read-only fields
-        read_only_fields = ['id', 'is_online', 'last_active', 'date_joined']
+        read_only_fields = ['id', 'average_rating', 'total_ratings', 'is_online', 'last_active', 'date_joined']
 
     def update(self, instance, validated_data):
         roles_data = validated_data.pop('roles', None)
@@ -252,9 +305,8 @@ class TutorLanguageSerializer(serializers.ModelSerializer):
 class SessionSerializer(serializers.ModelSerializer):
     tutor_name = serializers.CharField(source='tutor.username', read_only=True)
     student_name = serializers.CharField(source='student.username', read_only=True)
-    tutor = serializers.PrimaryKeyRelatedField(
-        queryset=CustomUser.objects.filter(roles__name__iexact='Tutor')
-    )
+    # The Tutor role is checked by core.booking, which reports it as a structured failure reason
+    tutor = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all())
 
     class Meta:
         model = Session
@@ -266,31 +318,25 @@ class SessionSerializer(serializers.ModelSerializer):
         read_only_fields = ['student', 'created_at', 'updated_at']
 
     def validate(self, attrs):
-        # Validate the booking time
-        date_time = attrs.get('date_time')
-        tutor = attrs.get('tutor')
+        # New bookings are validated as a whole by core.booking.create_booking
+        if self.instance is None:
+            return attrs
 
-        if date_time and date_time < timezone.now():
-            raise serializers.ValidationError({
-                "date_time": "Cannot book sessions in the past"
-            })
-
-        # Check tutor availability
-        if date_time and tutor:
-            duration = attrs.get('duration', timedelta(hours=1))
-            if not Availability.objects.filter(
-                tutor=tutor,
-                available_date=date_time.date(),
-                available_time_start__lte=date_time.time(),
-                available_time_end__gte=(date_time + duration).time()
-            ).exists():
-                raise serializers.ValidationError({
-                    "date_time": "Tutor is not available at this time"
-                })
+        tutor = attrs.get('tutor', self.instance.tutor)
+        date_time = attrs.get('date_time', self.instance.date_time)
+        duration = attrs.get('duration', self.instance.duration)
+        if (tutor.id, date_time, duration) != (self.instance.tutor_id, self.instance.date_time, self.instance.duration):
+            validate_booking(tutor.id, self.instance.student_id, date_time, duration, exclude_session_id=self.instance.pk)
 
         return attrs
 
 class AvailabilitySerializer(serializers.ModelSerializer):
+    """
+    One-off availability. For compatibility with clients of the former `recurring` flag, saving with
+    recurring=true creates a weekly AvailabilityRule for the weekday of available_date instead.
+    """
+    recurring = serializers.BooleanField(default=False)
+
     class Meta:
         model = Availability
         fields = [
@@ -298,6 +344,83 @@ class AvailabilitySerializer(serializers.ModelSerializer):
             'available_time_end', 'recurring'
         ]
 
+    def validate(self, attrs):
+        time_start = attrs.get('available_time_start', getattr(self.instance, 'available_time_start', None))
+        time_end = attrs.get('available_time_end', getattr(self.instance, 'available_time_end', None))
+        if time_start and time_end and time_start >= time_end:
+            raise serializers.ValidationError({"available_time_end": "The end time must be after the start time"})
+        return attrs
+
+    def create(self, validated_data):
+        if validated_data.pop('recurring', False):
+            return AvailabilityRule.objects.create(
+                tutor=validated_data['tutor'],
+                weekdays=AvailabilityRule.weekday_mask([validated_data['available_date'].weekday()]),
+                start_time=validated_data['available_time_start'],
+                end_time=validated_data['available_time_end'],
+                valid_from=validated_data['available_date']
+            )
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        validated_data.pop('recurring', None)
+        return super().update(instance, validated_data)
+
+    def to_representation(self, instance):
+        if isinstance(instance, AvailabilityRule):
+            return recurring_availability_slots([instance])[0]
+        return {**super().to_representation(instance), 'recurring': False}
+
+class AvailabilityExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AvailabilityException
+        fields = ['id', 'date']
+
+class AvailabilityRuleSerializer(serializers.ModelSerializer):
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        allow_empty=False,
+        source='weekday_list',
+        help_text="Python weekdays, 0 = Monday"
+    )
+    exceptions = AvailabilityExceptionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = AvailabilityRule
+        fields = ['id', 'weekdays', 'start_time', 'end_time', 'valid_from', 'valid_until', 'exceptions']
+
+    def validate(self, attrs):
+        if 'weekday_list' in attrs:
+            attrs['weekdays'] = AvailabilityRule.weekday_mask(attrs.pop('weekday_list'))
+
+        start_time = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end_time = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        if start_time and end_time and start_time >= end_time:
+            raise serializers.ValidationError({"end_time": "The end time must be after the start time"})
+
+        valid_from = attrs.get('valid_from', getattr(self.instance, 'valid_from', None))
+        valid_until = attrs.get('valid_until', getattr(self.instance, 'valid_until', None))
+        if valid_from and valid_until and valid_until < valid_from:
+            raise serializers.ValidationError({"valid_until": "valid_until cannot be before valid_from"})
+
+        return attrs
+
+def recurring_availability_slots(rules):
+    """Render rules in the one-off availability shape used by /set-availability/, one entry per weekday"""
+    slots = []
+    for rule in rules:
+        for weekday in rule.weekday_list:
+            # First date on or after valid_from with the weekday, from which clients repeat the slot weekly
+            first_date = rule.valid_from + timedelta(days=(weekday - rule.valid_from.weekday()) % 7)
+            slots.append({
+                'id': f'rule-{rule.id}-{weekday}',
+                'available_date': first_date.isoformat(),
+                'available_time_start': rule.start_time.isoformat(),
+                'available_time_end': rule.end_time.isoformat(),
+                'recurring': True,
+            })
+    return slots
+
 class MessageSerializer(serializers.ModelSerializer):
     sender = serializers.PrimaryKeyRelatedField(read_only=True)
     receiver = serializers.PrimaryKeyRelatedField(queryset=CustomUser.objects.all())
@@ -307,6 +430,14 @@ class MessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Message
         fields = ['id', 'sender', 'receiver', 'sender_name', 'receiver_name', 'message', 'timestamp', 'is_read']
+        # Messages are only marked as read through the mark-read action, which keeps the unread counters in step
+        read_only_fields = ['is_read']
+
+    def validate_receiver(self, receiver):
+        # Moving a message to another thread would leave both conversation summaries wrong
+        if self.instance is not None and receiver.id != self.instance.receiver_id:
+            raise serializers.ValidationError('The receiver of a message cannot be changed')
+        return receiver
 
     def create(self, validated_data):
         validated_data['sender'] = self.context['request'].user
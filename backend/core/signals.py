@@ -1,8 +1,17 @@
-from django.db.models.signals import post_migrate, post_save
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils import timezone
 from datetime import timedelta
-from core.models import Role, Session, Review, Notification
+from core.models import (
+    CustomUser, Role, Topic, TutorTopic, Language, TutorLanguage,
+    Session, Review, Message, Conversation, Notification, AvailabilityRule, AvailabilityException
+)
+from core.availability import invalidate_rule_slots
+from core.search import refresh_search_documents
+from core import counters, metrics, realtime
+from core.middleware import record_queries
 
 """
 This module contains Signal handlers that respond to Model events.
@@ -11,8 +20,15 @@ These handlers maintain data integrity, trigger notifications & perform automate
 Signal handlers include:
 - Creating default roles after database migrations
 - Managing notifications for session status changes
-- Updating tutor ratings when reviews are created
+- Updating tutor ratings incrementally when reviews are created, edited or deleted
 - Processing session reminders for upcoming appointments
+- Pushing new messages and notifications to connected WebSocket clients
+- Keeping conversations and unread message counters up to date when messages are deleted
+- Keeping the cached unread notification counters up to date
+- Counting created notifications in the metrics registry
+- Keeping the tutor search documents up to date
+- Invalidating cached availability rule expansions
+- Recording the queries of instrumented requests on every new database connection
 """
 @receiver(post_migrate)
 def create_default_roles(sender, **kwargs):
@@ -22,38 +38,16 @@ def create_default_roles(sender, **kwargs):
 
 @receiver(post_save, sender=Session)
 def handle_session_updates(sender, instance, created, **kwargs):
-    # Check if status changed to 'completed'
+    # Notify the student when the session is completed (at most once, enforced by a unique constraint)
     if not created and instance.status == 'completed':
-        # Check if a notification already exists for this session
-        existing_notification = Notification.objects.filter(
-            related_session=instance,
-            notification_type='session_completed',
-            recipient=instance.student
-        ).exists()
-
-        # Only create a notification if one doesn't already exist
-        if not existing_notification:
-            Notification.create_session_completed_notification(instance)
+        Notification.create_session_completed_notification(instance)
 
     # Check if session is tomorrow and create reminder
     if instance.status == 'confirmed':
         session_date = instance.date_time.date()
         tomorrow = timezone.now().date() + timedelta(days=1)
         if session_date == tomorrow:
-            student_notified = Notification.objects.filter(
-                recipient=instance.student,
-                notification_type='session_reminder',
-                related_session=instance
-            ).exists()
-
-            tutor_notified = Notification.objects.filter(
-                recipient=instance.tutor,
-                notification_type='session_reminder',
-                related_session=instance
-            ).exists()
-
-            if not student_notified or not tutor_notified:
-                Notification.create_session_reminder(instance)
+            Notification.create_session_reminder(instance)
 
 @receiver(post_save, sender=Review)
 def handle_review_created(sender, instance, created, **kwargs):
@@ -62,6 +56,94 @@ def handle_review_created(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=Review)
 def update_tutor_rating_on_review(sender, instance, created, **kwargs):
-    if instance.session and instance.session.tutor:
-        tutor = instance.session.tutor
-        avg_rating, total_ratings = tutor.update_rating()
+    rating = int(instance.rating)
+    stored_rating = getattr(instance, '_stored_rating', None)
+
+    if created:
+        CustomUser.apply_rating_change(instance.session.tutor_id, rating, 1)
+    elif stored_rating is not None and stored_rating != rating:
+        CustomUser.apply_rating_change(instance.session.tutor_id, rating - stored_rating, 0)
+
+    instance._stored_rating = rating
+
+@receiver(post_delete, sender=Review)
+def update_tutor_rating_on_review_delete(sender, instance, **kwargs):
+    rating = getattr(instance, '_stored_rating', None) or int(instance.rating)
+    CustomUser.apply_rating_change(instance.session.tutor_id, -rating, -1)
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: realtime.publish_message_created(instance))
+
+@receiver(post_delete, sender=Message)
+def update_conversation_on_message_delete(sender, instance, origin=None, **kwargs):
+    if not instance.is_read:
+        counters.adjust(counters.MESSAGES, instance.receiver_id, -1)
+    # Deleting a user deletes their conversations along with their messages
+    if not isinstance(origin, CustomUser):
+        Conversation.record_deletion(instance)
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: realtime.publish_notifications([instance]))
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        counters.adjust(counters.NOTIFICATIONS, instance.recipient_id, 1)
+
+@receiver(post_save, sender=Notification)
+def record_notification_metric(sender, instance, created, **kwargs):
+    if created:
+        metrics.NOTIFICATIONS.inc(type=instance.notification_type)
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        counters.adjust(counters.NOTIFICATIONS, instance.recipient_id, -1)
+
+# Profile fields that feed the tutor search index
+SEARCHABLE_USER_FIELDS = {'username', 'first_name', 'last_name', 'location', 'bio', 'lesson_description'}
+
+@receiver(post_save, sender=CustomUser)
+def refresh_user_search_document(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCHABLE_USER_FIELDS.intersection(update_fields):
+        return
+    refresh_search_documents([instance.pk])
+
+@receiver(post_save, sender=TutorTopic)
+@receiver(post_delete, sender=TutorTopic)
+@receiver(post_save, sender=TutorLanguage)
+@receiver(post_delete, sender=TutorLanguage)
+def refresh_tutor_search_document(sender, instance, **kwargs):
+    refresh_search_documents([instance.tutor_id])
+
+@receiver(post_save, sender=Topic)
+def refresh_search_documents_on_topic_rename(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(TutorTopic.objects.filter(topic=instance).values_list('tutor_id', flat=True))
+
+@receiver(post_save, sender=Language)
+def refresh_search_documents_on_language_rename(sender, instance, created, **kwargs):
+    if not created:
+        refresh_search_documents(TutorLanguage.objects.filter(language=instance).values_list('tutor_id', flat=True))
+
+@receiver(post_save, sender=AvailabilityRule)
+@receiver(post_delete, sender=AvailabilityRule)
+def invalidate_availability_rule_cache(sender, instance, **kwargs):
+    tutor_id = instance.tutor_id
+    transaction.on_commit(lambda: invalidate_rule_slots(tutor_id))
+
+@receiver(post_save, sender=AvailabilityException)
+@receiver(post_delete, sender=AvailabilityException)
+def invalidate_availability_exception_cache(sender, instance, **kwargs):
+    tutor_id = instance.rule.tutor_id
+    transaction.on_commit(lambda: invalidate_rule_slots(tutor_id))
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    # The connection object outlives reconnections, install the wrapper once
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
@@ -0,0 +1,89 @@
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from core.auth import JWTAuthMiddleware
+from core.models import CustomUser, Message
+from core.routing import websocket_urlpatterns
+
+"""
+WebSocket events of core.consumers, over the in-memory channel layer: authentication of the connection, and
+delivery of new messages and read receipts to both participants.
+"""
+application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class UserEventsConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = CustomUser.objects.create_user(username='alice', email='alice@example.com')
+        self.bob = CustomUser.objects.create_user(username='bob', email='bob@example.com')
+
+    def communicator(self, token=None, headers=None):
+        subprotocols = ['bearer', token] if token else None
+        return WebsocketCommunicator(application, '/ws/events/', headers=headers or [], subprotocols=subprotocols)
+
+    async def connect(self, user):
+        communicator = self.communicator(str(AccessToken.for_user(user)))
+        connected, subprotocol = await communicator.connect()
+        self.assertTrue(connected)
+        self.assertEqual(subprotocol, 'bearer')
+        return communicator
+
+    async def test_rejects_missing_token(self):
+        connected, code = await self.communicator().connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_rejects_invalid_token(self):
+        connected, code = await self.communicator('not-a-token').connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_ignores_query_string_token(self):
+        token = str(AccessToken.for_user(self.alice))
+        connected, code = await WebsocketCommunicator(application, f'/ws/events/?token={token}').connect()
+        self.assertFalse(connected)
+        self.assertEqual(code, 4401)
+
+    async def test_accepts_authorization_header(self):
+        token = str(AccessToken.for_user(self.alice))
+        communicator = self.communicator(headers=[(b'authorization', f'Bearer {token}'.encode())])
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.disconnect()
+
+    async def test_delivers_messages_and_read_receipts(self):
+        alice = await self.connect(self.alice)
+        bob = await self.connect(self.bob)
+
+        await database_sync_to_async(Message.objects.create)(sender=self.alice, receiver=self.bob, message='Hello')
+
+        received = await bob.receive_json_from()
+        self.assertEqual(received['type'], 'message.created')
+        self.assertEqual(received['message']['message'], 'Hello')
+        self.assertEqual(received['unread_count'], 1)
+        sent = await alice.receive_json_from()
+        self.assertEqual(sent['type'], 'message.created')
+        self.assertNotIn('unread_count', sent)
+
+        def mark_read():
+            client = APIClient()
+            client.force_authenticate(self.bob)
+            return client.post('/api/messages/mark-read/', {'sender_id': self.alice.id}, format='json')
+
+        response = await database_sync_to_async(mark_read)()
+        self.assertEqual(response.status_code, 200)
+
+        receipt = await alice.receive_json_from()
+        self.assertEqual(receipt, {'type': 'messages.read', 'reader_id': self.bob.id, 'count': 1})
+        counter = await bob.receive_json_from()
+        self.assertEqual(counter, {'type': 'unread_count', 'unread_count': 0})
+
+        self.assertTrue(await alice.receive_nothing())
+        await alice.disconnect()
+        await bob.disconnect()
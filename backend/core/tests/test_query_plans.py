@@ -0,0 +1,71 @@
+import re
+from datetime import timedelta
+from unittest import skipUnless
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+from core.availability import BLOCKING_STATUSES, MAX_SESSION_DURATION
+from core.datagen import generate_dataset
+from core.models import Availability, Conversation, Message, Notification, Role, Session
+
+"""
+Query plans of the hot paths: EXPLAIN the queries of the busiest endpoints and fail if any of them reads a whole
+table, i.e. if no index serves it.
+
+Sequential scans are disabled for the check, so that the planner picks any usable index even on a small seeded
+dataset. Only PostgreSQL is checked: SQLite's query planner reports and chooses scans differently.
+"""
+SEQUENTIAL_SCAN_RE = re.compile(r'Seq Scan on (\w+)')
+
+
+def first_value(queryset, field):
+    return queryset.values_list(field, flat=True).first()
+
+
+def hot_path_queries():
+    """(name, queryset) pairs mirroring the queries of the busiest endpoints"""
+    tutor_id = first_value(Session.objects.order_by('id'), 'tutor_id')
+    student_id = first_value(Session.objects.order_by('id'), 'student_id')
+    receiver_id = first_value(Message.objects.order_by('id'), 'receiver_id')
+    sender_id = first_value(Message.objects.order_by('id'), 'sender_id')
+    recipient_id = first_value(Notification.objects.order_by('id'), 'recipient_id')
+    now = timezone.now()
+    today = timezone.localdate()
+
+    return [
+        ('message thread', Message.objects.thread(receiver_id, sender_id).order_by('-timestamp', '-id')[:50]),
+        ('messages mark-read', Message.objects.filter(sender_id=sender_id, receiver_id=receiver_id, is_read=False)),
+        ('conversation inbox', Conversation.objects.inbox(receiver_id)[:20]),
+        ('notification list', Notification.objects.filter(recipient_id=recipient_id)[:25]),
+        ('unread notifications', Notification.objects.filter(recipient_id=recipient_id, is_read=False)),
+        ('session list', Session.objects.filter(Q(student_id=student_id) | Q(tutor_id=student_id), status='confirmed')),
+        ('session overlap', Session.objects.overlapping(tutor_id, now, timedelta(hours=1))),
+        ('tutor busy time', Session.objects.filter(
+            tutor_id=tutor_id,
+            status__in=BLOCKING_STATUSES,
+            date_time__lt=now + timedelta(days=7),
+            date_time__gt=now - MAX_SESSION_DURATION
+        )),
+        ('due sessions', Session.objects.filter(status='confirmed', date_time__lt=now)),
+        ('tutor availability', Availability.objects.filter(tutor_id=tutor_id, available_date__range=(today, today + timedelta(days=6)))),
+    ]
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Query plans are only checked on PostgreSQL')
+class HotPathQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for name in ('Tutor', 'Student'):
+            Role.objects.get_or_create(name=name)
+        generate_dataset(users=40, sessions=200, messages=400)
+
+    def test_hot_path_queries_use_an_index(self):
+        with connection.cursor() as cursor:
+            # Lasts until the end of the test's transaction
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        for name, queryset in hot_path_queries():
+            with self.subTest(name):
+                plan = queryset.explain()
+                self.assertIsNone(SEQUENTIAL_SCAN_RE.search(plan), f'{name} reads a whole table:\n{plan}')
@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import Availability, AvailabilityRule, CustomUser, Role, Session
+
+"""
+Rescheduling: the tutor may only propose a time covered by their availability (a one-off slot or a weekly rule) and
+free of their other sessions. Proposals never create availability.
+"""
+ALL_WEEKDAYS = 0b1111111
+
+
+class RescheduleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor = CustomUser.objects.create_user(username='tutor', email='tutor@example.com')
+        cls.tutor.roles.add(Role.objects.get_or_create(name='Tutor')[0])
+        cls.student = CustomUser.objects.create_user(username='student', email='student@example.com')
+        cls.student.roles.add(Role.objects.get_or_create(name='Student')[0])
+
+        cls.day = timezone.localdate() + timedelta(days=2)
+        Availability.objects.create(
+            tutor=cls.tutor, available_date=cls.day, available_time_start=time(9), available_time_end=time(12)
+        )
+        cls.session = Session.objects.create(
+            tutor=cls.tutor, student=cls.student, date_time=cls.at(cls.day, 9), duration=timedelta(hours=1),
+            status='confirmed'
+        )
+
+    @staticmethod
+    def at(day, hour):
+        return timezone.make_aware(datetime.combine(day, time(hour)))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.tutor)
+
+    def reschedule(self, date_time):
+        return self.client.post(
+            f'/api/sessions/{self.session.pk}/reschedule/', {'date_time': date_time.isoformat()}, format='json'
+        )
+
+    def test_rejects_a_time_without_availability(self):
+        response = self.reschedule(self.at(self.day, 15))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 'unavailable')
+        self.assertEqual(Availability.objects.count(), 1)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, 'confirmed')
+
+    def test_accepts_a_one_off_slot(self):
+        response = self.reschedule(self.at(self.day, 10))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Availability.objects.count(), 1)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, 'reschedule_pending')
+
+    def test_accepts_a_weekly_rule_slot(self):
+        AvailabilityRule.objects.create(
+            tutor=self.tutor, weekdays=ALL_WEEKDAYS, start_time=time(14), end_time=time(18), valid_from=self.day
+        )
+
+        response = self.reschedule(self.at(self.day + timedelta(days=1), 15))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Availability.objects.count(), 1)
+
+    def test_rejects_a_time_overlapping_another_session(self):
+        Session.objects.create(
+            tutor=self.tutor, student=self.student, date_time=self.at(self.day, 11), duration=timedelta(hours=1),
+            status='confirmed'
+        )
+
+        response = self.reschedule(self.at(self.day, 10) + timedelta(minutes=30))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['code'], 'overlap')
@@ -0,0 +1,77 @@
+from unittest import mock
+from django.db import connection, reset_queries
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+from core.models import CustomUser, Language, Role, Topic, TutorLanguage, TutorTopic
+
+"""
+Query count of the tutor and user listings: serializing a page must read its relations from prefetched data only, so the
+number of queries depends neither on the number of tutors nor on the page size.
+"""
+PAGE_SIZE = PageNumberPagination.page_size
+
+
+class TutorListingQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tutor_role = Role.objects.get_or_create(name='Tutor')[0]
+        cls.topics = [Topic.objects.create(name=name) for name in ('Mathematics', 'Physics', 'Chemistry')]
+        cls.languages = [Language.objects.create(name=name) for name in ('English', 'French')]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.tutor_count = 0
+
+    def create_tutors(self, count):
+        for number in range(self.tutor_count, self.tutor_count + count):
+            tutor = CustomUser.objects.create_user(
+                username=f'tutor{number}', email=f'tutor{number}@example.com',
+                first_name='Ada', last_name=f'Tutor{number}', hourly_rate=40
+            )
+            tutor.roles.add(self.tutor_role)
+            for topic in self.topics[:number % 3 + 1]:
+                TutorTopic.objects.create(tutor=tutor, topic=topic)
+            TutorLanguage.objects.create(tutor=tutor, language=self.languages[number % 2])
+        self.tutor_count += count
+
+    def warm_up(self, url):
+        # The first request after tutors change rebuilds the lazily built SQLite search index, so only the
+        # following ones are measured
+        self.assertEqual(self.client.get(url).status_code, 200)
+        # Seeding fills the capped query log, which would leave nothing to count
+        reset_queries()
+
+    def assert_fixed_query_count(self, url, other_users=0):
+        self.create_tutors(PAGE_SIZE * 2)
+        self.warm_up(url)
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get(url)
+        queries = len(baseline)
+        self.assertEqual(len(response.data['results']), PAGE_SIZE)
+
+        # Ten pages of tutors instead of two
+        self.create_tutors(PAGE_SIZE * 8)
+        self.warm_up(url)
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.data['count'], PAGE_SIZE * 10 + other_users)
+        self.assertEqual(len(response.data['results']), PAGE_SIZE)
+
+        # Pages four times as large
+        with mock.patch.object(PageNumberPagination, 'page_size', PAGE_SIZE * 4):
+            self.warm_up(url)
+            with self.assertNumQueries(queries):
+                response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), PAGE_SIZE * 4)
+
+    def test_tutor_list_query_count_is_fixed(self):
+        self.assert_fixed_query_count('/api/tutors/')
+
+    def test_tutor_search_query_count_is_fixed(self):
+        self.assert_fixed_query_count('/api/tutors/search/?q=ada')
+
+    def test_user_list_query_count_is_fixed(self):
+        self.client.force_authenticate(CustomUser.objects.create_user(username='student', email='student@example.com'))
+        self.assert_fixed_query_count('/api/users/', other_users=1)
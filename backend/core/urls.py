@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from django.conf import settings
 from django.conf.urls.static import static
 from .views import *
+from .async_views import notification_list, notification_unread_count, serve_reads, user_profile
 
 """
 This module maps URL patterns to view functions or classes, defining all accessible API endpoints.
@@ -17,6 +18,7 @@ router.register(r'languages', LanguageViewSet)
 router.register(r'tutor-languages', TutorLanguageViewSet)
 router.register(r'sessions', SessionViewSet, basename='session')
 router.register(r'availabilities', AvailabilityViewSet)
+router.register(r'availability-rules', AvailabilityRuleViewSet, basename='availability-rule')
 router.register(r'messages', MessageViewSet, basename='message')
 router.register(r'notifications', NotificationViewSet, basename='notification')
 
@@ -27,6 +29,8 @@ urlpatterns = [
     path('profile/', UserProfileView.as_view(), name='user-profile'),
     path('profile/<str:username>/', UserProfileView.as_view(), name='user-profile-by-username'),
     path('tutors/search/', TutorSearchView.as_view(), name='tutor-search'),
+    path('tutors/available/', TutorAvailabilitySearchView.as_view(), name='tutor-available'),
+    path('tutors/<int:tutor_id>/calendar/', TutorCalendarView.as_view(), name='tutor-calendar'),
     path('update-role/', UpdateRoleView.as_view(), name='update-role'),
     path('reviews/<int:tutor_id>/', TutorReviewsView.as_view(), name='tutor-reviews'),
     path('submit-review/', SubmitReviewView.as_view(), name='submit-review'),
@@ -34,4 +38,21 @@ urlpatterns = [
     path('reviews/reviewed-tutors/', ReviewedTutorsView.as_view(), name='reviewed-tutors'),
     path('set-availability/', AvailabilityUpdateView.as_view(), name='set-availability'),
     path('change-password/', PasswordChangeView.as_view(), name='change-password'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+if settings.ASYNC_READ_VIEWS:
+    # Async variants of the hottest reads (see core.async_views), matched before the routes they stand in for
+    urlpatterns = [
+        path(
+            'notifications/',
+            serve_reads(notification_list, NotificationViewSet.as_view({'get': 'list', 'post': 'create'})),
+            name='notification-list'
+        ),
+        path('notifications/unread-count/', notification_unread_count, name='notification-unread-count'),
+        path(
+            'profile/<str:username>/',
+            serve_reads(user_profile, UserProfileView.as_view()),
+            name='user-profile-by-username'
+        ),
+    ] + urlpatterns
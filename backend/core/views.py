@@ -1,17 +1,34 @@
 from .models import *
 from .serializers import *
+from . import counters, metrics, realtime
+from .search import search_tutors
+from .filters import TutorFilterSet, facet_counts
+from .availability import (
+    AvailabilityBatchError, AvailabilityWindowError, find_available_tutors, tutor_calendar, upsert_availability
+)
+from .booking import BookingError, create_booking, validate_reschedule
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView, RetrieveAPIView
-from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.exceptions import NotFound, ValidationError, PermissionDenied
 from rest_framework.decorators import action
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render, get_object_or_404
+from django.db import transaction
 from django.db.models import Q, OuterRef, Subquery, Max
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import parse_etags, quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from datetime import datetime
+import hashlib
+import hmac
+import json
 import os
 
 """
@@ -25,9 +42,10 @@ They include functionality for:
 - Review submission and retrieval
 - Tutor availability management
 - Notification handling
+- Metrics exposition for monitoring
 """
 class CustomUserViewSet(viewsets.ModelViewSet):
-    queryset = CustomUser.objects.all()
+    queryset = CustomUser.objects.with_profile().order_by('id')
     serializer_class = CustomUserSerializer
     permission_classes = [IsAuthenticated]
 
@@ -176,8 +194,6 @@ class SessionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        Session.auto_complete_sessions()
-
         user = self.request.user
         status_filter = self.request.query_params.get('status')
         tutor_id = self.request.query_params.get('tutor')
@@ -191,101 +207,30 @@ class SessionViewSet(viewsets.ModelViewSet):
 
         return queryset.order_by('-date_time')
 
-    def create(self, request, *args, **kwargs):
-        tutor_id = request.data.get('tutor')
-        tutor = CustomUser.objects.filter(
-            id=tutor_id,
-            roles__name__iexact='Tutor'
-        ).first()
-
-        if not tutor:
-            return Response(
-                {"error": "Invalid tutor ID or user is not a tutor"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Extract date_time from request data
-        date_time_str = request.data.get('date_time')
-        try:
-            date_time = parse_datetime_safely(date_time_str)
-            booking_date = date_time.date()
-            booking_time_start = date_time.time()
-            booking_time_end = None
-            booking_weekday = booking_date.weekday()
-
-            duration_str = request.data.get('duration', '01:00:00')
-            if isinstance(duration_str, str):
-                hours, minutes, seconds = map(int, duration_str.split(':'))
-                duration = timedelta(hours=hours, minutes=minutes, seconds=seconds)
-            else:
-                duration = duration_str
-
-            booking_time_end = (date_time + duration).time()
-            start_time = date_time - timedelta(minutes=30)
-            end_time = date_time + timedelta(minutes=30)
+    def _booking_error_response(self, error):
+        return Response(error.as_response_data(), status=error.status_code)
 
-            rejected_session = Session.objects.filter(
-                tutor_id=tutor_id,
-                student=request.user,
-                date_time__gte=start_time,
-                date_time__lte=end_time,
-                status='rejected'
-            ).exists()
-
-            if rejected_session:
-                return Response(
-                    {"error": "This booking request was previously denied by the tutor. Please select a different time slot."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-            exact_match = Availability.objects.filter(
-                tutor=tutor,
-                available_date=booking_date,
-                available_time_start__lte=booking_time_start,
-                available_time_end__gte=booking_time_end
-            ).exists()
-
-            # If no direct match, check recurring availability
-            if not exact_match:
-                is_available = False
-                recurring_slots = Availability.objects.filter(
-                    tutor=tutor,
-                    recurring=True,
-                    available_time_start__lte=booking_time_start,
-                    available_time_end__gte=booking_time_end
-                )
-
-                for slot in recurring_slots:
-                    slot_weekday = slot.available_date.weekday()
-                    if slot_weekday == booking_weekday:
-                        # Create a one-time availability for this date to ensure validation
-                        new_availability = Availability.objects.create(
-                            tutor=tutor,
-                            available_date=booking_date,
-                            available_time_start=slot.available_time_start,
-                            available_time_end=slot.available_time_end,
-                            recurring=False
-                        )
-                        print(f"Created one-time availability {new_availability.id} from recurring slot")
-                        is_available = True
-                        break
-
-                if not is_available:
-                    return Response(
-                        {"error": "Tutor is not available at this time. Please select a different time slot."},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-        except Exception as e:
-            print(f"Error processing session booking: {e}")
-
-        return super().create(request, *args, **kwargs)
+    def handle_exception(self, exc):
+        # Structured booking failures (see core.booking)
+        if isinstance(exc, BookingError):
+            return self._booking_error_response(exc)
+        # Raised by Session.save() when the database rejects a double booking
+        if isinstance(exc, SessionOverlapError):
+            return self._booking_error_response(BookingError(['overlap']))
+        return super().handle_exception(exc)
 
     def perform_create(self, serializer):
-        session = serializer.save(student=self.request.user)
-        Notification.create_booking_request(session)
-
-        return session
+        data = serializer.validated_data
+        # New sessions always start as pending requests, whatever status the client sent
+        serializer.instance = create_booking(
+            student=self.request.user,
+            tutor=data['tutor'],
+            date_time=data['date_time'],
+            duration=data['duration'],
+            topic=data.get('topic'),
+            mode=data.get('mode'),
+            notes=data.get('notes')
+        )
 
     @action(detail=True, methods=['post'])
     def reschedule(self, request, pk=None):
@@ -317,26 +262,12 @@ class SessionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Check for overlapping sessions
-            overlapping_sessions = Session.objects.filter(
-                tutor=session.tutor,
-                date_time__lt=new_date_time + session.duration,
-                date_time__gt=new_date_time - session.duration,
-                status__in=['pending', 'confirmed', 'reschedule_pending']
-            ).exclude(pk=session.pk)
-
-            if overlapping_sessions.exists():
-                return Response(
-                    {'error': 'This time slot is already booked'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            # The proposed slot is only held once the student accepts, so check it now to fail early
+            validate_reschedule(session, new_date_time)
 
             # Store old session details
             old_date_time = session.date_time
 
-            # Check for availability or create one if needed for the new time
-            self._ensure_availability_exists(session.tutor, new_date_time, session.duration)
-
             # Store the proposed new date time in the notes field
             original_notes = session.notes or ""
             session.notes = f"{original_notes}\n[RESCHEDULE_REQUEST]{new_date_time_str}".strip()
@@ -363,36 +294,6 @@ class SessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    def _ensure_availability_exists(self, tutor, datetime_obj, duration):
-        """Ensure availability exists for the given date and time, if not, create"""
-        session_date = datetime_obj.date()
-        session_start_time = datetime_obj.time()
-        session_end_time = (datetime_obj + duration).time()
-
-        availability_exists = Availability.objects.filter(
-            tutor=tutor,
-            available_date=session_date,
-            available_time_start__lte=session_start_time,
-            available_time_end__gte=session_end_time
-        ).exists()
-
-        if not availability_exists:
-            # Create an availability entry if not found
-            try:
-                Availability.objects.create(
-                    tutor=tutor,
-                    available_date=session_date,
-                    available_time_start=session_start_time,
-                    available_time_end=session_end_time,
-                    recurring=False
-                )
-                return True
-            except Exception as e:
-                print(f"Error creating availability: {e}")
-                raise ValueError(f"Error creating availability: {str(e)}")
-
-        return True
-
     @action(detail=True, methods=['post'])
     def reschedule_response(self, request, pk=None):
         session = self.get_object()
@@ -467,6 +368,8 @@ class SessionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
+        except SessionOverlapError:
+            return self._booking_error_response(BookingError(['overlap']))
         except Exception as e:
             print(f"Error processing reschedule response: {e}")
             return Response(
@@ -504,12 +407,9 @@ class SessionViewSet(viewsets.ModelViewSet):
         session.status = new_status
 
         # Bypass the full clean/validation when just changing status
+        # (the post_save signal notifies the student for completed sessions)
         session.save(update_fields=['status'])
 
-        # Create notification for completed sessions
-        if new_status == 'completed':
-            Notification.create_session_completed_notification(session)
-
         # Update existing booking request notification if it exists
         booking_notification = Notification.objects.filter(
             related_session=session,
@@ -535,6 +435,38 @@ class AvailabilityViewSet(viewsets.ModelViewSet):
     queryset = Availability.objects.all()
     serializer_class = AvailabilitySerializer
 
+class AvailabilityRuleViewSet(viewsets.ModelViewSet):
+    """Weekly recurring availability of the current tutor, with dates excluded through `exceptions`"""
+    serializer_class = AvailabilityRuleSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return AvailabilityRule.objects.filter(tutor=self.request.user).prefetch_related('exceptions').order_by('valid_from', 'start_time')
+
+    def perform_create(self, serializer):
+        if not self.request.user.roles.filter(name='Tutor').exists():
+            raise PermissionDenied("Only tutors can set availability.")
+        serializer.save(tutor=self.request.user)
+
+    @action(detail=True, methods=['POST', 'DELETE'])
+    def exceptions(self, request, pk=None):
+        """Add (POST) or remove (DELETE) a date on which the rule does not apply"""
+        rule = self.get_object()
+        serializer = AvailabilityExceptionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        date = serializer.validated_data['date']
+
+        if request.method == 'DELETE':
+            exception = rule.exceptions.filter(date=date).first()
+            if not exception:
+                return Response({'detail': 'Exception not found.'}, status=status.HTTP_404_NOT_FOUND)
+            exception.delete()
+        else:
+            rule.exceptions.get_or_create(date=date)
+
+        rule = self.get_queryset().get(pk=rule.pk)
+        return Response(AvailabilityRuleSerializer(rule).data, status=status.HTTP_200_OK)
+
 class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
@@ -544,61 +476,120 @@ class MessageViewSet(viewsets.ModelViewSet):
         recipient_id = self.request.query_params.get('receiver')
 
         if recipient_id and recipient_id.isdigit():
-            recipient_id = int(recipient_id)
-            return Message.objects.filter(
-                (Q(sender=user) & Q(receiver_id=recipient_id)) |
-                (Q(sender_id=recipient_id) & Q(receiver=user))
-            ).order_by('timestamp')
+            return Message.objects.thread(user, int(recipient_id)).order_by('timestamp')
 
         return Message.objects.none()
 
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
 
-    @action(detail=False, methods=['GET'], url_path=r'conversations')
-    def get_conversations(self, request):
-        # Get the latest message for each conversation the user is part of
-        latest_messages_subquery = Message.objects.filter(
-            Q(sender_id=OuterRef('id'), receiver=request.user) |
-            Q(sender=request.user, receiver_id=OuterRef('id'))
-        ).order_by('-timestamp').values('timestamp')[:1]
-
-        conversations = CustomUser.objects.annotate(
-            last_message_timestamp=Subquery(latest_messages_subquery)
-        ).filter(
-            Q(sent_messages__receiver=request.user) |
-            Q(received_messages__sender=request.user)
-        ).distinct()
-
-        conversation_details = []
-        for user in conversations:
-            # Get the last message between the current user and this conversation partner
-            last_message = Message.objects.filter(
-                Q(sender=user, receiver=request.user) |
-                Q(sender=request.user, receiver=user)
-            ).order_by('-timestamp').first()
-
-            # Count unread messages from this user
-            unread_count = Message.objects.filter(
-                sender=user,
-                receiver=request.user,
-                is_read=False
-            ).count()
+    @action(detail=False, methods=['GET'])
+    def thread(self, request):
+        """
+        Newest-first window of the messages exchanged with `receiver`, for infinite scroll.
+
+        Pass a message id as `before` to page back through older messages or as `after` to fetch newer ones;
+        `limit` sets the window size (default 50, max 200).
+        """
+        partner_id = request.query_params.get('receiver', '')
+        if not partner_id.isdigit():
+            return Response({'error': 'Receiver ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = request.query_params.get('limit', '')
+        limit = min(int(limit), 200) if limit.isdigit() and int(limit) > 0 else 50
+
+        thread = Message.objects.thread(request.user, int(partner_id)).select_related('sender', 'receiver')
+        before = request.query_params.get('before')
+        after = request.query_params.get('after')
+        cursor_id = before or after
+
+        if cursor_id:
+            cursor = thread.filter(pk=cursor_id).values('timestamp', 'id').first() if cursor_id.isdigit() else None
+            if not cursor:
+                return Response({'error': 'Cursor message not found in this thread'}, status=status.HTTP_404_NOT_FOUND)
+
+        if before:
+            window = thread.filter(
+                Q(timestamp__lt=cursor['timestamp']) | Q(timestamp=cursor['timestamp'], id__lt=cursor['id'])
+            ).order_by('-timestamp', '-id')
+        elif after:
+            window = thread.filter(
+                Q(timestamp__gt=cursor['timestamp']) | Q(timestamp=cursor['timestamp'], id__gt=cursor['id'])
+            ).order_by('timestamp', 'id')
+        else:
+            window = thread.order_by('-timestamp', '-id')
 
-            conversation_details.append({
-                'user': CustomUserSerializer(user).data,
-                'last_message': MessageSerializer(last_message).data if last_message else None,
-                'unread_count': unread_count
-            })
+        messages = list(window[:limit + 1])
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if after:
+            messages.reverse()
 
-        # Sort conversations by most recent message
-        conversation_details.sort(
-            key=lambda x: x['last_message']['timestamp'] if x['last_message'] else None,
-            reverse=True
+        return Response({
+            'results': MessageSerializer(messages, many=True).data,
+            'has_more': has_more,
+            'before': messages[-1].id if messages else None,
+            'after': messages[0].id if messages else None
+        })
+
+    @action(detail=False, methods=['GET'], url_path=r'conversations')
+    def get_conversations(self, request):
+        """
+        List the user's conversations with the latest message and unread count, newest first.
+
+        Optional keyset pagination: `limit` caps the page size, and the `before`/`before_id` values returned
+        in `next` fetch the following page.
+        """
+        before_id = request.query_params.get('before_id', '')
+        if before_id and not before_id.isdigit():
+            return Response({'error': 'before_id must be a conversation ID'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            before = parse_datetime(request.query_params.get('before', ''))
+        except ValueError:
+            before = None
+        if request.query_params.get('before') and before is None:
+            return Response({'error': 'before must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+
+        conversations = Conversation.objects.inbox(
+            request.user,
+            before=before,
+            before_id=int(before_id) if before_id else None
+        ).select_related(
+            'user_a', 'user_b', 'last_message__sender', 'last_message__receiver'
+        ).prefetch_related(
+            *CustomUserQuerySet.profile_prefetches('user_a__'),
+            *CustomUserQuerySet.profile_prefetches('user_b__')
         )
 
+        limit = request.query_params.get('limit')
+        if limit and limit.isdigit():
+            conversations = list(conversations[:int(limit) + 1])
+            has_more = len(conversations) > int(limit)
+            conversations = conversations[:int(limit)]
+        else:
+            conversations = list(conversations)
+            has_more = False
+
+        partners = CustomUserSerializer(
+            [conversation.partner_of(request.user) for conversation in conversations], many=True
+        ).data
+        conversation_details = [
+            {
+                'user': partner,
+                'last_message': MessageSerializer(conversation.last_message).data,
+                'unread_count': conversation.unread_for(request.user)
+            }
+            for conversation, partner in zip(conversations, partners)
+        ]
+
+        next_cursor = None
+        if has_more:
+            last = conversations[-1]
+            next_cursor = {'before': last.last_timestamp.isoformat(), 'before_id': last.id}
+
         return Response({
-            'results': conversation_details
+            'results': conversation_details,
+            'next': next_cursor
         })
 
     @action(detail=False, methods=['POST'], url_path='mark-read')
@@ -607,21 +598,23 @@ class MessageViewSet(viewsets.ModelViewSet):
         if not sender_id:
             return Response({'error': 'Sender ID is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Mark all unread messages from the specified sender as read
-        Message.objects.filter(
-            sender_id=sender_id,
-            receiver=request.user,
-            is_read=False
-        ).update(is_read=True)
+        # Mark all unread messages from the specified sender as read and update the conversation counter
+        with transaction.atomic():
+            marked = Message.objects.filter(
+                sender_id=sender_id,
+                receiver=request.user,
+                is_read=False
+            ).update(is_read=True)
+            Conversation.mark_read(request.user, sender_id, marked)
+
+        if marked:
+            realtime.publish_messages_read(request.user, sender_id, marked)
 
         return Response({'message': 'Messages marked as read'}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['GET'], url_path='unread-count')
     def unread_messages_count(self, request):
-        unread_count = Message.objects.filter(
-            receiver=request.user,
-            is_read=False
-        ).count()
+        unread_count = counters.unread_count(counters.MESSAGES, request.user.id)
 
         return Response({
             'unread_count': unread_count
@@ -683,27 +676,122 @@ class UserProfileView(APIView):
         return Response({"message": "Your account has been deleted successfully."})
 
 class TutorListView(ListAPIView):
+    """
+    Paginated tutor discovery: filtered with TutorFilterSet (see core.filters), with facet counts
+    for the current filters in the `facets` key of the response.
+    """
     serializer_class = CustomUserSerializer
     permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TutorFilterSet
 
     def get_queryset(self):
-        return CustomUser.objects.filter(roles__name='Tutor')
+        return CustomUser.objects.tutors().with_profile().order_by('id')
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        return context
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.data['facets'] = facet_counts(request.query_params, CustomUser.objects.tutors(), request)
+        return response
 
-class TutorSearchView(APIView):
+class TutorSearchView(ListAPIView):
+    """Paginated tutor search ranked by relevance to `q` (see core.search), accepting the /tutors/ filters"""
+    serializer_class = CustomUserSerializer
     permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TutorFilterSet
 
-    def get(self, request):
-        query = request.query_params.get('q', '')
-        tutors = CustomUser.objects.filter(roles__name='tutor').filter(
-            models.Q(username__icontains=query) |
-            models.Q(tutortopic__topic__name__icontains=query)
-        ).distinct()
-        serializer = CustomUserSerializer(tutors, many=True)
-        return Response(serializer.data)
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        tutors = CustomUser.objects.tutors().with_profile()
+
+        if not query:
+            return tutors.order_by(F('average_rating').desc(nulls_last=True), 'id')
+
+        return search_tutors(tutors, query)
+
+class TutorAvailabilitySearchView(ListAPIView):
+    """
+    Paginated tutors with a free slot of `duration` minutes (default 60) between `start` and `end` (ISO datetimes),
+    accepting the /tutors/ filters. Each result lists its `free_slots` in the window (see core.availability).
+    """
+    serializer_class = CustomUserSerializer
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TutorFilterSet
+
+    def get_queryset(self):
+        start = parse_datetime(self.request.query_params.get('start', ''))
+        end = parse_datetime(self.request.query_params.get('end', ''))
+        if not start or not end:
+            raise ValidationError({'detail': 'start and end must be ISO 8601 datetimes'})
+
+        duration = self.request.query_params.get('duration', '60')
+        if not duration.isdigit() or int(duration) == 0:
+            raise ValidationError({'duration': 'duration must be a positive number of minutes'})
+
+        # Narrow the tutors with the /tutors/ filters first, so that the interval search only covers the matching ones
+        tutors = CustomUser.objects.tutors()
+        filterset = self.filterset_class(self.request.query_params, queryset=tutors, request=self.request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        try:
+            self.free_slots = find_available_tutors(
+                start, end, timedelta(minutes=int(duration)), tutors=filterset.qs.values('pk')
+            )
+        except AvailabilityWindowError as e:
+            raise ValidationError({'detail': str(e)})
+
+        return tutors.filter(pk__in=list(self.free_slots)).with_profile().order_by('id')
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        for tutor in response.data['results']:
+            tutor['free_slots'] = [
+                {'start': slot_start.isoformat(), 'end': slot_end.isoformat()}
+                for slot_start, slot_end in self.free_slots[tutor['id']]
+            ]
+        return response
+
+
+class TutorCalendarView(APIView):
+    """
+    A tutor's free and busy intervals from `start` to `end` (ISO dates, inclusive, default the current week),
+    free being their availability minus their active sessions (see core.availability.tutor_calendar).
+
+    Responses carry an ETag of their content, and a request whose If-None-Match matches it gets an empty 304.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, tutor_id):
+        today = timezone.localdate()
+        start_date = parse_date(request.query_params.get('start', '')) or today - timedelta(days=today.weekday())
+        end_date = parse_date(request.query_params.get('end', '')) or start_date + timedelta(days=6)
+
+        tutor = get_object_or_404(CustomUser.objects.tutors(), pk=tutor_id)
+        try:
+            calendar = tutor_calendar(tutor.id, start_date, end_date)
+        except AvailabilityWindowError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            'tutor': tutor.id,
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            **{
+                kind: [{'start': interval_start.isoformat(), 'end': interval_end.isoformat()} for interval_start, interval_end in intervals]
+                for kind, intervals in calendar.items()
+            }
+        }
+
+        etag = quote_etag(hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest())
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        # Clients may keep the week, but must revalidate it before reuse
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 class TutorReviewsView(APIView):
     permission_classes = [AllowAny]
@@ -759,13 +847,12 @@ class SubmitReviewView(APIView):
                     'review': ReviewSerializer(existing_review).data
                 }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Create a new review
+            # Create a new review (the tutor's rating is updated by the post_save signal)
             review = Review(session=session, rating=rating, comment=comment)
             review.save()
 
-            # Update the tutor rating
             tutor = session.tutor
-            avg_rating, total_ratings = tutor.update_rating()
+            tutor.refresh_from_db(fields=['average_rating', 'total_ratings'])
 
             serializer = ReviewSerializer(review)
             return Response({
@@ -821,23 +908,28 @@ class AvailabilityUpdateView(APIView):
         if not tutor.roles.filter(name='Tutor').exists():
             return Response({'detail': 'Only tutors can set availability.'}, status=status.HTTP_403_FORBIDDEN)
 
-        data = request.data
-        for availability in data:
-            serializer = AvailabilitySerializer(data=availability)
-            if serializer.is_valid():
-                new_availability = serializer.save(tutor=tutor)
-            else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # The whole batch is validated before anything is written, then saved atomically in bulk
+        serializer = AvailabilitySerializer(data=request.data, many=True, allow_empty=False)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(AvailabilitySerializer(new_availability).data, status=status.HTTP_200_OK)
+        try:
+            saved = upsert_availability(tutor, serializer.validated_data)
+        except AvailabilityBatchError as e:
+            # Same shape as the serializer's per-slot errors
+            errors = [
+                {'non_field_errors': [e.errors[index]]} if index in e.errors else {}
+                for index in range(len(serializer.validated_data))
+            ]
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(AvailabilitySerializer(saved, many=True).data, status=status.HTTP_200_OK)
 
     def get(self, request):
         tutor_id = request.query_params.get('tutor')
         if tutor_id:
             # If a specific tutor is requested, get their availabilities
-            availabilities = Availability.objects.filter(tutor_id=tutor_id)
-            serializer = AvailabilitySerializer(availabilities, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(self._tutor_availability(tutor_id), status=status.HTTP_200_OK)
         else:
             if not request.user.is_authenticated:
                 return Response({'detail': 'Please specify a tutor ID.'},
@@ -846,9 +938,13 @@ class AvailabilityUpdateView(APIView):
             if not request.user.roles.filter(name='Tutor').exists():
                 return Response({'detail': 'Only tutors can view availability.'},
                         status=status.HTTP_403_FORBIDDEN)
-            availabilities = Availability.objects.filter(tutor=request.user)
-            serializer = AvailabilitySerializer(availabilities, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return Response(self._tutor_availability(request.user.id), status=status.HTTP_200_OK)
+
+    def _tutor_availability(self, tutor_id):
+        """One-off slots followed by the tutor's recurring rules in the same shape"""
+        availabilities = Availability.objects.filter(tutor_id=tutor_id)
+        rules = AvailabilityRule.objects.filter(tutor_id=tutor_id).order_by('valid_from', 'start_time')
+        return AvailabilitySerializer(availabilities, many=True).data + recurring_availability_slots(rules)
 
     def put(self, request, id):
         tutor = request.user
@@ -874,6 +970,9 @@ class AvailabilityUpdateView(APIView):
         if not tutor.roles.filter(name='Tutor').exists():
             return Response({'detail': 'Only tutors can delete availability.'}, status=status.HTTP_403_FORBIDDEN)
 
+        if isinstance(availability_id, str) and availability_id.startswith('rule-'):
+            return self._delete_recurring(tutor, availability_id)
+
         try:
             availability = Availability.objects.get(id=availability_id, tutor=tutor)
             availability.delete()
@@ -881,6 +980,24 @@ class AvailabilityUpdateView(APIView):
         except Availability.DoesNotExist:
             raise PermissionDenied("You do not have permission to delete this availability or it does not exist.")
 
+    def _delete_recurring(self, tutor, slot_id):
+        """Remove one weekday (`rule-<id>-<weekday>` as listed by GET) from a rule, deleting the rule with its last weekday"""
+        try:
+            _, rule_id, weekday = slot_id.split('-')
+            weekday = int(weekday)
+            if not 0 <= weekday <= 6:
+                raise ValueError(weekday)
+            rule = AvailabilityRule.objects.get(id=int(rule_id), tutor=tutor)
+        except (ValueError, AvailabilityRule.DoesNotExist):
+            raise PermissionDenied("You do not have permission to delete this availability or it does not exist.")
+
+        rule.weekdays &= ~(1 << weekday)
+        if rule.weekdays:
+            rule.save(update_fields=['weekdays'])
+        else:
+            rule.delete()
+        return Response({'message': 'Availability deleted successfully.'}, status=status.HTTP_200_OK)
+
     def update(self, request, *args, **kwargs):
         availability_id = kwargs.get('pk')
         try:
@@ -900,20 +1017,40 @@ class NotificationViewSet(viewsets.ModelViewSet):
         user = self.request.user
         notifications = Notification.objects.filter(recipient=user)
 
+        # Catch up after a WebSocket reconnect: only notifications newer than the last one the client has seen
+        since = self.request.query_params.get('since')
+        if since and since.isdigit():
+            notifications = notifications.filter(id__gt=int(since))
+
         return notifications
 
+    def perform_update(self, serializer):
+        # Marking a notification as read (or unread) through PUT/PATCH moves the cached counter as well
+        was_read = serializer.instance.is_read
+        notification = serializer.save()
+        if notification.is_read != was_read:
+            counters.adjust(counters.NOTIFICATIONS, notification.recipient_id, -1 if notification.is_read else 1)
+
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save()
+            counters.adjust(counters.NOTIFICATIONS, request.user.id, -1)
         return Response({'status': 'notification marked as read'})
 
     @action(detail=False, methods=['post'])
     def mark_all_as_read(self, request):
-        self.get_queryset().update(is_read=True)
+        marked = self.get_queryset().filter(is_read=False).update(is_read=True)
+        counters.adjust(counters.NOTIFICATIONS, request.user.id, -marked)
         return Response({'status': 'all notifications marked as read'})
 
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """Number of unread notifications, served from the cached counter (see core.counters)"""
+        return Response({'unread_count': counters.unread_count(counters.NOTIFICATIONS, request.user.id)})
+
     @action(detail=True, methods=['delete'])
     def delete_notification(self, request, pk=None):
         notification = self.get_object()
@@ -934,3 +1071,18 @@ class PasswordChangeView(APIView):
                 status=status.HTTP_200_OK
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class MetricsView(APIView):
+    """The in-process metrics (see core.metrics) in the Prometheus text format, for scrapers"""
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response({'error': 'Invalid metrics token'}, status=status.HTTP_403_FORBIDDEN)
+        if settings.METRICS_MULTIPROCESS_DIR:
+            body = metrics.render_all_processes(settings.METRICS_MULTIPROCESS_DIR)
+        else:
+            body = metrics.registry.render()
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
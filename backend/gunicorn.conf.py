@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+import tempfile
+
+"""
+Gunicorn configuration of the production ASGI server:
+
+    DJANGO_ENV=production gunicorn noesis.asgi:application -c gunicorn.conf.py
+
+Every worker process runs a uvicorn event loop. Async views (see core.async_views) and WebSockets are served
+concurrently on the loop, while each request to a sync view holds a thread of the worker until it is done.
+Workers do not share memory: the production settings require CACHE_REDIS_URL and CHANNEL_REDIS_URL so that
+counters, presence and WebSocket events reach every process, and the workers' metrics are summed through the
+METRICS_MULTIPROCESS_DIR directory (see core.metrics), one per server.
+"""
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = 'noesis.workers.NoesisUvicornWorker'
+
+# Two workers per core plus one keeps every core busy while other workers wait on the database
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+# Seconds a silent worker is given before it is restarted, and to finish its requests on shutdown
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Recycle workers after this many requests to bound memory growth, with jitter so they do not restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = max_requests // 10
+
+# An access log line costs a write per request: only enabled when GUNICORN_ACCESS_LOG names a file (or -)
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Each worker writes its metrics to this directory, and /metrics reports the sum of all workers
+METRICS_MULTIPROCESS_DIR = os.environ.setdefault(
+    'METRICS_MULTIPROCESS_DIR', os.path.join(tempfile.gettempdir(), 'noesis-metrics')
+)
+
+
+def on_starting(server):
+    from core import metrics
+
+    metrics.prepare_directory(METRICS_MULTIPROCESS_DIR)
+
+
+def worker_exit(server, worker):
+    # In the exiting worker: write its final values before the master archives them
+    from core import metrics
+
+    metrics.write_process_values(METRICS_MULTIPROCESS_DIR)
+
+
+def child_exit(server, worker):
+    from core import metrics
+
+    metrics.mark_process_dead(METRICS_MULTIPROCESS_DIR, worker.pid)
@@ -0,0 +1,142 @@
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+"""
+Load test of the hottest read endpoints, to compare server setups (for example ASYNC_READ_VIEWS on and off, or
+runserver against the production ASGI server):
+
+    python loadtest.py --url http://localhost:8000 --url http://localhost:8001 --concurrency 50 --duration 30
+
+Every client thread keeps one connection open and requests the endpoints in turn as a single user, authenticated
+with a token from /api/token/. The throughput, latency percentiles and errors of every endpoint are printed per
+server. It only uses the standard library, so it runs outside of the backend's environment.
+"""
+ENDPOINTS = (
+    'notifications/unread-count/',
+    'notifications/',
+    'profile/{profile}/',
+)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def connect(url):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    return connection_class(parts.netloc, timeout=30)
+
+
+def request(connection, method, path, body=None, headers=None):
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def obtain_token(url, username, password):
+    connection = connect(url)
+    body = json.dumps({'username': username, 'password': password})
+    status, data = request(
+        connection, 'POST', f'{urlsplit(url).path.rstrip("/")}/api/token/', body, {'Content-Type': 'application/json'}
+    )
+    connection.close()
+    if status != 200:
+        raise SystemExit(f'{url}: could not obtain a token for {username} ({status}): {data[:200]!r}')
+    return json.loads(data)['access']
+
+
+def client(url, paths, headers, deadline, results, lock):
+    """Request the paths in turn until the deadline, recording (latency, ok) per path"""
+    connection = connect(url)
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    index = 0
+    while time.monotonic() < deadline:
+        name, path = paths[index % len(paths)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            status, _ = request(connection, 'GET', path, headers=headers)
+        except (OSError, http.client.HTTPException):
+            # Reconnect: the server closed the connection (keep-alive timeout, worker restart)
+            connection.close()
+            connection = connect(url)
+            errors[name] += 1
+            continue
+        if status == 200:
+            timings[name].append(time.perf_counter() - start)
+        else:
+            errors[name] += 1
+    connection.close()
+
+    with lock:
+        for name, values in timings.items():
+            results['timings'][name].extend(values)
+        for name, count in errors.items():
+            results['errors'][name] += count
+
+
+def run(url, options):
+    token = obtain_token(url, options.username, options.password)
+    headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
+    base = f'{urlsplit(url).path.rstrip("/")}/api/'
+    paths = [(endpoint, base + endpoint.format(profile=options.profile)) for endpoint in ENDPOINTS]
+
+    results = {'timings': defaultdict(list), 'errors': defaultdict(int)}
+    lock = threading.Lock()
+    deadline = time.monotonic() + options.duration
+    threads = [
+        threading.Thread(target=client, args=(url, paths, headers, deadline, results, lock), daemon=True)
+        for _ in range(options.concurrency)
+    ]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    print(f'\n{url} ({options.concurrency} clients, {elapsed:.1f}s)')
+    print(f'{"endpoint":<30}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"errors":>10}')
+    total = 0
+    for endpoint in ENDPOINTS:
+        values = results['timings'][endpoint]
+        total += len(values)
+        print(
+            f'{endpoint:<30}{len(values) / elapsed:>10.1f}'
+            f'{percentile(values, 0.5) * 1000:>10.1f}{percentile(values, 0.95) * 1000:>10.1f}'
+            f'{results["errors"][endpoint]:>10}'
+        )
+    all_values = [value for values in results['timings'].values() for value in values]
+    mean = statistics.mean(all_values) * 1000 if all_values else 0.0
+    print(f'{"total":<30}{total / elapsed:>10.1f}{"":>10}{"":>10}{sum(results["errors"].values()):>10}')
+    print(f'mean latency {mean:.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test of the hottest read endpoints')
+    parser.add_argument('--url', action='append', help='Server to test, repeat to compare servers '
+                                                       '(default http://localhost:8000)')
+    parser.add_argument('--concurrency', type=int, default=20, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run against each server')
+    parser.add_argument('--username', default='user1', help='User the clients authenticate as')
+    parser.add_argument('--password', default='password123', help='Password of the user')
+    parser.add_argument('--profile', default='user0', help='Username of the profile requested')
+    options = parser.parse_args()
+
+    for url in options.url or ['http://localhost:8000']:
+        run(url.rstrip('/'), options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import os
+from django.core.exceptions import ImproperlyConfigured
+from dotenv import load_dotenv
+
+"""
+Django settings for noesis project, selected by the DJANGO_ENV environment variable:
+
+- development (default): base settings with DEBUG enabled, for runserver
+- production: base settings tuned for the ASGI server (see gunicorn.conf.py), every secret from the environment
+"""
+# Load environment variables from .env file, which may set DJANGO_ENV itself
+load_dotenv()
+
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'development')
+
+if DJANGO_ENV == 'production':
+    from .production import *
+elif DJANGO_ENV == 'development':
+    from .development import *
+else:
+    raise ImproperlyConfigured(f"Unknown DJANGO_ENV '{DJANGO_ENV}', expected 'development' or 'production'")
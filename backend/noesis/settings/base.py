@@ -1,5 +1,6 @@
 """
-Django settings for noesis project.
+Django settings for noesis project shared by every environment, see noesis.settings for the
+development and production overrides.
 
 Generated by 'django-admin startproject' using Django 5.1.3.
 
@@ -17,7 +18,7 @@ from django.core.management.utils import get_random_secret_key
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -28,8 +29,8 @@ load_dotenv()
 # Get SECRET_KEY from environment variable or generate a new one
 SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', get_random_secret_key())
 
-# SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# SECURITY WARNING: don't run with debug turned on in production! Only the development settings enable it
+DEBUG = False
 
 ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', '*').split(',')
 
@@ -43,12 +44,14 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760 # 10MB
 # Application definition
 
 INSTALLED_APPS = [
+    'daphne',  # ASGI runserver, so WebSockets work in development
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -59,7 +62,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.auth.PresenceJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
@@ -69,6 +72,8 @@ REST_FRAMEWORK = {
 }
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -80,8 +85,39 @@ MIDDLEWARE = [
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Per-request SQL instrumentation (see core.middleware): the fraction of requests logged with their query count,
+# database time and repeated statements (0 disables it), and how often a statement may repeat within a request
+# before the request is logged as a warning
+QUERY_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('QUERY_INSTRUMENTATION_SAMPLE_RATE', '0'))
+QUERY_DUPLICATE_THRESHOLD = int(os.environ.get('QUERY_DUPLICATE_THRESHOLD', '5'))
+
+# In-process metrics served at /metrics in the Prometheus text format (see core.metrics). When METRICS_TOKEN is
+# set, scrapers must send it as a bearer token
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Directory shared by the worker processes of one server, which then report the sum of their metrics (set by
+# gunicorn.conf.py), and seconds between the writes of each worker's values to it
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR')
+METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+
 CONN_MAX_AGE = 60  # Keep database connections open for 60 seconds
 
+# Seconds between in-process sweeps that mark ended sessions as completed (unset or 0 disables the sweeper)
+SESSION_SWEEPER_INTERVAL = int(os.environ.get('SESSION_SWEEPER_INTERVAL', '0')) or None
+
+# Presence tracking: users are online while their last heartbeat is younger than PRESENCE_TTL seconds.
+# Heartbeats are buffered in memory ('local') or in the default cache ('cache', shared by all processes)
+# and flushed to CustomUser.last_active every PRESENCE_FLUSH_INTERVAL seconds.
+PRESENCE_STORE = os.environ.get('PRESENCE_STORE', 'local')
+PRESENCE_TTL = int(os.environ.get('PRESENCE_TTL', '300'))
+PRESENCE_WRITE_INTERVAL = 30
+PRESENCE_FLUSH_INTERVAL = int(os.environ.get('PRESENCE_FLUSH_INTERVAL', '60')) or None
+
+# Serve the hottest read endpoints (unread notification count, notification list, profiles) with the async
+# views of core.async_views instead of their REST framework views
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'false').lower() in ('1', 'true', 'yes')
+
 ROOT_URLCONF = 'noesis.urls'
 
 TEMPLATES = [
@@ -101,9 +137,43 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'noesis.wsgi.application'
+ASGI_APPLICATION = 'noesis.asgi.application'
 
-# Database
-# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+# Channel layer used to push events to WebSocket clients. The in-memory layer only reaches clients
+# connected to the same process; set CHANNEL_REDIS_URL (requires channels-redis) for multi-process deployments.
+CHANNEL_REDIS_URL = os.environ.get('CHANNEL_REDIS_URL')
+
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        }
+    }
+
+# Cache used for the unread counters and the expanded availability rules. The local-memory cache is per process;
+# set CACHE_REDIS_URL (requires redis) so that all processes share the same counters.
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -128,6 +198,14 @@ if DATABASE_URL and DATABASE_URL.startswith('postgres://'):
             'PORT': PORT,
         }
     }
+elif DATABASE_URL and DATABASE_URL.startswith('sqlite:///'):
+    # SQLite for test runs, e.g. DATABASE_URL=sqlite:///test.sqlite3 (PostgreSQL-only indexes are skipped)
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': DATABASE_URL[len('sqlite:///'):],
+        }
+    }
 else:
     # Use existing PostgreSQL settings
     DATABASES = {
@@ -209,3 +287,18 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Logging: the core app's loggers (query instrumentation, scheduler, realtime) write to the console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': os.environ.get('CORE_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
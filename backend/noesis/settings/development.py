@@ -0,0 +1,6 @@
+from .base import *
+
+"""
+Development settings: runserver (daphne) with DEBUG, the browsable API and the REST framework views everywhere.
+"""
+DEBUG = True
@@ -0,0 +1,52 @@
+from django.core.exceptions import ImproperlyConfigured
+from .base import *
+
+"""
+Production settings for the ASGI server started with gunicorn.conf.py.
+
+DEBUG is off, so queries are no longer kept in memory for every request. Secrets and hosts must come from the
+environment, state shared by the workers lives in Redis, the API renders JSON only, and the hottest reads are
+served by async views.
+"""
+DEBUG = False
+
+if not os.environ.get('DJANGO_SECRET_KEY'):
+    raise ImproperlyConfigured('DJANGO_SECRET_KEY must be set in production')
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+if not os.environ.get('DJANGO_ALLOWED_HOSTS'):
+    raise ImproperlyConfigured('DJANGO_ALLOWED_HOSTS must be set in production')
+ALLOWED_HOSTS = os.environ['DJANGO_ALLOWED_HOSTS'].split(',')
+
+# gunicorn runs several worker processes: the unread counters, the expanded availability rules, presence and the
+# events pushed to WebSocket clients must be shared by all of them, not kept in each worker's memory
+if not CACHE_REDIS_URL:
+    raise ImproperlyConfigured('CACHE_REDIS_URL must be set in production')
+if not CHANNEL_REDIS_URL:
+    raise ImproperlyConfigured('CHANNEL_REDIS_URL must be set in production')
+
+PRESENCE_STORE = os.environ.get('PRESENCE_STORE', 'cache')
+if PRESENCE_STORE != 'cache':
+    raise ImproperlyConfigured("PRESENCE_STORE must be 'cache' in production")
+
+# Route-level traffic is not public: scrapers must authenticate (or metrics must be disabled)
+if METRICS_ENABLED and not METRICS_TOKEN:
+    raise ImproperlyConfigured('METRICS_TOKEN must be set in production, or METRICS_ENABLED set to false')
+
+# Comma-separated origins of the frontend, any origin is allowed when unset
+CORS_ALLOWED_ORIGINS = [origin for origin in os.environ.get('DJANGO_CORS_ALLOWED_ORIGINS', '').split(',') if origin]
+CORS_ALLOW_ALL_ORIGINS = not CORS_ALLOWED_ORIGINS
+
+# The ASGI handler runs every request's database work on a thread of its own that ends with the request, so
+# persistent connections would be left behind: connections are closed after each request (put PgBouncer in front
+# of PostgreSQL to reuse them)
+DATABASES['default']['CONN_MAX_AGE'] = 0
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'true').lower() in ('1', 'true', 'yes')
+
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
@@ -0,0 +1,8 @@
+from uvicorn.workers import UvicornWorker
+
+"""
+Gunicorn worker classes of the production ASGI server, see gunicorn.conf.py.
+"""
+class NoesisUvicornWorker(UvicornWorker):
+    # Django and channels do not implement the ASGI lifespan protocol
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, 'lifespan': 'off'}
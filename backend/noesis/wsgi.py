@@ -13,3 +13,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'noesis.settings')
 
 application = get_wsgi_application()
+
+# Start background maintenance jobs (e.g. the session sweeper) when enabled in settings
+from core.scheduler import start_scheduler
+
+start_scheduler()
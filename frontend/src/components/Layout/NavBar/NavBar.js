@@ -29,12 +29,10 @@ const Navbar = ({ hideLinks = false }) => {
   const fetchUnreadNotifications = useCallback(async () => {
     if (isLoggedIn) {
       try {
-        const notificationsResponse =
-          await axiosInstance.get("/notifications/");
-        const unreadNotifications = notificationsResponse.data.results.filter(
-          (notification) => !notification.is_read,
+        const notificationsResponse = await axiosInstance.get(
+          "/notifications/unread-count/",
         );
-        setUnreadNotifs(unreadNotifications.length);
+        setUnreadNotifs(notificationsResponse.data.unread_count);
       } catch (error) {
         console.error("Failed to fetch unread notifications:", error);
       }